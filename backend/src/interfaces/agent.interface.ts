@@ -7,6 +7,7 @@ export interface IAgent {
     has_functions: boolean;
     has_code_exec: boolean;
     max_consecutive_auto_reply: number;
+    max_concurrent_tool_calls: number;
     models: Map<ModelType, Types.ObjectId>;
     created_by: Types.ObjectId;
     updated_by: Types.ObjectId;
@@ -6,6 +6,7 @@ const agentSchema = new Schema<IAgentDocument, IAgentModel>({
   name: { type: String, required: true },
   system_message: { type: Schema.Types.ObjectId, ref: 'Prompt', default: '66732c3eba1560b00ad0a641' },
   max_consecutive_auto_reply: { type: Number, default: 10 },
+  max_concurrent_tool_calls: { type: Number, default: 4 },
   has_code_exec: { type: Boolean, default: false },
   has_functions: { type: Boolean, default: false },
   models: { type: Map, of: Schema.Types.ObjectId, ref: 'Model', default: {} },
@@ -23,6 +24,7 @@ agentSchema.methods.apiRepresentation = function(this: IAgentDocument) {
     has_functions: this.has_functions || false,
     has_code_exec: this.has_code_exec || false,
     max_consecutive_auto_reply: this.max_consecutive_auto_reply || 10,
+    max_concurrent_tool_calls: this.max_concurrent_tool_calls || 4,
     models: this.models || {},
     created_by: this.created_by || null,
     updated_by: this.updated_by || null,
@@ -49,7 +49,7 @@ const AgentFlexibleView: React.FC<AgentComponentProps> = ({
     const isEditMode = mode === 'edit' || mode === 'create';
     const handleInputChange = useCallback((e: React.ChangeEvent<HTMLInputElement>) => {
         const { name, value } = e.target;
-        if (name === 'max_consecutive_auto_reply') {
+        if (name === 'max_consecutive_auto_reply' || name === 'max_concurrent_tool_calls') {
             // Only allow non-negative integers
             const numValue = parseInt(value, 10);
             if (!isNaN(numValue) && numValue >= 0) {
@@ -173,6 +173,17 @@ const AgentFlexibleView: React.FC<AgentComponentProps> = ({
                 margin="normal"
                 disabled={!isEditMode}
             />
+            <Typography variant="h6" className={classes.titleText}>Concurrent Tool Calls</Typography>
+            <TextField
+                fullWidth
+                name="max_concurrent_tool_calls"
+                type='number'
+                label="Max Concurrent Tool Calls"
+                value={form.max_concurrent_tool_calls || ''}
+                onChange={handleInputChange}
+                margin="normal"
+                disabled={!isEditMode}
+            />
             <Typography variant="h6" className={classes.titleText}>Code Execution</Typography>
             <FormControlLabel
                 control={
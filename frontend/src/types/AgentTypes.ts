@@ -10,6 +10,7 @@ export interface AliceAgent extends BaseDataseObject {
   has_functions: boolean;
   has_code_exec: boolean;
   max_consecutive_auto_reply?: number;
+  max_concurrent_tool_calls?: number;
   models?: { [key in ModelType]?: AliceModel };
 }
 
@@ -21,6 +22,7 @@ export const convertToAliceAgent = (data: any): AliceAgent => {
     has_functions: data?.has_functions || false,
     has_code_exec: data?.has_code_exec || false,
     max_consecutive_auto_reply: data?.max_consecutive_auto_reply || undefined,
+    max_concurrent_tool_calls: data?.max_concurrent_tool_calls || undefined,
     models: data?.models || {},
     created_by: data?.created_by || undefined,
     updated_by: data?.updated_by || undefined,
@@ -36,6 +38,7 @@ export const getDefaultAgentForm = (): Partial<AliceAgent> => ({
   name: '',
   system_message: undefined,
   max_consecutive_auto_reply: 1,
+  max_concurrent_tool_calls: 4,
   has_functions: false,
   has_code_exec: false,
   models: {},
@@ -10,6 +10,7 @@ export enum ApiType {
     WIKIPEDIA_SEARCH = 'wikipedia_search',
     EXA_SEARCH = 'exa_search',
     ARXIV_SEARCH = 'arxiv_search',
+    META_SEARCH = 'meta_search',
     IMG_VISION = 'img_vision',
     IMG_GENERATION = 'img_generation',
     SPEECH_TO_TEXT = 'speech_to_text',
@@ -60,6 +61,7 @@ export enum ApiName {
     WIKIPEDIA_SEARCH = 'wikipedia_search',
     EXA_SEARCH = 'exa_search',
     ARXIV_SEARCH = 'arxiv_search',
+    META_SEARCH = 'meta_search',
     GOOGLE_KNOWLEDGE_GRAPH = 'google_knowledge_graph'
 }
 
@@ -42,6 +42,10 @@ export const API_TYPE_CONFIGS: Record<ApiType, ApiTypeConfig> = {
     api_name: [ApiName.ARXIV_SEARCH],
     apiConfig: {},
   },
+  [ApiType.META_SEARCH]: {
+    api_name: [ApiName.META_SEARCH],
+    apiConfig: {},
+  },
   [ApiType.GOOGLE_KNOWLEDGE_GRAPH]: {
     api_name: [ApiName.GOOGLE_KNOWLEDGE_GRAPH],
     apiConfig: {
@@ -14,6 +14,9 @@ Functions:
     run_initial_tests(app: FastAPI): 
         Runs initial tests for the application and stores results in app state.
 
+    warm_up_api_clients(app: FastAPI):
+        Pre-warms the pooled provider clients for the configured APIs.
+
     lifespan(app: FastAPI): 
         Asynchronous context manager for application lifespan management.
 
@@ -32,7 +35,8 @@ from workflow.db_app import ContainerAPI, DB_STRUCTURE
 from workflow.api_app.middleware import add_cors_middleware, auth_middleware
 from workflow.api_app.routes import health_route, task_execute, chat_response, db_init, file_transcript
 from workflow.test.component_tests import TestEnvironment, DBTests, APITests
-from workflow.util import LOGGER
+from workflow.core.api import get_client_registry
+from workflow.util import LOGGER, get_sandbox_pool, get_web_fetcher
 
 db_app = None
 thread_pool = None
@@ -48,17 +52,31 @@ async def run_initial_tests(app: FastAPI):
     app.state.initial_test_results = initial_test_results
     LOGGER.info("Initial tests completed")
 
+async def warm_up_api_clients(app: FastAPI):
+    try:
+        api_manager = await app.state.db_app.api_setter()
+        await api_manager.warm_up_clients()
+    except Exception as e:
+        LOGGER.warning(f"Could not pre-warm API clients: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global db_app, thread_pool
     db_app = ContainerAPI()
     thread_pool = ThreadPoolExecutor()
     app.state.db_app = db_app
+    app.state.client_registry = get_client_registry()
     # Run initial tests
     await run_initial_tests(app)
+    await warm_up_api_clients(app)
+    # Start the code execution sandboxes in the background
+    get_sandbox_pool().warm()
     yield
     # Clean up resources if necessary
     thread_pool.shutdown()
+    await app.state.client_registry.aclose()
+    get_sandbox_pool().shutdown()
+    await get_web_fetcher().aclose()
 
 WORKFLOW_APP = FastAPI(lifespan=lifespan)
 add_cors_middleware(WORKFLOW_APP)
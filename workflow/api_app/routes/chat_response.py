@@ -1,8 +1,10 @@
-from typing import List
+from typing import List, AsyncIterator
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from workflow.api_app.util.utils import deep_api_check
 from workflow.api_app.util.dependencies import get_db_app
 from workflow.db_app.app import BackendAPI
+from workflow.core.data_structures import StreamEvent
 from workflow.util import LOGGER
 
 router = APIRouter()
@@ -60,4 +62,61 @@ async def chat_response(chat_id: str, db_app: BackendAPI = Depends(get_db_app))
         LOGGER.debug(f'Stored messages: {responses}')
         return True
    
-    return False
\ No newline at end of file
+    return False
+
+@router.post("/chat_response_stream/{chat_id}")
+async def chat_response_stream(chat_id: str, db_app: BackendAPI = Depends(get_db_app)) -> StreamingResponse:
+    """
+    Generate and store a response for a specific chat, streaming it as Server-Sent Events.
+
+    Works like `/chat_response/{chat_id}`, but forwards the response while it is generated:
+    `delta` events carry text as the model produces it, `tool_call` events announce the tools
+    the model calls, and `message` events carry each complete message once it is stored.
+    The stream ends with a `done` event (or an `error` event if generation fails).
+
+    Args:
+        chat_id (str): The ID of the chat to generate a response for.
+        db_app (BackendAPI): The database application instance (injected dependency).
+
+    Returns:
+        StreamingResponse: A `text/event-stream` response with the stream events.
+
+    Raises:
+        HTTPException: If the chat is not found (404).
+    """
+    LOGGER.info(f'Streaming chat response for id {chat_id}')
+    chat_data = await db_app.get_chats(chat_id)
+    if not chat_data:
+        raise HTTPException(status_code=404, detail="Chat not found")
+
+    # Retrieve API manager
+    api_manager = await db_app.api_setter()
+
+    # Perform deep API availability check
+    api_check_result = await deep_api_check(chat_data[chat_id], api_manager)
+    LOGGER.info(f'API Check Result: {api_check_result}')
+
+    if api_check_result["status"] == "warning":
+        LOGGER.warning(f'API Warning: {api_check_result["warnings"]}')
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event in chat_data[chat_id].stream_response(api_manager):
+                if event.type == "message":
+                    # Store each message as soon as it is complete, so the chat stays consistent if the client disconnects
+                    stored_chat = await db_app.store_chat_message(chat_id, event.message)
+                    if not stored_chat:
+                        LOGGER.error(f"Failed to store message: {event.message} in chat_id {chat_id}")
+                yield event.to_sse()
+        except Exception as e:
+            # The response has started, so errors are reported in the stream rather than as an HTTP status
+            LOGGER.error(f"Error streaming chat response for chat_id {chat_id}: {e}")
+            yield StreamEvent(type="error", content=str(e)).to_sse()
+            return
+        yield StreamEvent(type="done").to_sse()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -3,6 +3,10 @@ from workflow.test.component_tests import APITests, TestEnvironment
 from workflow.db_app.initialization import DBStructure
 from workflow.api_app.util.dependencies import get_db_app
 from workflow.api_app.middleware.auth import auth_middleware
+from workflow.core.api import get_api_stats, get_rate_limiters, get_response_cache, get_search_cache, get_engine_executor
+from workflow.core.agent import get_message_render_cache
+from workflow.core.prompt import get_template_cache
+from workflow.util import get_sandbox_pool
 
 router = APIRouter()
 
@@ -89,6 +93,39 @@ async def user_health_check(request: Request, db_app=Depends(get_db_app)) -> dic
         "api_health": user_test_results["APITests"]
     }
 
-# Apply auth middleware to admin and user health check routes
-router.routes[-2].dependencies.append(Depends(auth_middleware))
-router.routes[-1].dependencies.append(Depends(auth_middleware))
\ No newline at end of file
+@router.get("/health/stats")
+async def stats_report(request: Request) -> dict:
+    """
+    Admin-level report of the runtime metrics of the Workflow service.
+
+    Returns the counters kept in process by the shared components: latency and error rates of
+    each API, rate limiter state, engine executor pools, the response, search, message render and
+    template caches, and the code execution sandboxes. Counters start at zero when the service starts.
+
+    Args:
+        request (Request): The incoming request object.
+
+    Returns:
+        dict: The metrics of each component.
+
+    Raises:
+        HTTPException: 403 error if the user doesn't have admin access.
+    """
+    if not request.state.user or request.state.user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return {
+        "status": "OK",
+        "api_calls": get_api_stats().summary(),
+        "rate_limiters": get_rate_limiters().stats(),
+        "engine_executor": get_engine_executor().stats(),
+        "response_cache": get_response_cache().stats(),
+        "search_cache": get_search_cache().stats(),
+        "message_render_cache": get_message_render_cache().stats(),
+        "template_cache": get_template_cache().stats(),
+        "sandbox_pool": get_sandbox_pool().stats(),
+    }
+
+# Apply auth middleware to the admin, user and stats routes
+for route in router.routes[-3:]:
+    route.dependencies.append(Depends(auth_middleware))
\ No newline at end of file
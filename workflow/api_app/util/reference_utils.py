@@ -1,6 +1,6 @@
 from typing import Union, Any
 from workflow.core.data_structures.references import References
-from workflow.core.data_structures.file_reference import FileReference, FileContentReference
+from workflow.core.data_structures.file_reference import FileReference, FileContentReference, EmbeddingReference
 from workflow.core.data_structures.task_response import TaskResponse
 from workflow.core.data_structures.message import MessageDict
 from workflow.core.data_structures.url_reference import URLReference
@@ -16,7 +16,11 @@ async def create_or_update_file_reference(db_app: BackendAPI, file_ref: FileCont
         # Create new file reference
         new_ref = await db_app.create_entity_in_db('files', file_ref.model_dump(exclude={'id'}))
         LOGGER.debug(f'Created new file reference: {new_ref}')
-        return FileReference(**new_ref)
+        stored_ref = FileReference(**new_ref)
+        if isinstance(file_ref, EmbeddingReference):
+            # Keep the embeddings' buffer in process; the backend now holds the .npy file
+            return file_ref.model_copy(update={'id': stored_ref.id, 'storage_path': stored_ref.storage_path, 'content': None})
+        return stored_ref
 
 async def create_or_update_task_response(db_app: BackendAPI, task_response: TaskResponse) -> TaskResponse:
     if task_response.id:
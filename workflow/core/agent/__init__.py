@@ -1,3 +1,5 @@
 from .agent import AliceAgent
+from .message_render_cache import MessageRenderCache, get_message_render_cache
+from .tool_registry import ToolRegistry, RegisteredTool, compile_validator
 
-__all__ = ['AliceAgent']
\ No newline at end of file
+__all__ = ['AliceAgent', 'MessageRenderCache', 'get_message_render_cache', 'ToolRegistry', 'RegisteredTool', 'compile_validator']
\ No newline at end of file
@@ -1,13 +1,19 @@
-import docker, os, json, traceback, re
+import asyncio, docker, functools, os, json, traceback, re
 from bson import ObjectId
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Dict, Any, List, Optional, Tuple, Callable, Union
-from workflow.core.data_structures import ToolFunction, ToolCall, ensure_tool_function
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
+from typing import Dict, Any, List, Optional, Tuple, Callable, Union, AsyncIterator
+from workflow.core.data_structures import ToolFunction, ToolCall
 from workflow.core.prompt import Prompt
 from workflow.core.model import AliceModel
-from workflow.core.api import APIManager
-from workflow.core.data_structures import TaskResponse, FileReference, ContentType, MessageDict, ApiType, ModelType, FileType, References, FileContentReference
-from workflow.util import LOGGER, run_code, LOG_LEVEL
+from workflow.core.api import APIManager, run_blocking
+from workflow.core.data_structures import TaskResponse, FileReference, ContentType, MessageDict, ApiType, ModelType, FileType, References, FileContentReference, EmbeddingReference, StreamEvent
+from workflow.core.agent.message_render_cache import get_message_render_cache
+from workflow.core.agent.tool_registry import ToolRegistry, compile_validator
+from workflow.util import LOGGER, run_code, LOG_LEVEL, SandboxJob
+from workflow.util.const import AGENT_MAX_CONCURRENT_TOOL_CALLS, CODE_EXECUTION_TIMEOUT
+
+# Engine pool running the code executions of all agents
+CODE_EXECUTION_POOL = "code_execution"
 
 class AliceAgent(BaseModel):
     id: Optional[str] = Field(default=None, description="The ID of the agent", alias="_id")
@@ -28,7 +34,9 @@ class AliceAgent(BaseModel):
     has_functions: bool = Field(default=False, description="Whether the agent can use functions")
     has_code_exec: bool = Field(default=False, description="Whether the agent can execute code")
     max_consecutive_auto_reply: int = Field(default=10, description="The maximum number of consecutive auto replies")
+    max_concurrent_tool_calls: int = Field(default=AGENT_MAX_CONCURRENT_TOOL_CALLS, description="The maximum number of tool calls of a reply run at the same time")
     model_config = ConfigDict(protected_namespaces=(), json_encoders = {ObjectId: str})
+    _tool_registry: Optional[Tuple[Dict[str, Callable], List[ToolFunction], ToolRegistry]] = PrivateAttr(default=None)
 
     @property
     def llm_model(self) -> AliceModel:
@@ -48,17 +56,7 @@ class AliceAgent(BaseModel):
 
             LOGGER.info(f"Calling generate_response_with_api_engine")
             LOGGER.debug(f'Agent: {self.model_dump()}')
-            chat_model = self.llm_model
-            response_ref: References = await api_manager.generate_response_with_api_engine(
-                api_type=ApiType.LLM_MODEL,
-                model=chat_model,
-                messages=self._prepare_messages_for_api(messages),
-                system=self.system_message.format_prompt(),
-                tool_choice='auto' if self.has_functions else 'none',
-                tools=tools_list,
-                temperature=0.7,
-                max_tokens=4096 # TODO: Make this configurable
-            )
+            response_ref: References = await api_manager.generate_response_with_api_engine(**self._llm_request_kwargs(messages, tools_list))
 
             if not response_ref or not response_ref.messages[0]:
                 LOGGER.error("No response from API")
@@ -73,35 +71,8 @@ class AliceAgent(BaseModel):
             response = response_ref.messages[0]
             LOGGER.debug(f"API response: {response.model_dump()}")
             
-            new_messages = []
-            content = response.content if response.content else "Using tools" if response.tool_calls else "No response from API"
-            tool_calls = response.tool_calls if self.has_functions else None
-            
-            LOGGER.debug(f"Content: {content}")
-            LOGGER.debug(f"Tool calls: {tool_calls}")
-            
-            new_messages.append(MessageDict(
-                role="assistant",
-                content=content,
-                generated_by="llm",
-                tool_calls=tool_calls,
-                type=ContentType.TEXT,
-                assistant_name=self.name,
-                creation_metadata=response.creation_metadata
-            ))
-
-            if tool_calls and self.has_functions:
-                LOGGER.debug("Processing tool calls")
-                tool_messages = await self._process_tool_calls(tool_calls, tool_map, tools_list)
-                if tool_messages:
-                    new_messages.extend(tool_messages)
-            
-            if self.has_code_exec:
-                LOGGER.debug("Processing code execution")
-                code_messages, _ = await self._process_code_execution(new_messages)
-                if code_messages:
-                    new_messages.extend(code_messages)
-            
+            new_messages = [self._build_assistant_message(response)]
+            new_messages.extend(await self._process_response_actions(new_messages, tool_map, tools_list))
             return new_messages
 
         except Exception as e:
@@ -110,113 +81,206 @@ class AliceAgent(BaseModel):
             LOGGER.error(f"Error in agent.generating response: {str(e)}")
             raise
         
-    async def _process_tool_calls(self, tool_calls: List[ToolCall] = [], tool_map: Dict[str, Callable] = {}, tools_list: List[ToolFunction] = []) -> List[MessageDict]:
-        tool_messages: List[MessageDict] = []
-        for tool_call in tool_calls:
-            tool_call_id = tool_call.id
-            function_name = tool_call.function.name
-            arguments_str = tool_call.function.arguments
-            
-            try:
-                arguments = json.loads(arguments_str)
-            except json.JSONDecodeError:
-                error_msg = f"Error decoding JSON arguments: {arguments_str}"
-                tool_messages.append(MessageDict(
-                    role="tool",
-                    content=error_msg,
-                    generated_by="tool",
-                    step=function_name,
-                    type=ContentType.TEXT
-                ))
-                continue
-
-            if function_name not in tool_map:
-                tool_messages.append(MessageDict(
-                    role="tool",
-                    content=f"Error: Tool '{function_name}' not found",
-                    generated_by="tool",
-                    step=function_name,
-                    type=ContentType.TEXT
-                ))
-                continue
-            
-            tool_function = next((tool for tool in (ensure_tool_function(tool) for tool in tools_list) if tool.function.name == function_name), None)
-            if not tool_function:
-                tool_messages.append(MessageDict(
-                    role="tool",
-                    content=f"Error: Tool function '{function_name}' not found in tools list",
-                    generated_by="tool",
-                    step=function_name,
-                    type=ContentType.TEXT
-                ))
-                continue
-            
-            valid_inputs, error_message = self._validate_tool_inputs(ensure_tool_function(tool_function), arguments)
-            if not valid_inputs:
-                tool_messages.append(MessageDict(
-                    role="tool",
-                    content=f"Error in tool '{function_name}': {error_message}",
-                    generated_by="tool",
-                    step=function_name,
-                    type=ContentType.TEXT
-                ))
-                continue
-            
-            try:
-                result = await tool_map[function_name](**arguments)
-                task_result = result if isinstance(result, TaskResponse) else None
-                tool_messages.append(MessageDict(
-                    role="tool",
-                    content=str(result),
-                    generated_by="tool",
-                    step=function_name,
-                    tool_call_id=tool_call_id,
-                    type=ContentType.TASK_RESULT if task_result else ContentType.TEXT,
-                    references=References(task_responses=[task_result] if task_result else None),
-                ))
-            except Exception as e:
-                tool_messages.append(MessageDict(
-                    role="tool",
-                    content=f"Error executing tool '{function_name}': {str(e)}",
-                    generated_by="tool",
-                    step=function_name,
-                    type=ContentType.TEXT
-                ))
+    async def stream_response(self, api_manager: APIManager, messages: List[MessageDict], tool_map: Dict[str, Callable] = {}, tools_list: List[ToolFunction] = [], recursion_depth: int = 0) -> AsyncIterator[StreamEvent]:
+        """
+        Streaming counterpart of generate_response.
+
+        Forwards the model's text deltas (and tool calls, if the agent has functions) as they
+        arrive, then yields a 'message' event for the assistant message and for each tool or
+        code execution result, in the same order generate_response would return them.
+        """
+        if recursion_depth >= self.max_consecutive_auto_reply:
+            LOGGER.info("Max recursion depth reached")
+            yield StreamEvent(type="message", message=MessageDict(
+                role="assistant",
+                content="Maximum recursion depth reached. Terminating response generation.",
+                generated_by="llm",
+                type="text",
+                assistant_name=self.name
+            ))
+            return
+
+        response: Optional[MessageDict] = None
+        async for event in api_manager.stream_response_with_api_engine(**self._llm_request_kwargs(messages, tools_list)):
+            if event.type == "message":
+                response = event.message
+            elif event.type == "delta" or (event.type == "tool_call" and self.has_functions):
+                yield event
+
+        if not response:
+            LOGGER.error("No response from API")
+            yield StreamEvent(type="message", message=MessageDict(
+                role="assistant",
+                content="No response from API",
+                generated_by="llm",
+                type="text",
+                assistant_name=self.name
+            ))
+            return
+
+        new_messages = [self._build_assistant_message(response)]
+        yield StreamEvent(type="message", message=new_messages[0])
+        for message in await self._process_response_actions(new_messages, tool_map, tools_list):
+            yield StreamEvent(type="message", message=message)
+
+    def _llm_request_kwargs(self, messages: List[MessageDict], tools_list: List[ToolFunction] = []) -> Dict[str, Any]:
+        return dict(
+            api_type=ApiType.LLM_MODEL,
+            model=self.llm_model,
+            messages=self._prepare_messages_for_api(messages),
+            system=self.system_message.format_prompt(),
+            tool_choice='auto' if self.has_functions else 'none',
+            tools=tools_list,
+            temperature=0.7,
+            max_tokens=4096 # TODO: Make this configurable
+        )
+
+    def _build_assistant_message(self, response: MessageDict) -> MessageDict:
+        content = response.content if response.content else "Using tools" if response.tool_calls else "No response from API"
+        tool_calls = response.tool_calls if self.has_functions else None
         
-        return tool_messages
-    
-    def _validate_tool_inputs(self, tool_function: ToolFunction, arguments: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
-        required_params = tool_function.function.parameters.required
-        properties = tool_function.function.parameters.properties
-
-        # Map string type names to Python types
-        type_map = {
-            "string": str,
-            "integer": int,
-            "number": float,
-            "boolean": bool,
-            "array": list,
-            "object": dict
-        }
+        LOGGER.debug(f"Content: {content}")
+        LOGGER.debug(f"Tool calls: {tool_calls}")
+        
+        return MessageDict(
+            role="assistant",
+            content=content,
+            generated_by="llm",
+            tool_calls=tool_calls,
+            type=ContentType.TEXT,
+            assistant_name=self.name,
+            creation_metadata=response.creation_metadata
+        )
 
-        for param in required_params:
-            if param not in arguments:
-                return False, f"Missing required parameter: {param}"
+    async def _process_response_actions(self, new_messages: List[MessageDict], tool_map: Dict[str, Callable] = {}, tools_list: List[ToolFunction] = []) -> List[MessageDict]:
+        """Run the tool calls and code blocks of the assistant's reply and return the resulting messages."""
+        action_messages: List[MessageDict] = []
+        tool_calls = new_messages[0].tool_calls
+        if tool_calls and self.has_functions:
+            LOGGER.debug("Processing tool calls")
+            tool_messages = await self._process_tool_calls(tool_calls, tool_map, tools_list)
+            if tool_messages:
+                action_messages.extend(tool_messages)
+        
+        if self.has_code_exec:
+            LOGGER.debug("Processing code execution")
+            code_messages, _ = await self._process_code_execution(new_messages + action_messages)
+            if code_messages:
+                action_messages.extend(code_messages)
+        return action_messages
 
-        for param, value in arguments.items():
-            if param not in properties:
-                return False, f"Unexpected parameter: {param}"
-            
-            expected_type = properties[param].type
-            python_type = type_map.get(expected_type)
-            
-            if python_type is None:
-                return False, f"Unknown type '{expected_type}' for parameter '{param}'"
-            
-            if not isinstance(value, python_type):
-                return False, f"Invalid type for parameter '{param}'. Expected {expected_type}, got {type(value).__name__}"
+    async def _process_tool_calls(self, tool_calls: List[ToolCall] = [], tool_map: Dict[str, Callable] = {}, tools_list: List[ToolFunction] = []) -> List[MessageDict]:
+        """
+        Run the tool calls of a reply concurrently, at most `max_concurrent_tool_calls` at a time,
+        and return their messages in the order of the tool calls.
+        """
+        registry = self.get_tool_registry(tool_map, tools_list)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_tool_calls))
+
+        async def run(tool_call: ToolCall) -> MessageDict:
+            async with semaphore:
+                return await self._process_tool_call(tool_call, registry)
+
+        if len(tool_calls) == 1:
+            return [await self._process_tool_call(tool_calls[0], registry)]
+        return list(await asyncio.gather(*(run(tool_call) for tool_call in tool_calls)))
+
+    def get_tool_registry(self, tool_map: Dict[str, Callable], tools_list: List[ToolFunction]) -> ToolRegistry:
+        """
+        The ToolRegistry of a tool map and tools list. Chats and tasks pass the same objects on every
+        turn, so the registry is built once and reused while they stay the same.
+        """
+        cached = self._tool_registry
+        if cached is None or cached[0] is not tool_map or cached[1] is not tools_list:
+            cached = self._tool_registry = (tool_map, tools_list, ToolRegistry.from_tools(tools_list, tool_map))
+        return cached[2]
+
+    async def _process_tool_call(self, tool_call: ToolCall, registry: ToolRegistry) -> MessageDict:
+        tool_call_id = tool_call.id
+        function_name = tool_call.function.name
+        arguments_str = tool_call.function.arguments
+        
+        try:
+            arguments = json.loads(arguments_str)
+        except json.JSONDecodeError:
+            error_msg = f"Error decoding JSON arguments: {arguments_str}"
+            return MessageDict(
+                role="tool",
+                content=error_msg,
+                generated_by="tool",
+                step=function_name,
+                tool_call_id=tool_call_id,
+                type=ContentType.TEXT
+            )
 
-        return True, None
+        if function_name not in registry.tool_map:
+            return MessageDict(
+                role="tool",
+                content=f"Error: Tool '{function_name}' not found",
+                generated_by="tool",
+                step=function_name,
+                tool_call_id=tool_call_id,
+                type=ContentType.TEXT
+            )
+        
+        tool = registry.get(function_name)
+        if not tool:
+            return MessageDict(
+                role="tool",
+                content=f"Error: Tool function '{function_name}' not found in tools list",
+                generated_by="tool",
+                step=function_name,
+                tool_call_id=tool_call_id,
+                type=ContentType.TEXT
+            )
+        
+        valid_inputs, error_message = tool.validator(arguments)
+        if not valid_inputs:
+            return MessageDict(
+                role="tool",
+                content=f"Error in tool '{function_name}': {error_message}",
+                generated_by="tool",
+                step=function_name,
+                tool_call_id=tool_call_id,
+                type=ContentType.TEXT
+            )
+        
+        # Task callables carry the timeout of their task (see AliceTask.get_function)
+        timeout = getattr(tool.function, "timeout", None)
+        try:
+            result = await asyncio.wait_for(tool.function(**arguments), timeout)
+            task_result = result if isinstance(result, TaskResponse) else None
+            return MessageDict(
+                role="tool",
+                content=str(result),
+                generated_by="tool",
+                step=function_name,
+                tool_call_id=tool_call_id,
+                type=ContentType.TASK_RESULT if task_result else ContentType.TEXT,
+                references=References(task_responses=[task_result] if task_result else None),
+            )
+        except asyncio.TimeoutError:
+            LOGGER.warning(f"Tool '{function_name}' timed out after {timeout}s")
+            return MessageDict(
+                role="tool",
+                content=f"Error executing tool '{function_name}': timed out after {timeout} seconds",
+                generated_by="tool",
+                step=function_name,
+                tool_call_id=tool_call_id,
+                type=ContentType.TEXT
+            )
+        except Exception as e:
+            return MessageDict(
+                role="tool",
+                content=f"Error executing tool '{function_name}': {str(e)}",
+                generated_by="tool",
+                step=function_name,
+                tool_call_id=tool_call_id,
+                type=ContentType.TEXT
+            )
+    
+    def _validate_tool_inputs(self, tool_function: ToolFunction, arguments: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        return compile_validator(tool_function)(arguments)
     
     def collect_code_blocs(self, messages: List[MessageDict]) -> List[Tuple[str, str]]:
         LOGGER.debug(f"Entering collect_code_blocs with {len(messages)} messages")
@@ -237,8 +301,12 @@ class AliceAgent(BaseModel):
         LOGGER.debug(f"Total code blocs collected: {len(code_blocs)}")
         return code_blocs
 
-    async def _process_code_execution(self, messages: List[MessageDict]) -> Tuple[List[MessageDict], Dict]:
-        
+    async def _process_code_execution(self, messages: List[MessageDict], timeout: Optional[float] = None) -> Tuple[List[MessageDict], Dict]:
+        """
+        Run the code blocs of the messages, merged per language, and return one tool message per language.
+
+        The languages run concurrently, each bounded by `timeout` seconds (CODE_EXECUTION_TIMEOUT by default).
+        """
         code_blocs = self.collect_code_blocs(messages)
         if not code_blocs:
             LOGGER.warning(f'No code blocs found')
@@ -252,21 +320,21 @@ class AliceAgent(BaseModel):
                 code_by_lang[lang] = []
             code_by_lang[lang].append(code)
 
-        executed_messages = []
-        for lang, codes in code_by_lang.items():
-            if not lang or not isinstance(lang, str) or not isinstance(code, str): pass
+        async def execute(lang: str, codes: List[str]) -> MessageDict:
             # Merge code blocs for each language
             merged_code = "\n\n".join(codes)
-            exit_code, logs = self._execute_code_in_docker(merged_code, lang)
-            executed_messages.append(MessageDict(
+            exit_code, logs = await self._execute_code_in_docker(merged_code, lang, timeout)
+            return MessageDict(
                 role="tool",
                 content=f"Language: {lang}\nExit Code: {exit_code}\nOutput:\n{logs}",
                 generated_by="tool",
                 step="code_execution",
                 type=ContentType.TEXT, 
                 references=References(string_outputs=[merged_code, lang])
-            ))
-        return executed_messages, code_by_lang
+            )
+
+        executed_messages = await asyncio.gather(*(execute(lang, codes) for lang, codes in code_by_lang.items()))
+        return list(executed_messages), code_by_lang
 
     def _extract_code_blocs(self, content: str) -> List[Tuple[str, str]]:
         # Improved regex pattern
@@ -283,13 +351,29 @@ class AliceAgent(BaseModel):
         LOGGER.debug(f"Extracted {len(code_blocs)} code blocs")
         return code_blocs
 
-    def _execute_code_in_docker(self, code: str, lang: str) -> Tuple[int, str]:
+    async def _execute_code_in_docker(self, code: str, lang: str, timeout: Optional[float] = None) -> Tuple[int, str]:
+        """
+        Run code in a sandbox container without blocking the event loop.
+
+        The execution runs in the code execution pool and is abandoned after `timeout` seconds, or
+        when the calling task is cancelled; its container is then killed.
+        """
         if not code or not lang:
             return 1, "Invalid code or language"
+        timeout = timeout or CODE_EXECUTION_TIMEOUT
         LOGGER.info(f"Executing code in {lang if lang else ''} - Code: \n{code}")
+        job = SandboxJob()
+        execute = functools.partial(run_code, code, lang, timeout=timeout, log_level=LOG_LEVEL, job=job)
         try:
-            logs, exit_code = run_code(code, lang, log_level=LOG_LEVEL)
+            logs, exit_code = await run_blocking(CODE_EXECUTION_POOL, execute, timeout=timeout)
             return exit_code, logs
+        except asyncio.TimeoutError:
+            job.cancel()
+            LOGGER.warning(f"Code execution in {lang} timed out after {timeout} seconds")
+            return 1, f"Execution exceeded {timeout} seconds"
+        except asyncio.CancelledError:
+            job.cancel()
+            raise
         except Exception as e:
             LOGGER.error(f"Error executing code: {e}")
             return 1, str(e)
@@ -344,6 +428,41 @@ class AliceAgent(BaseModel):
         
         return gen_messages, start_messages
     
+    async def stream_chat(self, api_manager: APIManager, messages: Optional[List[MessageDict]] = [], initial_message: Optional[str] = None, max_turns: int = 1, tool_map: Dict[str, Callable] = {}, tools_list: List[ToolFunction] = []) -> AsyncIterator[StreamEvent]:
+        """
+        Streaming counterpart of chat: runs the same turns, yielding each turn's stream events.
+        Every generated message is yielded as a 'message' event; errors end the stream with
+        an error message, as in chat.
+        """
+        start_messages = messages if messages else []
+        if initial_message:
+            start_messages.append(MessageDict(role="user", content=initial_message))
+        all_messages = start_messages.copy()
+
+        for turn in range(max_turns):
+            try:
+                new_messages = []
+                async for event in self.stream_response(api_manager, all_messages, tool_map, tools_list, recursion_depth=turn):
+                    if event.type == "message":
+                        new_messages.append(event.message)
+                    yield event
+                all_messages.extend(new_messages)
+
+                if any("TERMINATE" in msg.content for msg in new_messages):
+                    break
+            except Exception as e:
+                error_message = f"Error in agent chat occurred during turn {turn + 1}: {str(e)}"
+                LOGGER.error(error_message)
+                LOGGER.error(f"Traceback: {traceback.format_exc()}")
+                yield StreamEvent(type="message", message=MessageDict(
+                    role="assistant",
+                    content=error_message,
+                    generated_by="system",
+                    type=ContentType.TEXT,
+                    assistant_name=self.name
+                ))
+                break
+
     async def generate_vision_response(self, api_manager: APIManager, file_references: List[FileReference], prompt: str) -> MessageDict:
         vision_model = self.models[ModelType.VISION] or api_manager.get_api_by_type(ApiType.IMG_VISION).default_model
         if not vision_model:
@@ -406,7 +525,7 @@ class AliceAgent(BaseModel):
             raise ValueError("No speech generated by the API")
         return refs.files[0]
     
-    async def generate_embeddings(self, api_manager: APIManager, input: Union[str, List[str]]) -> FileContentReference:
+    async def generate_embeddings(self, api_manager: APIManager, input: Union[str, List[str]]) -> EmbeddingReference:
         embeddings_model = self.models[ModelType.EMBEDDINGS] or api_manager.get_api_by_type(ApiType.EMBEDDINGS).default_model
         if not embeddings_model:
             raise ValueError("No embeddings model available for the agent or in the API manager")
@@ -421,34 +540,37 @@ class AliceAgent(BaseModel):
         return refs.files[0]
 
     def _prepare_messages_for_api(self, messages: List[MessageDict]) -> List[Dict[str, Any]]:
-        prepared_messages = []
-        for msg in messages:
-            prepared_msg = {
-                "role": msg.role,
-                "content": str(msg)
-            }
-            
-            # Include file content using the get_content_string method
-            if msg.references and msg.references.files:
-                file_contents = []
-                for ref in msg.references.files:
-                    try:
-                        content = ref.get_content_string()
-                        file_contents.append(f"File: {ref.filename}\nContent: {content}\n")
-                    except Exception as e:
-                        LOGGER.error(f"Error getting file content for {ref}: {str(e)}")
-                
-                if file_contents:
-                    prepared_msg["content"] += "\n\nAttached Files:\n" + "\n".join(file_contents)
-            
-            if msg.tool_calls:
-                prepared_msg["tool_calls"] = [tool_call.model_dump() for tool_call in msg.tool_calls]
-            if msg.tool_call_id:
-                prepared_msg["tool_call_id"] = str(msg.tool_call_id)
+        """Render the messages in the API format; unchanged messages are rendered once and then served from the render cache."""
+        render_cache = get_message_render_cache()
+        model = self.llm_model
+        family = model.api_name if model else None
+        return [render_cache.render(msg, family, self._render_message_for_api) for msg in messages]
+
+    def _render_message_for_api(self, msg: MessageDict) -> Dict[str, Any]:
+        prepared_msg = {
+            "role": msg.role,
+            "content": str(msg)
+        }
+        
+        # Include file content using the get_content_string method
+        if msg.references and msg.references.files:
+            file_contents = []
+            for ref in msg.references.files:
+                try:
+                    content = ref.get_content_string()
+                    file_contents.append(f"File: {ref.filename}\nContent: {content}\n")
+                except Exception as e:
+                    LOGGER.error(f"Error getting file content for {ref}: {str(e)}")
             
-            prepared_messages.append(prepared_msg)
+            if file_contents:
+                prepared_msg["content"] += "\n\nAttached Files:\n" + "\n".join(file_contents)
+        
+        if msg.tool_calls:
+            prepared_msg["tool_calls"] = [tool_call.model_dump() for tool_call in msg.tool_calls]
+        if msg.tool_call_id:
+            prepared_msg["tool_call_id"] = str(msg.tool_call_id)
         
-        return prepared_messages
+        return prepared_msg
     
     async def transcribe_file(self, file_ref: FileReference, api_manager: APIManager) -> MessageDict:
         """
@@ -0,0 +1,118 @@
+import hashlib, os
+from collections import OrderedDict
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, Optional, Callable, Tuple, Hashable
+from workflow.core.data_structures import MessageDict
+from workflow.util.const import MESSAGE_RENDER_CACHE_SIZE
+
+class MessageRenderCache(BaseModel):
+    """
+    Memoizes the conversion of MessageDicts to the provider message format.
+
+    Rendering a message calls str(message), which walks its references and re-reads the
+    content of attached files. Rendered messages are cached under two keys, each combined with
+    the model family so providers can be rendered differently:
+    - the message object itself, checked against a cheap signature of its fields, so the
+      messages of a chat() loop are rendered once and looked up in O(1) on later turns;
+    - a hash of the message's serialized content, so equal messages rebuilt from the
+      database on the next request are not rendered again either.
+
+    Files referenced by path are read when a message is rendered, so both keys also include the
+    modification time and size of those files: a message is rendered again once a file it
+    references changes on disk.
+
+    Both levels are bounded LRUs of `max_entries`. Callers receive a shallow copy of the cached
+    dict, which they are free to modify.
+
+    Attributes:
+        max_entries (int): Maximum number of rendered messages kept per level.
+    """
+    max_entries: int = Field(MESSAGE_RENDER_CACHE_SIZE, description="Maximum number of rendered messages kept per level")
+    _by_identity: "OrderedDict[Tuple[int, Hashable], Tuple[MessageDict, Tuple, Dict[str, Any]]]" = PrivateAttr(default_factory=OrderedDict)
+    _by_content: "OrderedDict[Tuple[str, Tuple, Hashable], Dict[str, Any]]" = PrivateAttr(default_factory=OrderedDict)
+    _metrics: Dict[str, int] = PrivateAttr(default_factory=lambda: {"identity_hits": 0, "content_hits": 0, "misses": 0})
+
+    def render(self, message: MessageDict, family: Optional[Hashable], render: Callable[[MessageDict], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return the provider format of a message, rendering it with `render` on a cache miss.
+
+        Args:
+            message (MessageDict): The message to render.
+            family (Optional[Hashable]): The model family the message is rendered for, e.g. the api_name.
+            render (Callable[[MessageDict], Dict[str, Any]]): Converts a message to the provider format.
+
+        Returns:
+            Dict[str, Any]: A copy of the rendered message.
+        """
+        identity_key = (id(message), family)
+        files = self._file_states(message.references)
+        signature = self._signature(message) + files
+        entry = self._by_identity.get(identity_key)
+        # The entry holds the message itself, so its id cannot have been reused by another object
+        if entry is not None and entry[0] is message and entry[1] == signature:
+            self._by_identity.move_to_end(identity_key)
+            self._metrics["identity_hits"] += 1
+            return {**entry[2]}
+
+        content_key = (self._content_hash(message), files, family)
+        rendered = self._by_content.get(content_key)
+        if rendered is not None:
+            self._by_content.move_to_end(content_key)
+            self._metrics["content_hits"] += 1
+        else:
+            rendered = render(message)
+            self._metrics["misses"] += 1
+            self._put(self._by_content, content_key, rendered)
+        self._put(self._by_identity, identity_key, (message, signature, rendered))
+        return {**rendered}
+
+    @staticmethod
+    def _signature(message: MessageDict) -> Tuple:
+        """Fields of a message that change when it is edited, without walking its references."""
+        references = message.references
+        return (
+            message.role, message.content, message.type, message.step, message.generated_by, message.assistant_name,
+            message.tool_call_id, id(message.tool_calls), len(message.tool_calls or ()),
+            id(references), len(references) if references is not None else 0,
+        )
+
+    @classmethod
+    def _file_states(cls, references: Any) -> Tuple:
+        """(path, mtime, size) of the files referenced by path in `references`, at any depth."""
+        if references is None:
+            return ()
+        states = []
+        for file in references.files or ():
+            if file.storage_path and not getattr(file, "content", None):
+                try:
+                    stat = os.stat(file.storage_path)
+                    states.append((file.storage_path, stat.st_mtime_ns, stat.st_size))
+                except OSError:
+                    states.append((file.storage_path, None, None))
+        for item in (references.messages or []) + (references.task_responses or []):
+            states.extend(cls._file_states(item.references))
+        return tuple(states)
+
+    @staticmethod
+    def _content_hash(message: MessageDict) -> str:
+        data = message.model_dump_json(exclude={"id", "creation_metadata"})
+        return hashlib.blake2b(data.encode("utf-8", "replace"), digest_size=16).hexdigest()
+
+    def _put(self, cache: OrderedDict, key: Hashable, value: Any):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._metrics, "identity_entries": len(self._by_identity), "content_entries": len(self._by_content)}
+
+    def clear(self):
+        self._by_identity.clear()
+        self._by_content.clear()
+
+MESSAGE_RENDER_CACHE = MessageRenderCache()
+
+def get_message_render_cache() -> MessageRenderCache:
+    """Return the process-wide cache of rendered messages."""
+    return MESSAGE_RENDER_CACHE
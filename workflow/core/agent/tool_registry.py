@@ -0,0 +1,114 @@
+from pydantic import BaseModel, Field, PrivateAttr, ConfigDict
+from typing import Dict, Any, List, Optional, Callable, Tuple, Union, Hashable
+from workflow.core.data_structures import ToolFunction, ensure_tool_function
+
+# JSON schema type names mapped to the Python types accepted for them
+TYPE_MAP = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict
+}
+
+ToolValidator = Callable[[Dict[str, Any]], Tuple[bool, Optional[str]]]
+
+def compile_validator(tool_function: ToolFunction) -> ToolValidator:
+    """
+    Build the argument validator of a tool once: the required parameters and the Python type of
+    each property are resolved up front, so validating a call is a few set and dict lookups.
+
+    The validator returns (True, None) for valid arguments, or (False, error message).
+    """
+    parameters = tool_function.function.parameters
+    required = tuple(parameters.required)
+    expected = {name: (definition.type, TYPE_MAP.get(definition.type)) for name, definition in parameters.properties.items()}
+
+    def validate(arguments: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        for param in required:
+            if param not in arguments:
+                return False, f"Missing required parameter: {param}"
+        for param, value in arguments.items():
+            if param not in expected:
+                return False, f"Unexpected parameter: {param}"
+            expected_type, python_type = expected[param]
+            if python_type is None:
+                return False, f"Unknown type '{expected_type}' for parameter '{param}'"
+            if not isinstance(value, python_type):
+                return False, f"Invalid type for parameter '{param}'. Expected {expected_type}, got {type(value).__name__}"
+        return True, None
+    return validate
+
+class RegisteredTool(BaseModel):
+    """A tool ready to be called: its definition, its callable and its compiled argument validator."""
+    tool_function: ToolFunction = Field(..., description="The definition of the tool")
+    function: Callable = Field(..., description="The callable running the tool")
+    validator: ToolValidator = Field(..., description="The compiled argument validator")
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+class ToolRegistry(BaseModel):
+    """
+    The tools available to an agent, resolved once per set of functions.
+
+    Holds a name -> RegisteredTool dict for the agent, and the tool definitions as ToolFunctions
+    and as serialized schemas for the API engines, so neither the task functions nor their
+    schemas are rebuilt on every response. Chats and agent tasks keep their registry until
+    their function set, identified by `version`, changes.
+
+    Attributes:
+        version (Hashable): Identifies the function set the registry was built from.
+    """
+    version: Hashable = Field(None, description="Identifies the function set the registry was built from")
+    _tools: Dict[str, RegisteredTool] = PrivateAttr(default_factory=dict)
+    _tool_map: Dict[str, Callable] = PrivateAttr(default_factory=dict)
+    _tool_functions: List[ToolFunction] = PrivateAttr(default_factory=list)
+    _schemas: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+
+    @classmethod
+    def from_tools(cls, tools_list: Optional[List[Union[ToolFunction, Dict[str, Any]]]], tool_map: Optional[Dict[str, Callable]], version: Hashable = None) -> "ToolRegistry":
+        """Build a registry from tool definitions and a name -> callable map."""
+        registry = cls(version=version)
+        registry._tool_map = dict(tool_map or {})
+        registry._tool_functions = [ensure_tool_function(tool) for tool in tools_list or []]
+        registry._schemas = [tool.model_dump() for tool in registry._tool_functions]
+        for tool_function in registry._tool_functions:
+            name = tool_function.function.name
+            if name in registry._tool_map and name not in registry._tools:
+                registry._tools[name] = RegisteredTool(
+                    tool_function=tool_function,
+                    function=registry._tool_map[name],
+                    validator=compile_validator(tool_function)
+                )
+        return registry
+
+    @classmethod
+    def from_tasks(cls, tasks: List[Any], api_manager: Any) -> "ToolRegistry":
+        """Build a registry from AliceTasks, calling get_function once per task."""
+        tools_list, tool_map = [], {}
+        for task in tasks:
+            function_details = task.get_function(api_manager=api_manager)
+            tools_list.append(function_details["tool_function"])
+            tool_map.update(function_details["function_map"])
+        return cls.from_tools(tools_list, tool_map, version=cls.tasks_version(tasks, api_manager))
+
+    @staticmethod
+    def tasks_version(tasks: List[Any], api_manager: Any) -> Hashable:
+        """The version of a function set: the task objects, their names and the API manager their callables use."""
+        return (id(api_manager),) + tuple((id(task), getattr(task, "task_name", None), id(getattr(task, "input_variables", None))) for task in tasks)
+
+    def get(self, name: str) -> Optional[RegisteredTool]:
+        """The registered tool of that name, if it has both a definition and a callable."""
+        return self._tools.get(name)
+
+    @property
+    def tool_map(self) -> Dict[str, Callable]:
+        return self._tool_map
+
+    @property
+    def tool_functions(self) -> List[ToolFunction]:
+        return self._tool_functions
+
+    @property
+    def schemas(self) -> List[Dict[str, Any]]:
+        return self._schemas
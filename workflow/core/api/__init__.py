@@ -1,8 +1,13 @@
 from .api import API 
-from .api_manager import APIManager
-from .engines import ArxivSearchAPI, ExaSearchAPI, GoogleSearchAPI, RedditSearchAPI, WikipediaSearchAPI, APIEngine, LLMEngine, LLMAnthropic, VisionModelEngine, ImageGenerationEngine, AnthropicVisionEngine, OpenAISpeechToTextEngine, OpenAIAdvancedSpeechToTextEngine, OpenAITextToSpeechEngine, OpenAIEmbeddingsEngine, GoogleGraphEngine
+from .api_manager import APIManager, BalancingPolicy
+from .client_registry import ClientRegistry, get_client_registry
+from .response_cache import ResponseCache, get_response_cache
+from .search_cache import SearchCache, get_search_cache
+from .rate_limiter import ProviderLimiter, RateLimiterRegistry, get_rate_limiters
+from .api_stats import ApiCallStats, ApiStatsRegistry, get_api_stats
+from .engines import ArxivSearchAPI, ExaSearchAPI, GoogleSearchAPI, RedditSearchAPI, WikipediaSearchAPI, MetaSearchAPI, APIEngine, LLMEngine, LLMAnthropic, VisionModelEngine, ImageGenerationEngine, AnthropicVisionEngine, OpenAISpeechToTextEngine, OpenAIAdvancedSpeechToTextEngine, OpenAITextToSpeechEngine, OpenAIEmbeddingsEngine, GoogleGraphEngine, EmbeddingBatcher, get_embedding_batcher, EnginePool, EngineExecutor, get_engine_executor, run_blocking
 
-__all__ = ["API", "APIManager", "ArxivSearchAPI", "ExaSearchAPI", "GoogleSearchAPI", "RedditSearchAPI", 
-           "WikipediaSearchAPI", "APIEngine", "LLMEngine", "LLMAnthropic", "ImageGenerationEngine", 
+__all__ = ["API", "APIManager", "BalancingPolicy", "ClientRegistry", "get_client_registry", "ResponseCache", "get_response_cache", "SearchCache", "get_search_cache", "ProviderLimiter", "RateLimiterRegistry", "get_rate_limiters", "ApiCallStats", "ApiStatsRegistry", "get_api_stats", "ArxivSearchAPI", "ExaSearchAPI", "GoogleSearchAPI", "RedditSearchAPI", 
+           "WikipediaSearchAPI", "MetaSearchAPI", "APIEngine", "LLMEngine", "LLMAnthropic", "ImageGenerationEngine", 
            "VisionModelEngine", "AnthropicVisionEngine", "OpenAISpeechToTextEngine", "OpenAIAdvancedSpeechToTextEngine", 
-           "OpenAITextToSpeechEngine", "OpenAIEmbeddingsEngine", "GoogleGraphEngine"]
\ No newline at end of file
+           "OpenAITextToSpeechEngine", "OpenAIEmbeddingsEngine", "GoogleGraphEngine", "EmbeddingBatcher", "get_embedding_batcher", "EnginePool", "EngineExecutor", "get_engine_executor", "run_blocking"]
\ No newline at end of file
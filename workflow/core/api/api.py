@@ -41,13 +41,16 @@ class API(BaseModel):
             model = self.default_model
         LOGGER.debug(f'model: {model}')
         LOGGER.debug(f'api self: {self}')
-        return ModelConfig( 
-            temperature=model.temperature, 
+        return ModelConfig(
+            api_name=self.api_name,
+            temperature=model.temperature,
             use_cache=model.use_cache,
+            seed=model.seed,
             api_key=self.api_config.get("api_key"),
             base_url=self.api_config.get("base_url"),
             model=model.model_name if self.api_name != ApiName.LM_STUDIO else model.id,
             ctx_size=model.ctx_size,
+            model_format=model.model_format,
         )
 
     def get_api_data(self, model: Optional[AliceModel] = None) -> Union[Dict[str, Any], ModelConfig]:
@@ -1,10 +1,18 @@
-from pydantic import BaseModel
-from typing import Dict, Any, Union, Optional
+import asyncio, random
+from enum import Enum
+from pydantic import BaseModel, PrivateAttr
+from typing import Dict, Any, Union, Optional, List, Tuple, Hashable, AsyncIterator
 from workflow.core.model import AliceModel
 from workflow.core.api.api import API
-from workflow.core.data_structures import References, ApiType, ApiName, ModelConfig, ModelApis
-from workflow.util import LOGGER
+from workflow.core.data_structures import References, ApiType, ApiName, ModelConfig, ModelApis, SearchApis, StreamEvent
+from workflow.util import LOGGER, est_messages_token_count, est_token_count
 from workflow.core.api.engines import APIEngine, ApiEngineMap
+from workflow.core.api.client_registry import ClientRegistry, get_client_registry
+from workflow.core.api.response_cache import ResponseCache, get_response_cache
+from workflow.core.api.search_cache import SearchCache, get_search_cache
+from workflow.core.api.rate_limiter import RateLimiterRegistry, get_rate_limiters
+from workflow.core.api.api_stats import ApiStatsRegistry, get_api_stats
+from workflow.util.const import API_HEDGING_ENABLED, API_HEDGE_DEFAULT_DELAY, API_HEDGE_MIN_SAMPLES, API_BALANCING_POLICY
 
 def get_api_engine(api_type: ApiType, api_name: ApiName) -> type[APIEngine]:
     """
@@ -24,6 +32,36 @@ def get_api_engine(api_type: ApiType, api_name: ApiName) -> type[APIEngine]:
         return ApiEngineMap[api_type][api_name]
     except KeyError:
         raise ValueError(f"No API engine found for type {api_type} and name {api_name}")
+
+class BalancingPolicy(str, Enum):
+    """How APIManager picks between several eligible API entries."""
+    FIRST = 'first'
+    ROUND_ROBIN = 'round_robin'
+    LEAST_OUTSTANDING = 'least_outstanding'
+    WEIGHTED = 'weighted'
+
+# API engines are stateless, so a single instance per engine class is shared by every APIManager.
+_ENGINE_INSTANCES: Dict[Any, APIEngine] = {}
+
+def get_api_engine_instance(api_type: ApiType, api_name: ApiName) -> APIEngine:
+    """
+    Get the shared instance of the API engine for the given API type and name.
+
+    Args:
+        api_type (ApiType): The type of the API.
+        api_name (ApiName): The name of the API.
+
+    Returns:
+        APIEngine: The reusable API engine instance.
+
+    Raises:
+        ValueError: If no matching API engine is found.
+    """
+    engine_class = get_api_engine(api_type, api_name)
+    engine = _ENGINE_INSTANCES.get(engine_class)
+    if engine is None:
+        engine = _ENGINE_INSTANCES[engine_class] = engine_class()
+    return engine
     
 class APIManager(BaseModel):
     """
@@ -33,10 +71,64 @@ class APIManager(BaseModel):
     configurations. It supports different types of APIs, including LLM (Language
     Model) APIs and search APIs.
 
+    API lookups are served from an index of the active APIs by (api_type, api_name),
+    built lazily and invalidated whenever an API is added or its health / active state
+    changes through the manager. Model configurations are cached per (API, model).
+    Responses of models with `use_cache` are served from the shared ResponseCache, and
+    every call goes through the concurrency / rate limiter of its provider credentials.
+
+    With `hedge_requests`, an LLM request still running after the API's rolling p95
+    latency is duplicated to another healthy API entry of the same provider; the first
+    answer wins and the other request is cancelled. A failing request fails over the same way.
+
     Attributes:
         apis (Dict[str, API]): A dictionary storing API objects, keyed by their names.
+        hedge_requests (bool): Whether to hedge slow LLM requests across eligible APIs.
+        balancing_policy (BalancingPolicy): How to pick between several eligible, healthy APIs:
+            the first one, round-robin, least outstanding requests, or weighted by observed
+            latency and error rate.
     """
     apis: Dict[str, API] = {}
+    hedge_requests: bool = API_HEDGING_ENABLED
+    balancing_policy: BalancingPolicy = API_BALANCING_POLICY
+    _api_index: Optional[Dict[Tuple[ApiType, Optional[ApiName]], List[API]]] = PrivateAttr(default=None)
+    _indexed_count: int = PrivateAttr(default=0)
+    _candidates: Dict[Tuple[ApiType, Optional[ApiName]], List[API]] = PrivateAttr(default_factory=dict)
+    _model_configs: Dict[Tuple[int, Hashable], ModelConfig] = PrivateAttr(default_factory=dict)
+
+    @property
+    def client_registry(self) -> ClientRegistry:
+        """The process-wide registry of pooled provider clients used by the API engines."""
+        return get_client_registry()
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        """The process-wide cache of responses for models with use_cache enabled."""
+        return get_response_cache()
+
+    @property
+    def search_cache(self) -> SearchCache:
+        """The process-wide cache of search results used by the search engines."""
+        return get_search_cache()
+
+    @property
+    def rate_limiters(self) -> RateLimiterRegistry:
+        """The process-wide per-provider concurrency and rate limiters."""
+        return get_rate_limiters()
+
+    @property
+    def api_stats(self) -> ApiStatsRegistry:
+        """The process-wide latency and error statistics of every API entry."""
+        return get_api_stats()
+
+    async def warm_up_clients(self) -> int:
+        """
+        Pre-create the pooled clients for all active APIs and open a connection to each endpoint.
+
+        Returns:
+            int: The number of endpoints that were warmed.
+        """
+        return await self.client_registry.warm_up(list(self.apis.values()))
 
     def add_api(self, api: API):
         """
@@ -45,6 +137,31 @@ class APIManager(BaseModel):
             api (API): The API object to be added.
         """
         self.apis[api.id] = api
+        self.invalidate_cache()
+
+    def invalidate_cache(self):
+        """Drop the API index, candidate lookups and cached model configurations."""
+        self._api_index = None
+        self._candidates.clear()
+        self._model_configs.clear()
+
+    def _get_index(self) -> Dict[Tuple[ApiType, Optional[ApiName]], List[API]]:
+        """
+        Return the index of active APIs, keyed by (api_type, None) for every API of a type
+        and by (api_type, api_name) for a specific provider. Lists keep insertion order.
+        """
+        if self._api_index is None or self._indexed_count != len(self.apis):
+            self.invalidate_cache()
+            index: Dict[Tuple[ApiType, Optional[ApiName]], List[API]] = {}
+            for api in self.apis.values():
+                if not api.is_active:
+                    continue
+                api_type = ApiType(api.api_type)
+                index.setdefault((api_type, None), []).append(api)
+                index.setdefault((api_type, api.api_name), []).append(api)
+            self._api_index = index
+            self._indexed_count = len(self.apis)
+        return self._api_index
 
     def get_api(self, api_name: str) -> Optional[API]:
         """
@@ -63,7 +180,8 @@ class APIManager(BaseModel):
         """
         Retrieve an API by its type, optionally considering a specific model.
 
-        This method handles both LLM and non-LLM API types differently.
+        This method handles both LLM and non-LLM API types differently. When several API
+        entries are eligible, one is picked according to the manager's balancing policy.
 
         Args:
             api_type (ApiType): The type of API to retrieve.
@@ -74,12 +192,18 @@ class APIManager(BaseModel):
         """
         if isinstance(api_type, str):
             api_type = ApiType(api_type)
-        if api_type in ModelApis:
-            return self._retrieve_model_api(api_type, model)
-        else:
-            return self._retrieve_non_model_api(api_type)
+        index = self._get_index()
+        key = (api_type, model.api_name if model and api_type in ModelApis else None)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            if api_type in ModelApis:
+                candidates = self._model_api_candidates(api_type, model, index)
+            else:
+                candidates = self._non_model_api_candidates(api_type, index)
+            self._candidates[key] = candidates
+        return self._select_api(key, candidates)
     
-    def _retrieve_model_api(self, api_type: ApiType = ApiType.LLM_MODEL, model: Optional[AliceModel] = None) -> Optional[API]:
+    def _retrieve_model_api(self, api_type: ApiType = ApiType.LLM_MODEL, model: Optional[AliceModel] = None, index: Optional[Dict] = None) -> Optional[API]:
         """
         Internal method to retrieve an API that uses models.
 
@@ -88,42 +212,124 @@ class APIManager(BaseModel):
 
         Args:
             model (Optional[AliceModel]): The model to match against.
+            index (Optional[Dict]): The active API index; built if not provided.
 
         Returns:
             Optional[API]: The matching or default Model API if found, None otherwise.
         """
-        available_apis = [api for api in self.apis.values() if ApiType(api.api_type) == api_type and api.is_active]
+        candidates = self._model_api_candidates(api_type, model, index)
+        return self._select_api((api_type, model.api_name if model else None), candidates)
+    
+    def _retrieve_non_model_api(self, api_type: ApiType, index: Optional[Dict] = None) -> Optional[API]:
+        """
+        Internal method to retrieve a non-LLM API by type.
+
+        Args:
+            api_type (ApiType): The type of non-LLM API to retrieve.
+            index (Optional[Dict]): The active API index; built if not provided.
+
+        Returns:
+            Optional[API]: An active API matching the given type, or None if not found.
+        """
+        return self._select_api((api_type, None), self._non_model_api_candidates(api_type, index))
+
+    def _model_api_candidates(self, api_type: ApiType, model: Optional[AliceModel] = None, index: Optional[Dict] = None) -> List[API]:
+        """
+        The active APIs that can serve a model: those matching the model's api_name, or,
+        if there are none or no model is given, those with a default model.
+        """
+        index = index if index is not None else self._get_index()
+        available_apis = index.get((api_type, None), [])
         
         if not available_apis:
             LOGGER.info(f'No {api_type} APIs found.')
             LOGGER.info(f'APIs: {self.apis}')
-            return None
+            return []
         
         if model:
-            matching_api = next((api for api in available_apis if api.api_name == model.api_name and api.is_active), None)
-            if matching_api:
-                return matching_api
+            matching_apis = index.get((api_type, model.api_name))
+            if matching_apis:
+                return matching_apis
             else:
                 LOGGER.error(f'No matching API found for model: {model} with api_name: {model.api_name}')
 
-        # If no matching API found or no model specified, use the first available LLM API
-        default_api = next((api for api in available_apis if api.default_model), None)
-        if default_api:
-            return default_api
+        # If no matching API found or no model specified, use the available APIs with a default model
+        return [api for api in available_apis if api.default_model]
 
-        return None
-    
-    def _retrieve_non_model_api(self, api_type: ApiType) -> Optional[API]:
+    def _non_model_api_candidates(self, api_type: ApiType, index: Optional[Dict] = None) -> List[API]:
+        """The active APIs of a non-model API type."""
+        index = index if index is not None else self._get_index()
+        return index.get((api_type, None), [])
+
+    def _select_api(self, key: Hashable, candidates: List[API]) -> Optional[API]:
         """
-        Internal method to retrieve a non-LLM API by type.
+        Pick one of the eligible APIs according to the balancing policy. APIs marked unhealthy
+        are skipped, unless all of them are.
 
         Args:
-            api_type (ApiType): The type of non-LLM API to retrieve.
+            key (Hashable): Identifies the group of candidates, for round-robin rotation.
+            candidates (List[API]): The eligible APIs, in index order.
+
+        Returns:
+            Optional[API]: The selected API, or None if there are no candidates.
+        """
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        healthy = [api for api in candidates if api.health_status != "unhealthy"] or candidates
+        policy = BalancingPolicy(self.balancing_policy)
+        if policy == BalancingPolicy.FIRST or len(healthy) == 1:
+            return healthy[0]
+        if policy == BalancingPolicy.ROUND_ROBIN:
+            return healthy[self.api_stats.rotate(key) % len(healthy)]
+        if policy == BalancingPolicy.LEAST_OUTSTANDING:
+            return min(healthy, key=lambda api: self.api_stats.get(api).outstanding)
+        # Weighted: favour fast APIs with few errors; APIs without latency samples get the average latency
+        stats = [self.api_stats.get(api) for api in healthy]
+        known = [latency for latency in (stat.mean_latency() for stat in stats) if latency]
+        default_latency = sum(known) / len(known) if known else 1.0
+        weights = [max(0.05, 1.0 - stat.error_rate) / (stat.mean_latency() or default_latency) for stat in stats]
+        return random.choices(healthy, weights=weights)[0]
+
+    def _get_api_data(self, api: API, model: Optional[AliceModel] = None) -> Union[Dict[str, Any], ModelConfig]:
+        """
+        Return the API data for an API, reusing the cached ModelConfig for model APIs.
+
+        Args:
+            api (API): The API to get the data for.
+            model (Optional[AliceModel]): The model to use; the API's default model if not provided.
 
         Returns:
-            Optional[API]: The first active API matching the given type, or None if not found.
+            Union[Dict[str, Any], ModelConfig]: The API data or ModelConfig object.
         """
-        return next((api for api in self.apis.values() if api.api_type == api_type and api.is_active), None)
+        if api.is_active and ApiType(api.api_type) == ApiType.META_SEARCH:
+            return self._get_meta_search_data(api)
+        if not api.is_active or ApiType(api.api_type) not in ModelApis:
+            return api.get_api_data(model)
+        model = model or api.default_model
+        key = (id(api), self._model_key(model))
+        model_config = self._model_configs.get(key)
+        if model_config is None:
+            model_config = self._model_configs[key] = api.get_api_data(model)
+        return model_config
+
+    def _get_meta_search_data(self, api: API) -> Dict[str, Any]:
+        """
+        Return the API data of a meta search API: its own config, with the API data of the
+        selected API of each active search type under "engines", keyed on the API type.
+        """
+        engines = {}
+        for api_type in SearchApis:
+            search_api = self.get_api_by_type(api_type)
+            if search_api is not None:
+                engines[api_type.value] = search_api.get_api_data()
+        return {**api.get_api_data(), "engines": engines}
+
+    @staticmethod
+    def _model_key(model: Optional[AliceModel]) -> Hashable:
+        """The fields of a model that determine the ModelConfig built from it."""
+        if model is None:
+            return None
+        return (model.id, model.model_name, model.temperature, model.seed, model.use_cache, model.ctx_size)
         
     def retrieve_api_data(self, api_type: ApiType, model: Optional[AliceModel] = None) -> Union[Dict[str, Any], ModelConfig]:
         """
@@ -142,7 +348,7 @@ class APIManager(BaseModel):
         api = self.get_api_by_type(api_type, model)
         if api is None:
             raise ValueError(f"No active API found for type: {api_type}")
-        return api.get_api_data(model)
+        return self._get_api_data(api, model)
 
     async def generate_response_with_api_engine(self, api_type: ApiType, model: Optional[AliceModel] = None, **kwargs) -> References:
         """
@@ -168,14 +374,28 @@ class APIManager(BaseModel):
             if not api:
                 raise ValueError(f"No API found for type: {api_type}")
             LOGGER.debug(f"API found: {api}")
-            api_data = api.get_api_data(model)
+            api_data = self._get_api_data(api, model)
             
-            api_engine = get_api_engine(api_type, api.api_name)()
+            api_engine = get_api_engine_instance(api_type, api.api_name)
 
             # Validate inputs against the API engine's input_variables
             self._validate_inputs(api_engine, kwargs)
 
-            return await api_engine.generate_api_response(api_data, **kwargs)
+            cache_key = None
+            if self.response_cache.is_cacheable(api_type, api_data):
+                cache_key = self.response_cache.make_key(api_type, api_data, kwargs)
+                cached = await self.response_cache.get(cache_key)
+                if cached is not None:
+                    LOGGER.debug(f"Response cache hit for {api.api_name} / {api_data.model}")
+                    return cached
+
+            if self.hedge_requests and ApiType(api_type) == ApiType.LLM_MODEL:
+                response = await self._generate_with_hedging(api, api_type, model, api_data, kwargs)
+            else:
+                response = await self._call_api(api, api_type, api_data, kwargs)
+            if cache_key:
+                await self.response_cache.set(cache_key, response)
+            return response
 
         except Exception as e:
             import traceback
@@ -183,6 +403,138 @@ class APIManager(BaseModel):
             LOGGER.error(traceback.format_exc())
             raise ValueError(f"Error generating response with API engine: {str(e)}")
 
+    async def _call_api(self, api: API, api_type: ApiType, api_data: Union[Dict[str, Any], ModelConfig], kwargs: Dict[str, Any]) -> References:
+        """Call an API's engine through its provider limiter, recording the call's latency and outcome."""
+        api_engine = get_api_engine_instance(api_type, api.api_name)
+        limiter = self.rate_limiters.get_limiter(api.api_name, api.api_config)
+        async with self.api_stats.track(api):
+            return await limiter.run(lambda: api_engine.generate_api_response(api_data, **kwargs), tokens=self._estimate_tokens(kwargs))
+
+    async def _generate_with_hedging(self, api: API, api_type: ApiType, model: Optional[AliceModel], api_data: ModelConfig, kwargs: Dict[str, Any]) -> References:
+        """
+        Call the primary API and, if it has not answered within its hedge delay or has failed,
+        send the same request to the next eligible API. Returns the first successful response
+        and cancels the other request.
+
+        The backup is another entry of the same provider when there is one, serving the same
+        model; otherwise an API of another provider (e.g. Groq for OpenAI), serving its own
+        default model.
+        """
+        backups = self._hedge_candidates(api_type, api, model)
+        if not backups:
+            return await self._call_api(api, api_type, api_data, kwargs)
+        backup = backups[0]
+        backup_model = model if backup.api_name == api.api_name else None
+
+        tasks = {asyncio.create_task(self._call_api(api, api_type, api_data, kwargs))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(api))
+            if not done or next(iter(done)).exception() is not None:
+                LOGGER.info(f"Hedging request to API {api.name} with API {backup.name}")
+                tasks.add(asyncio.create_task(self._call_api(backup, api_type, self._get_api_data(backup, backup_model), kwargs)))
+
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # Mark the loser's error as retrieved
+
+    def _hedge_candidates(self, api_type: ApiType, api: API, model: Optional[AliceModel] = None) -> List[API]:
+        """
+        Other active, not unhealthy APIs of the same type as `api` that can serve its request:
+        entries of the same provider first, then APIs of other providers whose default model
+        is of the same model type.
+        """
+        candidates = [
+            candidate for candidate in self._get_index().get((ApiType(api_type), None), [])
+            if candidate is not api and candidate.health_status != "unhealthy"
+        ]
+        model_type = (model or api.default_model).model_type if (model or api.default_model) else None
+        same_provider = [candidate for candidate in candidates if candidate.api_name == api.api_name]
+        other_providers = [
+            candidate for candidate in candidates
+            if candidate.api_name != api.api_name and candidate.default_model is not None
+            and (model_type is None or candidate.default_model.model_type == model_type)
+        ]
+        return same_provider + other_providers
+
+    def _hedge_delay(self, api: API) -> float:
+        """Seconds to wait on an API before hedging: its rolling p95 latency once enough calls are known."""
+        stats = self.api_stats.get(api)
+        if stats.samples < API_HEDGE_MIN_SAMPLES:
+            return API_HEDGE_DEFAULT_DELAY
+        return stats.percentile(0.95)
+
+    async def stream_response_with_api_engine(self, api_type: ApiType, model: Optional[AliceModel] = None, **kwargs) -> AsyncIterator[StreamEvent]:
+        """
+        Select the appropriate API engine, validate inputs, and stream its response.
+
+        Works like generate_response_with_api_engine, but yields the engine's stream events
+        (text deltas, tool calls and the final message) as they are produced. Engines
+        without native streaming yield their complete messages once generated.
+
+        Args:
+            api_type (ApiType): The type of API to use.
+            model (Optional[AliceModel]): The preferred model to use, if applicable.
+            **kwargs: Additional arguments to pass to the API engine.
+
+        Yields:
+            StreamEvent: The events of the engine's response.
+
+        Raises:
+            ValueError: If no API is found or if there's an error in generating the response.
+        """
+        LOGGER.debug(f"Chat stream_response_with_api_engine called with api_type: {api_type}, model: {model}, kwargs: {kwargs}")
+        try:
+            api = self.get_api_by_type(api_type, model)
+            if not api:
+                raise ValueError(f"No API found for type: {api_type}")
+            api_data = self._get_api_data(api, model)
+            api_engine = get_api_engine_instance(api_type, api.api_name)
+            self._validate_inputs(api_engine, kwargs)
+
+            cache_key = None
+            if self.response_cache.is_cacheable(api_type, api_data):
+                cache_key = self.response_cache.make_key(api_type, api_data, kwargs)
+                cached = await self.response_cache.get(cache_key)
+                if cached is not None:
+                    for message in cached.messages or []:
+                        yield StreamEvent(type="message", message=message)
+                    return
+
+            streamed_messages = []
+            limiter = self.rate_limiters.get_limiter(api.api_name, api.api_config)
+            async with self.api_stats.track(api):
+                async for event in limiter.stream(lambda: api_engine.stream_api_response(api_data, **kwargs), tokens=self._estimate_tokens(kwargs)):
+                    if event.type == "message":
+                        streamed_messages.append(event.message)
+                    yield event
+            if cache_key and streamed_messages:
+                await self.response_cache.set(cache_key, References(messages=streamed_messages))
+
+        except Exception as e:
+            import traceback
+            LOGGER.error(f"Error streaming response with API engine: {str(e)}")
+            LOGGER.error(traceback.format_exc())
+            raise ValueError(f"Error streaming response with API engine: {str(e)}")
+
+    @staticmethod
+    def _estimate_tokens(kwargs: Dict[str, Any]) -> int:
+        """Rough token cost of a request for the token budget: prompt estimate plus max_tokens."""
+        if not kwargs.get("messages"):
+            return 0
+        tokens = est_messages_token_count(kwargs["messages"], kwargs.get("tools")) + est_token_count(kwargs.get("system") or "")
+        return tokens + (kwargs.get("max_tokens") or 0)
+
     def _validate_inputs(self, api_engine: APIEngine, kwargs: Dict[str, Any]):
         """
         Validate the input parameters against the API engine's expected inputs.
@@ -0,0 +1,110 @@
+import asyncio, math, time
+from collections import deque
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, Optional, Deque, AsyncIterator, Hashable
+from workflow.util.const import API_STATS_WINDOW
+
+class ApiCallStats(BaseModel):
+    """
+    Rolling call statistics of a single API entry: recent latencies, an exponentially
+    weighted error rate and the number of requests currently outstanding.
+    """
+    window: int = Field(API_STATS_WINDOW, description="Number of recent latencies kept")
+    error_decay: float = Field(0.1, description="Weight of the latest outcome in the error rate")
+    outstanding: int = Field(0, description="Requests currently in flight")
+    calls: int = Field(0, description="Completed calls")
+    errors: int = Field(0, description="Failed calls")
+    error_rate: float = Field(0.0, description="Exponentially weighted error rate")
+    _latencies: Deque[float] = PrivateAttr()
+
+    def model_post_init(self, __context: Any):
+        self._latencies = deque(maxlen=self.window)
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def record(self, latency: float, success: bool):
+        self.calls += 1
+        if success:
+            self._latencies.append(latency)
+        else:
+            self.errors += 1
+        self.error_rate += self.error_decay * ((0.0 if success else 1.0) - self.error_rate)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-quantile (0-1) of the recent latencies, or None without samples."""
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    def mean_latency(self) -> Optional[float]:
+        return sum(self._latencies) / len(self._latencies) if self._latencies else None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "outstanding": self.outstanding,
+            "mean_latency": self.mean_latency(),
+            "p95_latency": self.percentile(0.95),
+        }
+
+class ApiStatsRegistry(BaseModel):
+    """
+    Call statistics of every API entry in the process, keyed by API id (or name when the
+    API has no id), plus round-robin counters. Used by APIManager to hedge slow requests
+    and to balance load.
+    """
+    _stats: Dict[str, ApiCallStats] = PrivateAttr(default_factory=dict)
+    _rotations: Dict[Hashable, int] = PrivateAttr(default_factory=dict)
+
+    @staticmethod
+    def key(api: Any) -> str:
+        return str(api.id or f"{getattr(api.api_name, 'value', api.api_name)}:{api.name}")
+
+    def get(self, api: Any) -> ApiCallStats:
+        key = self.key(api)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = ApiCallStats()
+        return stats
+
+    @asynccontextmanager
+    async def track(self, api: Any) -> AsyncIterator[ApiCallStats]:
+        """
+        Count a request as outstanding while it runs and record its latency and outcome.
+        A cancelled request (e.g. the loser of a hedge) records its elapsed time as a latency,
+        since the call took at least that long, and does not count as an error.
+        """
+        stats = self.get(api)
+        stats.outstanding += 1
+        start = time.monotonic()
+        success = False
+        try:
+            yield stats
+            success = True
+        except asyncio.CancelledError:
+            success = True
+            raise
+        finally:
+            stats.outstanding -= 1
+            stats.record(time.monotonic() - start, success)
+
+    def rotate(self, group: Hashable) -> int:
+        """Return the next round-robin counter of a group of APIs."""
+        counter = self._rotations.get(group, 0)
+        self._rotations[group] = counter + 1
+        return counter
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {key: stats.summary() for key, stats in self._stats.items()}
+
+API_STATS = ApiStatsRegistry()
+
+def get_api_stats() -> ApiStatsRegistry:
+    """Return the process-wide API call statistics shared by all APIManagers."""
+    return API_STATS
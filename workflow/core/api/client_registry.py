@@ -0,0 +1,170 @@
+import asyncio, httpx, cohere
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient as OpenAIHttpxClient
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient as AnthropicHttpxClient
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, List, Optional, Tuple, Literal
+from workflow.core.data_structures import ApiName, ModelConfig
+from workflow.util import LOGGER
+from workflow.util.const import API_CLIENT_MAX_CONNECTIONS, API_CLIENT_MAX_KEEPALIVE, API_CLIENT_KEEPALIVE_EXPIRY
+
+ClientKind = Literal["openai", "anthropic", "cohere", "http"]
+ClientKey = Tuple[ClientKind, Optional[str], Optional[str], Optional[str]]
+
+# API names whose engines talk to Anthropic / Cohere SDKs. Every other model API with a
+# base_url is served by an OpenAI-compatible client. Gemini engines use the genai SDK.
+ANTHROPIC_APIS = {ApiName.ANTHROPIC, ApiName.ANTHROPIC_VISION}
+COHERE_APIS = {ApiName.COHERE}
+UNPOOLED_APIS = {ApiName.GEMINI, ApiName.GEMINI_VISION, ApiName.GEMINI_STT, ApiName.GEMINI_EMBEDDINGS, ApiName.GEMINI_IMG_GEN}
+
+class ClientRegistry(BaseModel):
+    """
+    Holds long-lived provider clients so API engines reuse pooled keep-alive connections
+    instead of paying a TLS handshake on every call.
+
+    Clients are keyed by (client kind, api_name, base_url, api_key). A single registry is
+    shared by every APIManager in the process (see `get_client_registry`); the FastAPI
+    lifespan pre-warms it at startup and closes it on shutdown.
+
+    Attributes:
+        max_connections (int): Maximum number of concurrent connections per client.
+        max_keepalive_connections (int): Maximum number of idle connections kept alive per client.
+        keepalive_expiry (float): Seconds an idle connection is kept in the pool.
+    """
+    max_connections: int = Field(API_CLIENT_MAX_CONNECTIONS, description="Maximum number of concurrent connections per client")
+    max_keepalive_connections: int = Field(API_CLIENT_MAX_KEEPALIVE, description="Maximum number of idle keep-alive connections per client")
+    keepalive_expiry: float = Field(API_CLIENT_KEEPALIVE_EXPIRY, description="Seconds an idle connection is kept in the pool")
+    _clients: Dict[ClientKey, Any] = PrivateAttr(default_factory=dict)
+    _http_clients: Dict[ClientKey, httpx.AsyncClient] = PrivateAttr(default_factory=dict)
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def openai_client(self, api_data: ModelConfig) -> AsyncOpenAI:
+        """Return the pooled AsyncOpenAI client for an OpenAI-compatible endpoint."""
+        base_url = api_data.base_url.rstrip('/') if api_data.base_url else None
+        key: ClientKey = ("openai", self._name(api_data.api_name), base_url, api_data.api_key)
+        if key not in self._clients:
+            http_client = OpenAIHttpxClient(limits=self.limits)
+            self._http_clients[key] = http_client
+            # Retries are handled by the APIManager's rate limiter (see rate_limiter.py)
+            self._clients[key] = AsyncOpenAI(api_key=api_data.api_key, base_url=base_url, http_client=http_client, max_retries=0)
+        return self._clients[key]
+
+    def anthropic_client(self, api_data: ModelConfig) -> AsyncAnthropic:
+        """Return the pooled AsyncAnthropic client for the given credentials."""
+        key: ClientKey = ("anthropic", self._name(api_data.api_name), api_data.base_url, api_data.api_key)
+        if key not in self._clients:
+            http_client = AnthropicHttpxClient(limits=self.limits)
+            self._http_clients[key] = http_client
+            self._clients[key] = AsyncAnthropic(api_key=api_data.api_key, base_url=api_data.base_url, http_client=http_client, max_retries=0)
+        return self._clients[key]
+
+    def cohere_client(self, api_data: ModelConfig) -> cohere.AsyncClient:
+        """Return the pooled Cohere async client for the given credentials."""
+        key: ClientKey = ("cohere", self._name(api_data.api_name), api_data.base_url, api_data.api_key)
+        if key not in self._clients:
+            http_client = httpx.AsyncClient(limits=self.limits, timeout=httpx.Timeout(300))
+            self._http_clients[key] = http_client
+            client_kwargs = {"base_url": api_data.base_url} if api_data.base_url else {}
+            # Retries are handled by the APIManager's rate limiter (see rate_limiter.py)
+            self._clients[key] = cohere.AsyncClient(api_data.api_key, httpx_client=http_client, max_retries=0, **client_kwargs)
+        return self._clients[key]
+
+    def http_client(self, name: Optional[str] = None, base_url: Optional[str] = None, timeout: float = 30) -> httpx.AsyncClient:
+        """
+        Return a pooled plain httpx client, for engines that call REST endpoints directly.
+
+        Args:
+            name (Optional[str]): Namespace for the client, usually the engine or api name.
+            base_url (Optional[str]): Base URL the client is bound to, if any.
+            timeout (float): Default request timeout in seconds.
+        """
+        key: ClientKey = ("http", name, base_url, None)
+        if key not in self._clients:
+            client_kwargs = {"base_url": base_url} if base_url else {}
+            http_client = httpx.AsyncClient(limits=self.limits, timeout=httpx.Timeout(timeout), **client_kwargs)
+            self._http_clients[key] = http_client
+            self._clients[key] = http_client
+        return self._clients[key]
+
+    def client_for_api(self, api_name: ApiName, api_config: Optional[Dict[str, Any]]) -> Optional[Any]:
+        """
+        Return (creating if needed) the pooled client an API configuration will use, or None
+        if the API is not served by a pooled SDK client.
+        """
+        api_config = api_config or {}
+        if api_name in UNPOOLED_APIS or not api_config.get("api_key"):
+            return None
+        api_data = ModelConfig(model="", api_name=api_name, api_key=api_config.get("api_key"), base_url=api_config.get("base_url"))
+        if api_name in ANTHROPIC_APIS:
+            return self.anthropic_client(api_data)
+        if api_name in COHERE_APIS:
+            return self.cohere_client(api_data)
+        if api_data.base_url:
+            return self.openai_client(api_data)
+        return None
+
+    async def warm_up(self, apis: List[Any]) -> int:
+        """
+        Create clients for the given active APIs and open one connection to each endpoint,
+        so the first real request skips DNS, TCP and TLS setup.
+
+        Args:
+            apis (List[API]): The API configurations to pre-warm.
+
+        Returns:
+            int: The number of endpoints that were warmed.
+        """
+        targets: Dict[str, httpx.AsyncClient] = {}
+        for api in apis:
+            if not getattr(api, "is_active", False):
+                continue
+            api_config = api.api_config or {}
+            client = self.client_for_api(api.api_name, api_config)
+            if client is None:
+                continue
+            http_client = next(self._http_clients[key] for key, value in self._clients.items() if value is client)
+            base_url = api_config.get("base_url") or str(getattr(client, "base_url", "") or "")
+            if base_url and base_url not in targets:
+                targets[base_url] = http_client
+
+        async def _touch(url: str, http_client: httpx.AsyncClient) -> bool:
+            try:
+                await http_client.head(url, timeout=5)
+                return True
+            except Exception as e:
+                LOGGER.debug(f"Could not pre-warm connection to {url}: {e}")
+                return False
+
+        results = await asyncio.gather(*[_touch(url, client) for url, client in targets.items()])
+        warmed = sum(1 for result in results if result)
+        LOGGER.info(f"Pre-warmed {warmed}/{len(targets)} provider endpoints")
+        return warmed
+
+    async def aclose(self):
+        """Close every pooled client and its connections."""
+        for key, http_client in list(self._http_clients.items()):
+            try:
+                await http_client.aclose()
+            except Exception as e:
+                LOGGER.warning(f"Error closing client {key[0]}:{key[1]}: {e}")
+        self._http_clients.clear()
+        self._clients.clear()
+
+    @staticmethod
+    def _name(api_name: Optional[ApiName]) -> Optional[str]:
+        return api_name.value if isinstance(api_name, ApiName) else api_name
+
+CLIENT_REGISTRY = ClientRegistry()
+
+def get_client_registry() -> ClientRegistry:
+    """Return the process-wide client registry shared by all API engines."""
+    return CLIENT_REGISTRY
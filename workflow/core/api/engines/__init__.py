@@ -1,6 +1,7 @@
 from workflow.core.data_structures import ApiType, ApiName
 from .api_engine import APIEngine
 from .search_engine import ArxivSearchAPI, ExaSearchAPI, GoogleSearchAPI, RedditSearchAPI, WikipediaSearchAPI
+from .meta_search_engine import MetaSearchAPI
 from .llm_engine import LLMEngine
 from .anthropic_llm_engine import LLMAnthropic
 from .image_gen_engine import ImageGenerationEngine
@@ -9,6 +10,8 @@ from .anthropic_vision_engine import AnthropicVisionEngine
 from .oai_stt_engine import OpenAISpeechToTextEngine
 from .oai_timestamped_stt_engine import OpenAIAdvancedSpeechToTextEngine
 from .text_to_speech_engine import OpenAITextToSpeechEngine
+from .embedding_batcher import EmbeddingBatcher, get_embedding_batcher
+from .engine_executor import EnginePool, EngineExecutor, get_engine_executor, run_blocking
 from .embedding_engine import OpenAIEmbeddingsEngine
 from .gemini_llm_engine import GeminiLLMEngine
 from .cohere_llm_engine import CohereLLMEngine
@@ -44,6 +47,9 @@ ApiEngineMap = {
     ApiType.ARXIV_SEARCH: {
         ApiName.ARXIV_SEARCH: ArxivSearchAPI,
     },
+    ApiType.META_SEARCH: {
+        ApiName.META_SEARCH: MetaSearchAPI,
+    },
     ApiType.GOOGLE_KNOWLEDGE_GRAPH: {
         ApiName.GOOGLE_KNOWLEDGE_GRAPH: GoogleGraphEngine,
     },
@@ -75,7 +81,9 @@ ApiEngineMap = {
         ApiName.GEMINI_EMBEDDINGS: GeminiEmbeddingsEngine,
     },
 }
-__all__ = ["ArxivSearchAPI", "ExaSearchAPI", "GoogleSearchAPI", "RedditSearchAPI", "WikipediaSearchAPI", "APIEngine", "GeminiImageGenerationEngine",
+__all__ = ["ArxivSearchAPI", "ExaSearchAPI", "GoogleSearchAPI", "RedditSearchAPI", "WikipediaSearchAPI", "MetaSearchAPI", "APIEngine", "GeminiImageGenerationEngine",
            "LLMEngine", "LLMOpenAI", "LLMAnthropic", "ImageGenerationEngine", "CohereLLMEngine", "GeminiVisionEngine", "GeminiEmbeddingsEngine", "GeminiSpeechToTextEngine",
            "VisionModelEngine", "AnthropicVisionEngine", "OpenAISpeechToTextEngine", "OpenAIAdvancedSpeechToTextEngine",
-           "OpenAITextToSpeechEngine", "OpenAIEmbeddingsEngine", "GeminiLLMEngine", "CohereLLMEngine", "GoogleGraphEngine"]
\ No newline at end of file
+           "OpenAITextToSpeechEngine", "OpenAIEmbeddingsEngine", "GeminiLLMEngine", "CohereLLMEngine", "GoogleGraphEngine",
+           "EmbeddingBatcher", "get_embedding_batcher",
+           "EnginePool", "EngineExecutor", "get_engine_executor", "run_blocking"]
\ No newline at end of file
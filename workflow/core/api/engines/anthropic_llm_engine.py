@@ -1,11 +1,12 @@
 import traceback, json
-from typing import Dict, Any, List, Optional
-from anthropic import AsyncAnthropic
+from typing import Dict, Any, List, Optional, AsyncIterator
 from anthropic.types import TextBlock, ToolUseBlock, ToolParam, Message
 from workflow.core.data_structures import ToolCall, ToolCallConfig, ToolFunction
 from workflow.core.api.engines.llm_engine import LLMEngine
-from workflow.core.data_structures import MessageDict, ContentType, ModelConfig, References
+from workflow.core.api.client_registry import get_client_registry
+from workflow.core.data_structures import MessageDict, ContentType, ModelConfig, References, StreamEvent
 from workflow.util import LOGGER, est_messages_token_count, prune_messages
+from workflow.util.const import PROMPT_CACHING_ENABLED
 
 ANTHROPIC_PRICING_1k = {
     "claude-3-5-sonnet-20240620": (0.003, 0.015),
@@ -16,6 +17,10 @@ ANTHROPIC_PRICING_1k = {
     "claude-2.0": (0.008, 0.024),
     "claude-instant-1.2": (0.008, 0.024),
 }
+# Prompt caching prices, relative to the base input price: cache writes cost more, cache reads much less
+ANTHROPIC_CACHE_WRITE_MULTIPLIER = 1.25
+ANTHROPIC_CACHE_READ_MULTIPLIER = 0.1
+CACHE_CONTROL = {"type": "ephemeral"}
 
 class LLMAnthropic(LLMEngine):
     """
@@ -33,7 +38,8 @@ class LLMAnthropic(LLMEngine):
         Inherits all attributes from LLMEngine.
 
     Note:
-        This class assumes the use of Anthropic's AsyncAnthropic client and
+        This class assumes the use of Anthropic's AsyncAnthropic client (pooled
+        through the client registry) and
         follows Anthropic's API conventions for chat completions.
     """
     def adapt_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -120,18 +126,74 @@ class LLMAnthropic(LLMEngine):
         if not api_data.api_key:
             raise ValueError("Anthropic API key not found in API data")
 
-        client = AsyncAnthropic(
-            api_key=api_data.api_key, 
-            base_url=api_data.base_url
-        )
-        estimated_tokens = est_messages_token_count(messages, tools)
+        client = get_client_registry().anthropic_client(api_data)
+        api_params = self._prepare_api_params(api_data, messages, system, tools, max_tokens, tool_choice, n)
+        
+        try:
+            
+            response: Message = await client.messages.create(**api_params)
+            return References(messages=[self._build_message(response)])
+        
+        except Exception as e:
+            LOGGER.error(f"Error in Anthropic API call: {str(e)}")
+            LOGGER.error(traceback.format_exc())
+            raise
+
+    async def stream_api_response(self, api_data: ModelConfig, messages: List[Dict[str, Any]], system: Optional[str] = None, tools: Optional[List[Dict[str, Any]]] = None, max_tokens: Optional[int] = None, tool_choice: str = 'auto', n: Optional[int] = 1, **kwargs) -> AsyncIterator[StreamEvent]:
+        """
+        Stream a chat completion from Anthropic's API, yielding text deltas as they arrive.
+
+        Once the stream ends, the tool use blocks of the final message are emitted as
+        'tool_call' events, followed by the complete 'message' event.
+
+        Args:
+            api_data (ModelConfig): Configuration for the Anthropic API client.
+            messages (List[Dict[str, Any]]): List of conversation messages.
+            system (Optional[str]): System message for the conversation.
+            tools (Optional[List[Dict[str, Any]]]): List of available tools for the model.
+            max_tokens (Optional[int]): Maximum number of tokens to generate.
+            tool_choice (str): Whether to allow tool use (always 'auto' for Anthropic).
+            n (Optional[int]): Not used in Anthropic API.
+            **kwargs: Additional keyword arguments.
+
+        Yields:
+            StreamEvent: 'delta' events, then 'tool_call' events, then the final 'message' event.
+        """
+        if not api_data.api_key:
+            raise ValueError("Anthropic API key not found in API data")
+
+        client = get_client_registry().anthropic_client(api_data)
+        api_params = self._prepare_api_params(api_data, messages, system, tools, max_tokens, tool_choice, n)
+
+        try:
+            async with client.messages.stream(**api_params) as stream:
+                async for text in stream.text_stream:
+                    yield StreamEvent(type="delta", content=text)
+                response: Message = await stream.get_final_message()
+
+            msg = self._build_message(response)
+            for tool_call in msg.tool_calls or []:
+                yield StreamEvent(type="tool_call", tool_call=tool_call)
+            yield StreamEvent(type="message", message=msg)
+
+        except Exception as e:
+            LOGGER.error(f"Error in Anthropic API stream: {str(e)}")
+            LOGGER.error(traceback.format_exc())
+            raise
+
+    def _prepare_api_params(self, api_data: ModelConfig, messages: List[Dict[str, Any]], system: Optional[str] = None, tools: Optional[List[Dict[str, Any]]] = None, max_tokens: Optional[int] = None, tool_choice: str = 'auto', n: Optional[int] = 1) -> Dict[str, Any]:
+        """
+        Build the Anthropic messages parameters: prunes the messages to the model's context
+        size, adapts them to Anthropic's format and converts the tools.
+        """
+        estimated_tokens = est_messages_token_count(messages, tools, api_data.api_name, api_data.model_format)
         if estimated_tokens > api_data.ctx_size:
             LOGGER.warning(f"Estimated tokens ({estimated_tokens}) exceed context size ({api_data.ctx_size}) of model {api_data.model}. Pruning. ")
         elif estimated_tokens > 0.8 * api_data.ctx_size:
             LOGGER.warning(f"Estimated tokens ({estimated_tokens}) are over 80% of context size ({api_data.ctx_size}).")
         # Prune messages if estimated tokens exceed context size
         if estimated_tokens > api_data.ctx_size:
-            messages = prune_messages(messages, api_data.ctx_size)
+            messages = prune_messages(messages, api_data.ctx_size, api_data.api_name, api_data.model_format, tools)
 
         anthropic_tools: Optional[List[ToolParam]] = self._convert_into_tool_params(tools) if tools else None
 
@@ -149,51 +211,74 @@ class LLMAnthropic(LLMEngine):
             api_params["tools"] = anthropic_tools
             api_params["tool_choice"] = {"type": "auto"}
 
+        if PROMPT_CACHING_ENABLED:
+            self._add_cache_breakpoints(api_params)
+
         LOGGER.debug(f'API parameters: {api_params}')
-        
-        try:
-            
-            response: Message = await client.messages.create(**api_params)
-            
-            message_text = ""
-            tool_calls: Optional[List[ToolCall]] = None
-            for content in response.content:
-                if isinstance(content, TextBlock):
-                    message_text += content.text
-                elif isinstance(content, ToolUseBlock):
-                    if tool_calls is None:
-                        tool_calls = []
-                    tool_calls.append(ToolCall(
-                        id = content.id,
-                        type = "function",
-                        function = ToolCallConfig(
-                            name = content.name,
-                            arguments = json.dumps(content.input)
-                        )
-                    ))
-
-            cost = self.calculate_cost(response.usage.input_tokens, response.usage.output_tokens, response.model)
-
-            msg = MessageDict(
-                role="assistant",
-                content=message_text,
-                tool_calls=[tool_call for tool_call in tool_calls] if tool_calls else None,
-                generated_by="llm",
-                type=ContentType.TEXT,
-                creation_metadata={
-                    "model": response.model,
-                    "usage": response.usage.model_dump(),
-                    "finish_reason": response.stop_reason,
-                    "system_fingerprint": response.id,
-                    "cost": cost
+        return api_params
+
+    def _add_cache_breakpoints(self, api_params: Dict[str, Any]):
+        """
+        Mark the stable prefix of the request as cacheable, using the 4 breakpoints Anthropic allows:
+        the last tool, the system prompt, the last message, and the last message of the previous
+        turn. The cache is read up to the longest cached prefix, so on the next turn everything up
+        to this turn's last message is billed at the cache read price.
+        """
+        tools = api_params.get("tools")
+        if tools:
+            api_params["tools"] = tools[:-1] + [{**tools[-1], "cache_control": CACHE_CONTROL}]
+        if api_params.get("system"):
+            api_params["system"] = [{"type": "text", "text": api_params["system"], "cache_control": CACHE_CONTROL}]
+        messages = api_params["messages"]
+        for index in (len(messages) - 1, len(messages) - 3):
+            if index >= 0 and isinstance(messages[index].get("content"), str) and messages[index]["content"]:
+                messages[index] = {
+                    **messages[index],
+                    "content": [{"type": "text", "text": messages[index]["content"], "cache_control": CACHE_CONTROL}]
                 }
-            )
-            return References(messages=[msg])
-        
-        except Exception as e:
-            LOGGER.error(f"Error in Anthropic API call: {str(e)}")
-            LOGGER.error(traceback.format_exc())
-            raise
+
+    def _build_message(self, response: Message) -> MessageDict:
+        """
+        Convert an Anthropic Message into a MessageDict, mapping tool use blocks to ToolCalls.
+        """
+        message_text = ""
+        tool_calls: Optional[List[ToolCall]] = None
+        for content in response.content:
+            if isinstance(content, TextBlock):
+                message_text += content.text
+            elif isinstance(content, ToolUseBlock):
+                if tool_calls is None:
+                    tool_calls = []
+                tool_calls.append(ToolCall(
+                    id = content.id,
+                    type = "function",
+                    function = ToolCallConfig(
+                        name = content.name,
+                        arguments = json.dumps(content.input)
+                    )
+                ))
+
+        # input_tokens excludes the tokens read from or written to the prompt cache
+        cache_read_tokens = response.usage.cache_read_input_tokens or 0
+        cache_write_tokens = response.usage.cache_creation_input_tokens or 0
+        cost = self.calculate_cost(response.usage.input_tokens, response.usage.output_tokens, response.model, cache_read_tokens, cache_write_tokens)
+
+        return MessageDict(
+            role="assistant",
+            content=message_text,
+            tool_calls=[tool_call for tool_call in tool_calls] if tool_calls else None,
+            generated_by="llm",
+            type=ContentType.TEXT,
+            creation_metadata={
+                "model": response.model,
+                "usage": response.usage.model_dump(),
+                "finish_reason": response.stop_reason,
+                "system_fingerprint": response.id,
+                "cache_read_tokens": cache_read_tokens,
+                "cache_write_tokens": cache_write_tokens,
+                "cost": cost
+            }
+        )
         
     def _convert_into_tool_params(self, tools: List[ToolFunction]) -> List[ToolParam]:
         """
@@ -207,17 +292,20 @@ class LLMAnthropic(LLMEngine):
         """
         return [(tool if isinstance(tool, ToolFunction) else ToolFunction(**tool)).convert_to_tool_params() for tool in tools]
 
-    def calculate_cost(self, input_tokens: int, output_tokens: int, model: str) -> float:
+    def calculate_cost(self, input_tokens: int, output_tokens: int, model: str, cache_read_tokens: int = 0, cache_write_tokens: int = 0) -> float:
         """
         Calculate the cost of the API call based on Anthropic's pricing.
 
         This method uses Anthropic-specific pricing information to calculate
-        the cost of the API call.
+        the cost of the API call. Input tokens read from the prompt cache are billed at
+        a tenth of the input price, tokens written to it at 1.25 times the input price.
 
         Args:
-            input_tokens (int): Number of tokens in the input.
+            input_tokens (int): Number of uncached tokens in the input.
             output_tokens (int): Number of tokens in the output.
             model (str): The Anthropic model used for the API call.
+            cache_read_tokens (int): Number of input tokens read from the prompt cache.
+            cache_write_tokens (int): Number of input tokens written to the prompt cache.
 
         Returns:
             float: The calculated cost of the API call.
@@ -229,6 +317,8 @@ class LLMAnthropic(LLMEngine):
         if model in ANTHROPIC_PRICING_1k:
             input_cost_per_1k, output_cost_per_1k = ANTHROPIC_PRICING_1k[model]
             input_cost = (input_tokens / 1000) * input_cost_per_1k
+            input_cost += (cache_read_tokens / 1000) * input_cost_per_1k * ANTHROPIC_CACHE_READ_MULTIPLIER
+            input_cost += (cache_write_tokens / 1000) * input_cost_per_1k * ANTHROPIC_CACHE_WRITE_MULTIPLIER
             output_cost = (output_tokens / 1000) * output_cost_per_1k
             return input_cost + output_cost
         else:
@@ -1,7 +1,7 @@
 from typing import List
 from workflow.core.data_structures import get_file_content, MessageDict, ModelConfig, FileReference, References
 from workflow.core.api.engines.vision_model_engine import VisionModelEngine
-from anthropic import AsyncAnthropic
+from workflow.core.api.client_registry import get_client_registry
 
 class AnthropicVisionEngine(VisionModelEngine):
     async def generate_api_response(self, api_data: ModelConfig, file_references: List[FileReference], prompt: str, max_tokens: int = 300) -> References:
@@ -17,7 +17,7 @@ class AnthropicVisionEngine(VisionModelEngine):
         Returns:
             MessageDict: Analysis results wrapped in a MessageDict object.
         """
-        client = AsyncAnthropic(api_key=api_data.api_key)
+        client = get_client_registry().anthropic_client(api_data)
 
         content = []
         for file_ref in file_references:
@@ -1,7 +1,7 @@
 from abc import abstractmethod
 from pydantic import BaseModel, Field
-from workflow.core.data_structures import References, ApiType, FunctionParameters
-from typing import Dict, Any
+from workflow.core.data_structures import References, ApiType, FunctionParameters, StreamEvent
+from typing import Dict, Any, AsyncIterator
 
 class APIEngine(BaseModel):
     """
@@ -15,7 +15,8 @@ class APIEngine(BaseModel):
         required_api (ApiType): Specifies the type of API required for this engine.
 
     Note:
-        Subclasses must implement the generate_api_response method.
+        Subclasses must implement the generate_api_response method. Engines that support
+        incremental output also override stream_api_response.
     """
 
     input_variables: FunctionParameters = Field(..., description="This inputs this API engine takes: requires a prompt input, and optional inputs such as sort, time_filter, subreddit, and limit. Default is 'hot', 'week', 'all', and 10.")
@@ -38,4 +39,23 @@ class APIEngine(BaseModel):
         Raises:
             NotImplementedError: If the method is not implemented by a subclass.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def stream_api_response(self, api_data: Dict[str, Any], **kwargs) -> AsyncIterator[StreamEvent]:
+        """
+        Stream an API response as a sequence of events.
+
+        The default implementation waits for generate_api_response and yields each
+        resulting message as a single 'message' event. Engines that can stream from
+        their provider override this to yield 'delta' events as tokens arrive.
+
+        Args:
+            api_data (Dict[str, Any]): Configuration data for the API (e.g., API keys, endpoints).
+            **kwargs: Additional parameters specific to the API being used.
+
+        Yields:
+            StreamEvent: The events of the response, ending with the complete message(s).
+        """
+        references = await self.generate_api_response(api_data, **kwargs)
+        for message in (references.messages or []) if references else []:
+            yield StreamEvent(type="message", message=message)
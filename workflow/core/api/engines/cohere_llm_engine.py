@@ -3,6 +3,7 @@ from cohere import NonStreamedChatResponse
 from pydantic import Field
 from typing import Dict, Any, List, Optional
 from workflow.core.api.engines import APIEngine
+from workflow.core.api.client_registry import get_client_registry
 from workflow.core.data_structures import MessageDict, ContentType, ModelConfig, ApiType, References, FunctionParameters, ParameterDefinition, ToolCall
 from workflow.util import LOGGER, est_messages_token_count, prune_messages
 
@@ -57,7 +58,7 @@ class CohereLLMEngine(APIEngine):
         if not api_data.api_key:
             raise ValueError("API key not found in API data")
 
-        client = cohere.Client(api_data.api_key)
+        client = get_client_registry().cohere_client(api_data)
 
         try:
             # Prepare messages, including system message if provided
@@ -69,14 +70,14 @@ class CohereLLMEngine(APIEngine):
                 cohere_messages.append({"role": role, "message": message["content"]})
 
 
-            estimated_tokens = est_messages_token_count(cohere_messages, tools)
+            estimated_tokens = est_messages_token_count(cohere_messages, tools, api_data.api_name, api_data.model_format)
             if estimated_tokens > api_data.ctx_size:
                 LOGGER.warning(f"Estimated tokens ({estimated_tokens}) exceed context size ({api_data.ctx_size}) of model {api_data.model}. Pruning. ")
             elif estimated_tokens > 0.8 * api_data.ctx_size:
                 LOGGER.warning(f"Estimated tokens ({estimated_tokens}) are over 80% of context size ({api_data.ctx_size}).")
             # Prune messages if estimated tokens exceed context size
             if estimated_tokens > api_data.ctx_size:
-                cohere_messages = prune_messages(cohere_messages, api_data.ctx_size)
+                cohere_messages = prune_messages(cohere_messages, api_data.ctx_size, api_data.api_name, api_data.model_format, tools)
 
             # Prepare tools
             cohere_tools = []
@@ -84,7 +85,7 @@ class CohereLLMEngine(APIEngine):
                 for tool in tools:
                     cohere_tools.append(cohere.ToolV2(type='function', function=tool))
 
-            response: NonStreamedChatResponse = client.chat(
+            response: NonStreamedChatResponse = await client.chat(
                 model=api_data.model,
                 message=cohere_messages[-1]["message"],  # Last message as the current input
                 chat_history=cohere_messages[:-1],  # All previous messages as history
@@ -0,0 +1,110 @@
+import asyncio
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, List, Tuple, Callable, Awaitable, Hashable, Optional, Set
+from workflow.util import LOGGER, est_token_count
+from workflow.util.const import EMBEDDING_BATCH_WINDOW, EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_MAX_TOKENS
+
+Vectors = List[List[float]]
+EmbeddingSender = Callable[[List[str]], Awaitable[Tuple[Vectors, Dict[str, Any]]]]
+
+class _PendingBatch:
+    """Inputs collected for one provider request, and the callers waiting for their share."""
+    def __init__(self, send: EmbeddingSender):
+        self.send = send
+        self.texts: List[str] = []
+        self.tokens = 0
+        self.waiters: List[Tuple[asyncio.Future, int, int, int]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def add(self, texts: List[str], tokens: int, future: asyncio.Future):
+        start = len(self.texts)
+        self.texts.extend(texts)
+        self.tokens += tokens
+        self.waiters.append((future, start, len(self.texts), tokens))
+
+class EmbeddingBatcher(BaseModel):
+    """
+    Combines concurrent embedding calls for the same provider, credentials and model into
+    a single provider request, then splits the vectors back to each caller.
+
+    A batch is sent once `window` seconds have passed since its first input, or as soon as
+    it reaches `max_batch_size` inputs or `max_batch_tokens` estimated tokens. Usage is
+    apportioned to the callers by their share of the batch's estimated tokens.
+
+    Attributes:
+        window (float): Seconds to wait for more inputs before sending a batch.
+        max_batch_size (int): Maximum number of inputs per provider request.
+        max_batch_tokens (int): Maximum estimated tokens per provider request.
+    """
+    window: float = Field(EMBEDDING_BATCH_WINDOW, description="Seconds to wait for more inputs before sending a batch")
+    max_batch_size: int = Field(EMBEDDING_BATCH_MAX_SIZE, description="Maximum number of inputs per provider request")
+    max_batch_tokens: int = Field(EMBEDDING_BATCH_MAX_TOKENS, description="Maximum estimated tokens per provider request")
+    _pending: Dict[Hashable, _PendingBatch] = PrivateAttr(default_factory=dict)
+    _in_flight: Set[asyncio.Task] = PrivateAttr(default_factory=set)
+
+    async def embed(self, key: Hashable, texts: List[str], send: EmbeddingSender) -> Tuple[Vectors, Dict[str, Any]]:
+        """
+        Embed `texts` as part of the current batch for `key`.
+
+        Args:
+            key (Hashable): Identifies requests that can share a provider call (provider, credentials, model, options).
+            texts (List[str]): The inputs of this caller.
+            send (EmbeddingSender): Coroutine function embedding a list of inputs in one provider
+                request, returning the vectors in input order and the usage of the request.
+
+        Returns:
+            Tuple[Vectors, Dict[str, Any]]: The vectors of this caller's inputs and its share of the usage.
+        """
+        loop = asyncio.get_running_loop()
+        key = (id(loop), key)
+        tokens = sum(est_token_count(text) for text in texts)
+
+        batch = self._pending.get(key)
+        if batch and (len(batch.texts) + len(texts) > self.max_batch_size or batch.tokens + tokens > self.max_batch_tokens):
+            self._dispatch(key, batch)
+            batch = None
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(send)
+            batch.timer = loop.call_later(self.window, self._dispatch, key, batch)
+
+        future = loop.create_future()
+        batch.add(texts, tokens, future)
+        if len(batch.texts) >= self.max_batch_size or batch.tokens >= self.max_batch_tokens:
+            self._dispatch(key, batch)
+        return await future
+
+    def _dispatch(self, key: Hashable, batch: _PendingBatch):
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        if batch.timer:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._send(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    @staticmethod
+    async def _send(batch: _PendingBatch):
+        LOGGER.debug(f"Sending embedding batch of {len(batch.texts)} inputs for {len(batch.waiters)} callers")
+        try:
+            vectors, usage = await batch.send(batch.texts)
+            if len(vectors) != len(batch.texts):
+                raise ValueError(f"Expected {len(batch.texts)} embeddings, got {len(vectors)}")
+        except Exception as e:
+            for future, _, _, _ in batch.waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, start, end, tokens in batch.waiters:
+            if future.done():
+                continue
+            share = tokens / batch.tokens if batch.tokens else (end - start) / len(batch.texts)
+            caller_usage = {name: round(value * share) for name, value in usage.items() if isinstance(value, (int, float))}
+            caller_usage["batch_size"] = len(batch.texts)
+            future.set_result((vectors[start:end], caller_usage))
+
+EMBEDDING_BATCHER = EmbeddingBatcher()
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Return the process-wide embedding batcher shared by the embedding engines."""
+    return EMBEDDING_BATCHER
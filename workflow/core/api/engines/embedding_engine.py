@@ -1,9 +1,9 @@
-import base64, json
 from pydantic import Field
 from typing import List, Union
-from openai import AsyncOpenAI
-from workflow.core.data_structures import ModelConfig, ApiType, MessageDict, FileContentReference, FileType, ContentType, References, FunctionParameters, ParameterDefinition
+from workflow.core.api.client_registry import get_client_registry
+from workflow.core.data_structures import ModelConfig, ApiType, MessageDict, EmbeddingReference, ContentType, References, FunctionParameters, ParameterDefinition
 from workflow.core.api.engines.api_engine import APIEngine
+from workflow.core.api.engines.embedding_batcher import get_embedding_batcher
 from workflow.util import LOGGER, est_token_count
 
 class OpenAIEmbeddingsEngine(APIEngine):
@@ -29,38 +29,34 @@ class OpenAIEmbeddingsEngine(APIEngine):
             input (Union[str, List[str]]): The input text(s) to get embeddings for.
             model (str): The name of the embedding model to use.
         Returns:
-            MessageDict: A message dict containing the file reference for the embeddings.
+            References: A References object containing the embedding reference.
         """
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=api_data.base_url
-        )
+        client = get_client_registry().openai_client(api_data)
         # 'text-embedding-ada-002', 'text-embedding-3-small', 'text-embedding-3-large'
         model = api_data.model
-        if est_token_count(input) > api_data.ctx_size:
-            return References(messages=[MessageDict(role='system', content=f"Input text (tokens est.: {est_token_count(input)}) exceeds the maximum token limit: {api_data.ctx_size}", type=ContentType.TEXT)])
-        try:
-            response = await client.embeddings.create(
-                input=input,
-                model=model
-            )
+        texts = [input] if isinstance(input, str) else list(input)
+        # The context limit applies to each input, not to the whole request
+        est_tokens = max((est_token_count(text) for text in texts), default=0)
+        if est_tokens > api_data.ctx_size:
+            return References(messages=[MessageDict(role='system', content=f"Input text (tokens est.: {est_tokens}) exceeds the maximum token limit: {api_data.ctx_size}", type=ContentType.TEXT)])
 
-            # Extract embeddings from the response
-            embeddings = [data.embedding for data in response.data]
+        async def send(batch: List[str]):
+            response = await client.embeddings.create(input=batch, model=model)
+            return [data.embedding for data in sorted(response.data, key=lambda data: data.index)], self.get_usage(response)
 
-            # Convert embeddings to JSON and then to base64
-            embeddings_json = json.dumps(embeddings)
-            embeddings_b64 = base64.b64encode(embeddings_json.encode('utf-8')).decode('utf-8')
+        try:
+            # Concurrent calls to the same model are combined into one provider request
+            batch_key = ("openai", api_data.api_name, api_data.base_url, api_data.api_key, model)
+            embeddings, usage = await get_embedding_batcher().embed(batch_key, texts, send)
 
             creation_metadata = {
                     "model": model,
-                    "usage": self.get_usage(response)
+                    "usage": usage
                 }
-            # Create FileContentReference
-            file_reference = FileContentReference(
-                filename=f"embeddings_{model}.json",
-                type=FileType.FILE,
-                content=embeddings_b64,
+            # Pack the vectors as float32; large matrices are stored as a .npy file and referenced by path
+            file_reference = EmbeddingReference.from_vectors(
+                embeddings,
+                filename=f"embeddings_{model}",
                 transcript=MessageDict(role='user', content=input, generated_by='user', type=ContentType.TEXT, creation_metadata=creation_metadata)
             )
 
@@ -0,0 +1,179 @@
+import asyncio, contextvars, functools, time
+from concurrent.futures import ThreadPoolExecutor, Future
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, Optional, Callable, TypeVar
+from workflow.util import LOGGER
+from workflow.util.const import ENGINE_EXECUTOR_WORKERS, ENGINE_EXECUTOR_POOL_SIZES, ENGINE_EXECUTOR_TIMEOUT, ENGINE_EXECUTOR_SLOW_CALL
+
+T = TypeVar("T")
+
+class EnginePool(BaseModel):
+    """
+    A bounded thread pool for the blocking SDK calls of one engine family.
+
+    At most `max_workers` calls run at a time; further calls wait on the event loop, not in
+    the pool's queue, so a timed-out call that has not started yet is simply dropped. A call
+    that times out while running keeps its worker until the SDK returns, since threads cannot
+    be interrupted, and is counted as abandoned.
+
+    Attributes:
+        name (str): Name of the pool, used in logs and metrics.
+        max_workers (int): Maximum number of concurrent calls.
+        timeout (Optional[float]): Default timeout of a call, in seconds. None waits forever.
+    """
+    name: str = Field(..., description="Name of the pool")
+    max_workers: int = Field(ENGINE_EXECUTOR_WORKERS, description="Maximum number of concurrent calls")
+    timeout: Optional[float] = Field(ENGINE_EXECUTOR_TIMEOUT, description="Default timeout of a call, in seconds")
+    _executor: ThreadPoolExecutor = PrivateAttr()
+    _slots: asyncio.Semaphore = PrivateAttr()
+    _metrics: Dict[str, float] = PrivateAttr(default_factory=lambda: {
+        "calls": 0, "in_flight": 0, "waiting": 0, "timeouts": 0, "cancelled": 0, "abandoned": 0, "errors": 0,
+        "total_blocking_seconds": 0.0, "max_blocking_seconds": 0.0, "total_wait_seconds": 0.0
+    })
+
+    def model_post_init(self, __context: Any):
+        self.max_workers = max(1, self.max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"engine-{self.name}")
+        self._slots = asyncio.Semaphore(self.max_workers)
+
+    async def run(self, func: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+        """
+        Run a blocking function in the pool without blocking the event loop.
+
+        Args:
+            func (Callable[..., T]): The blocking function.
+            *args: Positional arguments of the function.
+            timeout (Optional[float]): Seconds to wait for the result, defaults to the pool's timeout.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            T: The result of the function.
+
+        Raises:
+            asyncio.TimeoutError: If the call does not get a worker and finish within the timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        metrics = self._metrics
+        loop = asyncio.get_running_loop()
+        queued_at = time.monotonic()
+        metrics["waiting"] += 1
+        try:
+            # The timeout covers the wait for a worker as well as the call itself
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            metrics["timeouts"] += 1
+            LOGGER.warning(f"Engine pool '{self.name}': call timed out after {timeout}s waiting for a worker")
+            raise
+        finally:
+            metrics["waiting"] -= 1
+        waited = time.monotonic() - queued_at
+        metrics["total_wait_seconds"] += waited
+        if timeout is not None:
+            timeout = max(0.0, timeout - waited)
+
+        context = contextvars.copy_context()
+        started = {}
+        def call():
+            started["at"] = time.monotonic()
+            return context.run(func, *args, **kwargs)
+
+        try:
+            future: Future = self._executor.submit(call)
+        except BaseException:
+            self._slots.release()
+            raise
+        metrics["calls"] += 1
+        metrics["in_flight"] += 1
+        # The slot is held until the worker is actually free, even if the caller gives up
+        future.add_done_callback(functools.partial(self._on_done, loop, started))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future, loop=loop), timeout)
+        except asyncio.TimeoutError:
+            metrics["timeouts"] += 1
+            self._give_up(future, started, f"timed out after {timeout}s")
+            raise
+        except asyncio.CancelledError:
+            metrics["cancelled"] += 1
+            self._give_up(future, started, "was cancelled")
+            raise
+        except Exception:
+            metrics["errors"] += 1
+            raise
+
+    def _give_up(self, future: Future, started: Dict[str, float], reason: str):
+        if future.cancel() or "at" not in started:
+            LOGGER.warning(f"Engine pool '{self.name}': call {reason} before it started")
+        else:
+            self._metrics["abandoned"] += 1
+            LOGGER.warning(f"Engine pool '{self.name}': call {reason}, its worker stays busy until the SDK returns")
+
+    def _on_done(self, loop: asyncio.AbstractEventLoop, started: Dict[str, float], _: Future):
+        try:
+            loop.call_soon_threadsafe(self._finish, started)
+        except RuntimeError:
+            # The event loop is closed, nobody is left waiting for the slot
+            pass
+
+    def _finish(self, started: Dict[str, float]):
+        metrics = self._metrics
+        metrics["in_flight"] -= 1
+        self._slots.release()
+        if "at" not in started:
+            return
+        blocked = time.monotonic() - started["at"]
+        metrics["total_blocking_seconds"] += blocked
+        metrics["max_blocking_seconds"] = max(metrics["max_blocking_seconds"], blocked)
+        if blocked >= ENGINE_EXECUTOR_SLOW_CALL:
+            LOGGER.warning(f"Engine pool '{self.name}': blocking call took {blocked:.2f}s")
+        else:
+            LOGGER.debug(f"Engine pool '{self.name}': blocking call took {blocked:.3f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Call counters, current load and blocking / waiting times of the pool."""
+        metrics = dict(self._metrics)
+        metrics["max_workers"] = self.max_workers
+        finished = metrics["calls"] - metrics["in_flight"]
+        metrics["avg_blocking_seconds"] = metrics["total_blocking_seconds"] / finished if finished else 0.0
+        return metrics
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class EngineExecutor(BaseModel):
+    """
+    Process-wide registry of EnginePools, one per engine family (e.g. 'arxiv', 'gemini'),
+    through which engines run the blocking calls of synchronous SDKs off the event loop.
+    Pool sizes default to `default_workers` and can be set per pool in `pool_sizes`
+    (ENGINE_EXECUTOR_POOL_SIZES, e.g. "arxiv=4,gemini=16").
+    """
+    default_workers: int = Field(ENGINE_EXECUTOR_WORKERS, description="Size of pools without an explicit size")
+    pool_sizes: Dict[str, int] = Field(default_factory=lambda: dict(ENGINE_EXECUTOR_POOL_SIZES), description="Size of each named pool")
+    _pools: Dict[str, EnginePool] = PrivateAttr(default_factory=dict)
+
+    def pool(self, name: str) -> EnginePool:
+        pool = self._pools.get(name)
+        if pool is None:
+            pool = self._pools[name] = EnginePool(name=name, max_workers=self.pool_sizes.get(name, self.default_workers))
+        return pool
+
+    async def run(self, pool: str, func: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+        """Run a blocking function in the named pool. See EnginePool.run."""
+        return await self.pool(pool).run(func, *args, timeout=timeout, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+    def shutdown(self):
+        for pool in self._pools.values():
+            pool.shutdown()
+        self._pools.clear()
+
+ENGINE_EXECUTOR = EngineExecutor()
+
+def get_engine_executor() -> EngineExecutor:
+    """Return the process-wide executor shared by all engines."""
+    return ENGINE_EXECUTOR
+
+async def run_blocking(pool: str, func: Callable[..., T], *args, timeout: Optional[float] = None, **kwargs) -> T:
+    """Shorthand for `get_engine_executor().run(pool, func, *args, **kwargs)`."""
+    return await get_engine_executor().run(pool, func, *args, timeout=timeout, **kwargs)
@@ -1,10 +1,10 @@
-import base64
 import json
 from pydantic import Field
 from typing import List, Union
 import google.generativeai as genai
-from workflow.core.data_structures import ModelConfig, ApiType, MessageDict, FileContentReference, FileType, ContentType, References, FunctionParameters, ParameterDefinition
+from workflow.core.data_structures import ModelConfig, ApiType, MessageDict, EmbeddingReference, ContentType, References, FunctionParameters, ParameterDefinition
 from workflow.core.api.engines.api_engine import APIEngine
+from workflow.core.api.engines.embedding_batcher import get_embedding_batcher
 from workflow.util import LOGGER
 
 class GeminiEmbeddingsEngine(APIEngine):
@@ -37,46 +37,32 @@ class GeminiEmbeddingsEngine(APIEngine):
             task_type (str): The type of task for which the embedding is being generated.
 
         Returns:
-            References: A References object containing the file reference for the embeddings.
+            References: A References object containing the embedding reference.
         """
         genai.configure(api_key=api_data.api_key)
+        texts = [input] if isinstance(input, str) else list(input)
 
-        try:
-            if isinstance(input, list):
-                # Handle multiple inputs
-                results = [genai.embed_content(
-                    model=api_data.model,
-                    content=text,
-                    task_type=task_type,
-                    title=f"Embedding of string {i}"
-                ) for i, text in enumerate(input)]
-                embeddings = [result['embedding'] for result in results]
-            else:
-                # Handle single input
-                result = genai.embed_content(
-                    model=api_data.model,
-                    content=input,
-                    task_type=task_type,
-                    title="Embedding of single string"
-                )
-                embeddings = [result['embedding']]
+        async def send(batch: List[str]):
+            # A list content is embedded in a single batch request
+            result = await genai.embed_content_async(model=api_data.model, content=batch, task_type=task_type)
+            return result['embedding'], {}
 
-            # Convert embeddings to JSON and then to base64
-            embeddings_json = json.dumps(embeddings)
-            embeddings_b64 = base64.b64encode(embeddings_json.encode('utf-8')).decode('utf-8')
+        try:
+            # Concurrent calls to the same model and task type are combined into one provider request
+            batch_key = ("gemini", api_data.api_key, api_data.model, task_type)
+            embeddings, usage = await get_embedding_batcher().embed(batch_key, texts, send)
 
             creation_metadata = {
                 "model": api_data.model,
                 "task_type": task_type,
-                # Note: Gemini API might not provide usage information like token counts
-                # You may need to implement your own token counting if required
+                # Gemini does not report token usage, only the size of the batch the input was sent in
+                "usage": usage,
             }
 
-            # Create FileContentReference
-            file_reference = FileContentReference(
-                filename=f"embeddings_{api_data.model.split('/')[-1]}.json",
-                type=FileType.FILE,
-                content=embeddings_b64,
+            # Pack the vectors as float32; large matrices are stored as a .npy file and referenced by path
+            file_reference = EmbeddingReference.from_vectors(
+                embeddings,
+                filename=f"embeddings_{api_data.model.split('/')[-1]}",
                 transcript=MessageDict(
                     role='user',
                     content=input if isinstance(input, str) else json.dumps(input),
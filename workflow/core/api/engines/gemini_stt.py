@@ -3,6 +3,7 @@ import google.generativeai as genai
 from pydantic import Field
 from workflow.core.data_structures import ModelConfig, ApiType, FileReference, MessageDict, References, FunctionParameters, ParameterDefinition
 from workflow.core.api.engines.api_engine import APIEngine
+from workflow.core.api.engines.engine_executor import run_blocking
 from workflow.util import LOGGER
 import io
 
@@ -56,11 +57,11 @@ class GeminiSpeechToTextEngine(APIEngine):
             file_obj = io.BytesIO(file_content)
             file_obj.name = file_reference.filename  # Set a name for the file-like object
 
-            # Upload the file to Gemini
-            myfile = genai.upload_file(file_obj)
+            # Upload the file to Gemini (the SDK only offers a blocking upload)
+            myfile = await run_blocking("gemini", genai.upload_file, file_obj)
 
             # Generate content based on the audio file and prompt
-            result: GenerateContentResponse = model.generate_content([myfile, prompt])
+            result: GenerateContentResponse = await model.generate_content_async([myfile, prompt])
 
             msg = MessageDict(
                 role="assistant",
@@ -58,7 +58,7 @@ class GeminiVisionEngine(APIEngine):
                 LOGGER.warning(f"Failed to process image data for file {file_ref.filename}: {str(e)}")
 
         try:
-            response = model.generate_content(
+            response = await model.generate_content_async(
                 content,
                 generation_config=genai.types.GenerationConfig(
                     max_output_tokens=max_tokens
@@ -1,7 +1,7 @@
 import re
 from pydantic import Field
 from typing import List
-from openai import AsyncOpenAI
+from workflow.core.api.client_registry import get_client_registry
 from workflow.core.data_structures import ModelConfig, ApiType, FileContentReference, MessageDict, ContentType, FileType, References, FunctionParameters, ParameterDefinition
 from workflow.core.api.engines.api_engine import APIEngine
 from workflow.util import LOGGER
@@ -67,10 +67,7 @@ class ImageGenerationEngine(APIEngine):
         Returns:
             References: Generated image information wrapped in a MessageDict object.
         """
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=api_data.base_url
-        )
+        client = get_client_registry().openai_client(api_data)
         model = api_data.model
         if not model:
             import traceback
@@ -1,11 +1,17 @@
-import traceback
-from openai import AsyncOpenAI
+import traceback, hashlib, json
 from openai.types.chat import ChatCompletion
 from pydantic import Field
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 from workflow.core.api.engines import APIEngine
+from workflow.core.api.client_registry import get_client_registry
 from workflow.util import LOGGER, est_messages_token_count, prune_messages
-from workflow.core.data_structures import MessageDict, ContentType, ModelConfig, ApiType, References, FunctionParameters, ParameterDefinition, ToolCall
+from workflow.util.const import PROMPT_CACHING_ENABLED
+from workflow.core.data_structures import MessageDict, ContentType, ModelConfig, ApiType, ApiName, References, FunctionParameters, ParameterDefinition, ToolCall, ToolCallConfig, StreamEvent
+
+# Price of prompt tokens served from the provider's prompt cache, relative to the input price
+CACHED_INPUT_MULTIPLIER = 0.5
+# Providers known to accept stream_options; some OpenAI-compatible servers (LM Studio, older vLLM) reject it
+STREAM_USAGE_APIS = {ApiName.OPENAI, ApiName.AZURE}
 
 class LLMEngine(APIEngine):
     """
@@ -73,8 +79,8 @@ class LLMEngine(APIEngine):
         Generates the API response for the task, using the provided API data and messages.
 
         This method can work with any OpenAI-compatible endpoint (OpenAI, Azure, LMStudio).
-        It creates an AsyncOpenAI client with the provided configuration and generates
-        a chat completion based on the input parameters.
+        It reuses the pooled AsyncOpenAI client for the provided configuration and
+        generates a chat completion based on the input parameters.
 
         Args:
             api_data (ModelConfig): Configuration for the API client.
@@ -93,49 +99,12 @@ class LLMEngine(APIEngine):
             ValueError: If API key or base URL is missing from api_data.
             Exception: For any errors during the API call.
         """
-        if not api_data.api_key:
-            raise ValueError("API key not found in API data")
-
-        base_url = api_data.base_url
-        if not base_url:
-            raise ValueError("Base URL not found in API data")
-
-        # Ensure the base_url doesn't end with a slash
-        base_url = base_url.rstrip('/')
-
-        # Create the client with the correct base_url
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=base_url
-        )
-        if system:
-            messages = [{"role": "system", "content": system}] + messages
-
-        estimated_tokens = est_messages_token_count(messages, tools)
-        if estimated_tokens > api_data.ctx_size:
-            LOGGER.warning(f"Estimated tokens ({estimated_tokens}) exceed context size ({api_data.ctx_size}) of model {api_data.model}. Pruning. ")
-        elif estimated_tokens > 0.8 * api_data.ctx_size:
-            LOGGER.warning(f"Estimated tokens ({estimated_tokens}) are over 80% of context size ({api_data.ctx_size}).")
-        # Prune messages if estimated tokens exceed context size
-        if estimated_tokens > api_data.ctx_size:
-            messages = prune_messages(messages, api_data.ctx_size)
+        self._check_api_data(api_data)
+        # Reuse the pooled client for this endpoint (the registry strips trailing slashes)
+        client = get_client_registry().openai_client(api_data)
+        api_params = self._prepare_api_params(api_data, messages, system, tools, max_tokens, tool_choice, n)
 
         try:
-            # Prepare the API call parameters
-            api_params = {
-                "model": api_data.model,
-                "messages": messages,
-                "max_tokens": max_tokens,
-                "temperature": api_data.temperature,
-                "n": n, 
-                "stream": False
-            }
-
-            # Only add tools and tool_choice if tools are provided
-            if tools:
-                api_params["tools"] = tools
-                api_params["tool_choice"] = tool_choice
-
             response: ChatCompletion = await client.chat.completions.create(**api_params)
 
             # We'll use the first choice for the MessageDict
@@ -149,6 +118,7 @@ class LLMEngine(APIEngine):
                     LOGGER.debug(f'Tool call: {ToolCall(**tool_call.model_dump())}')
 
             tool_calls = [ToolCall(**tool_call.model_dump()) for tool_call in choice.message.tool_calls] if choice.message.tool_calls else None
+            cached_tokens = self._cached_tokens(response.usage)
             msg = MessageDict(
                 role="assistant",
                 content=content,
@@ -161,7 +131,9 @@ class LLMEngine(APIEngine):
                     "usage": response.usage.model_dump(),
                     "finish_reason": choice.finish_reason,
                     "system_fingerprint": response.system_fingerprint,
-                    "cost": self.calculate_cost(response.usage.prompt_tokens, response.usage.completion_tokens, response.model)
+                    "cache_read_tokens": cached_tokens,
+                    "cache_write_tokens": 0,
+                    "cost": self.calculate_cost(response.usage.prompt_tokens, response.usage.completion_tokens, response.model, cached_tokens)
                 }
             )
             return References(messages=[msg])
@@ -171,6 +143,155 @@ class LLMEngine(APIEngine):
             LOGGER.error(traceback.format_exc())
             raise
 
+    async def stream_api_response(self, api_data: ModelConfig, messages: List[Dict[str, Any]], system: Optional[str] = None, tools: Optional[List[Dict[str, Any]]] = None, max_tokens: Optional[int] = None, tool_choice: Optional[str] = 'auto', n: Optional[int] = 1, **kwargs) -> AsyncIterator[StreamEvent]:
+        """
+        Streams a chat completion, yielding text deltas as they arrive.
+
+        Tool call fragments are accumulated and emitted as complete 'tool_call' events once the
+        stream ends, followed by a 'message' event holding the same MessageDict that
+        generate_api_response would have returned.
+
+        Args:
+            api_data (ModelConfig): Configuration for the API client.
+            messages (List[Dict[str, Any]]): List of conversation messages.
+            system (Optional[str]): System message for the conversation.
+            tools (Optional[List[Dict[str, Any]]]): List of available tools for the model.
+            max_tokens (Optional[int]): Maximum number of tokens to generate.
+            tool_choice (Optional[str]): Whether to allow tool use.
+            n (Optional[int]): Number of chat completion choices to generate.
+            **kwargs: Additional keyword arguments.
+
+        Yields:
+            StreamEvent: 'delta' events, then 'tool_call' events, then the final 'message' event.
+        """
+        self._check_api_data(api_data)
+        client = get_client_registry().openai_client(api_data)
+        api_params = self._prepare_api_params(api_data, messages, system, tools, max_tokens, tool_choice, n)
+        api_params["stream"] = True
+        if api_data.api_name in STREAM_USAGE_APIS:
+            api_params["stream_options"] = {"include_usage": True}
+
+        try:
+            stream = await client.chat.completions.create(**api_params)
+            content_parts: List[str] = []
+            tool_call_parts: Dict[int, Dict[str, Any]] = {}
+            model, finish_reason, system_fingerprint, usage = api_data.model, None, None, None
+            async for chunk in stream:
+                model = chunk.model or model
+                system_fingerprint = chunk.system_fingerprint or system_fingerprint
+                if chunk.usage:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                delta = choice.delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield StreamEvent(type="delta", content=delta.content)
+                for tool_delta in delta.tool_calls or []:
+                    part = tool_call_parts.setdefault(tool_delta.index, {"id": None, "name": "", "arguments": ""})
+                    if tool_delta.id:
+                        part["id"] = tool_delta.id
+                    if tool_delta.function and tool_delta.function.name:
+                        part["name"] += tool_delta.function.name
+                    if tool_delta.function and tool_delta.function.arguments:
+                        part["arguments"] += tool_delta.function.arguments
+
+            tool_calls = [
+                ToolCall(id=part["id"], type="function", function=ToolCallConfig(name=part["name"], arguments=part["arguments"]))
+                for _, part in sorted(tool_call_parts.items())
+            ] or None
+            for tool_call in tool_calls or []:
+                yield StreamEvent(type="tool_call", tool_call=tool_call)
+
+            prompt_tokens = usage.prompt_tokens if usage else 0
+            completion_tokens = usage.completion_tokens if usage else 0
+            cached_tokens = self._cached_tokens(usage)
+            yield StreamEvent(type="message", message=MessageDict(
+                role="assistant",
+                content="".join(content_parts) or None,
+                tool_calls=tool_calls,
+                generated_by="llm",
+                type=ContentType.TEXT,
+                creation_metadata={
+                    "model": model,
+                    "usage": usage.model_dump() if usage else {},
+                    "finish_reason": finish_reason,
+                    "system_fingerprint": system_fingerprint,
+                    "cache_read_tokens": cached_tokens,
+                    "cache_write_tokens": 0,
+                    "cost": self.calculate_cost(prompt_tokens, completion_tokens, model, cached_tokens)
+                }
+            ))
+
+        except Exception as e:
+            LOGGER.error(f"Error in LLM API stream: {str(e)}")
+            LOGGER.error(traceback.format_exc())
+            raise
+
+    def _check_api_data(self, api_data: ModelConfig):
+        """
+        Check that the API data has what an OpenAI-compatible client needs.
+
+        Raises:
+            ValueError: If API key or base URL is missing from api_data.
+        """
+        if not api_data.api_key:
+            raise ValueError("API key not found in API data")
+        if not api_data.base_url:
+            raise ValueError("Base URL not found in API data")
+
+    def _prepare_api_params(self, api_data: ModelConfig, messages: List[Dict[str, Any]], system: Optional[str] = None, tools: Optional[List[Dict[str, Any]]] = None, max_tokens: Optional[int] = None, tool_choice: Optional[str] = 'auto', n: Optional[int] = 1) -> Dict[str, Any]:
+        """
+        Build the chat completion parameters: prepends the system message, prunes the
+        messages to the model's context size and only adds tools when provided.
+        """
+        if system:
+            messages = [{"role": "system", "content": system}] + messages
+
+        estimated_tokens = est_messages_token_count(messages, tools, api_data.api_name, api_data.model_format)
+        if estimated_tokens > api_data.ctx_size:
+            LOGGER.warning(f"Estimated tokens ({estimated_tokens}) exceed context size ({api_data.ctx_size}) of model {api_data.model}. Pruning. ")
+        elif estimated_tokens > 0.8 * api_data.ctx_size:
+            LOGGER.warning(f"Estimated tokens ({estimated_tokens}) are over 80% of context size ({api_data.ctx_size}).")
+        # Prune messages if estimated tokens exceed context size
+        if estimated_tokens > api_data.ctx_size:
+            messages = prune_messages(messages, api_data.ctx_size, api_data.api_name, api_data.model_format, tools)
+
+        api_params = {
+            "model": api_data.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": api_data.temperature,
+            "n": n, 
+            "stream": False
+        }
+        if api_data.seed is not None:
+            api_params["seed"] = api_data.seed
+
+        # Only add tools and tool_choice if tools are provided
+        if tools:
+            api_params["tools"] = tools
+            api_params["tool_choice"] = tool_choice
+
+        # OpenAI caches prompt prefixes automatically (system prompt and tools come first). The key routes
+        # requests sharing a system prompt and tools to the same cache; other compatible servers reject it
+        if PROMPT_CACHING_ENABLED and api_data.api_name == ApiName.OPENAI:
+            api_params["prompt_cache_key"] = self._prompt_cache_key(system, tools)
+        return api_params
+
+    @staticmethod
+    def _prompt_cache_key(system: Optional[str], tools: Optional[List[Dict[str, Any]]]) -> str:
+        prefix = json.dumps([system or "", tools or []], sort_keys=True, default=str)
+        return hashlib.blake2b(prefix.encode("utf-8", "replace"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _cached_tokens(usage: Any) -> int:
+        """Prompt tokens served from the prompt cache, as reported in usage.prompt_tokens_details."""
+        cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+        return cached_tokens if isinstance(cached_tokens, int) else 0
+
     @staticmethod
     def get_usage(message: MessageDict) -> Dict[str, Any]:
         """
@@ -188,18 +309,21 @@ class LLMEngine(APIEngine):
             "prompt_tokens": usage.get('prompt_tokens', 0),
             "completion_tokens": usage.get('completion_tokens', 0),
             "total_tokens": usage.get('total_tokens', 0),
+            "cache_read_tokens": creation_metadata.get('cache_read_tokens', 0),
+            "cache_write_tokens": creation_metadata.get('cache_write_tokens', 0),
             "cost": creation_metadata.get('cost', 0.0),
             "model": creation_metadata.get('model', ''),
         }
 
-    def calculate_cost(self, prompt_tokens: int, completion_tokens: int, model: str) -> float:
+    def calculate_cost(self, prompt_tokens: int, completion_tokens: int, model: str, cached_tokens: int = 0) -> float:
         """
         Calculate the cost of the API call based on token usage and model.
 
         Args:
-            prompt_tokens (int): Number of tokens in the prompt.
+            prompt_tokens (int): Number of tokens in the prompt, including the cached ones.
             completion_tokens (int): Number of tokens in the completion.
             model (str): The model used for the API call.
+            cached_tokens (int): Number of prompt tokens served from the prompt cache, billed at a discount.
 
         Returns:
             float: The calculated cost of the API call.
@@ -215,7 +339,8 @@ class LLMEngine(APIEngine):
         }
 
         model_pricing = pricing.get(model, (0.0, 0.0))
-        input_cost = (prompt_tokens / 1000) * model_pricing[0]
+        input_cost = ((prompt_tokens - cached_tokens) / 1000) * model_pricing[0]
+        input_cost += (cached_tokens / 1000) * model_pricing[0] * CACHED_INPUT_MULTIPLIER
         output_cost = (completion_tokens / 1000) * model_pricing[1]
 
         return input_cost + output_cost
\ No newline at end of file
@@ -0,0 +1,191 @@
+import asyncio, hashlib, re
+from urllib.parse import urlsplit, parse_qsl, urlencode, quote, unquote
+from pydantic import Field
+from typing import Dict, Any, List, Optional
+from workflow.util import LOGGER
+from workflow.core.data_structures import URLReference, References, ApiType
+from workflow.core.api.engines.search_engine import APISearchEngine, ArxivSearchAPI, ExaSearchAPI, GoogleSearchAPI, RedditSearchAPI, WikipediaSearchAPI
+from workflow.util.const import META_SEARCH_ENGINE_TIMEOUT, META_SEARCH_RRF_K, META_SEARCH_SIMHASH_DISTANCE
+
+# The engines a meta search fans out to, by the type of their API
+SEARCH_ENGINES: Dict[ApiType, APISearchEngine] = {
+    ApiType.GOOGLE_SEARCH: GoogleSearchAPI(),
+    ApiType.REDDIT_SEARCH: RedditSearchAPI(),
+    ApiType.WIKIPEDIA_SEARCH: WikipediaSearchAPI(),
+    ApiType.EXA_SEARCH: ExaSearchAPI(),
+    ApiType.ARXIV_SEARCH: ArxivSearchAPI(),
+}
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {"gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "ref_url", "si", "spm"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Content shorter than this (in words) is too short for SimHash to tell near-duplicates from unrelated pages
+SIMHASH_MIN_TOKENS = 8
+SIMHASH_SHINGLE_SIZE = 3
+WORD_PATTERN = re.compile(r"\w+")
+
+def canonicalize_url(url: str) -> str:
+    """
+    Return the form of a URL that identifies the page it points to.
+
+    The scheme, fragment, default port, tracking parameters and trailing slash are dropped,
+    the host is lowercased and stripped of "www." and mobile ("m.") labels, percent-encoding
+    is normalized and the remaining query parameters are sorted.
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.hostname:
+        return url
+    labels = parts.hostname.lower().split(".")
+    if labels[0] in ("www", "m") and len(labels) > 2:
+        labels = labels[1:]
+    # Mobile editions below a language subdomain, e.g. en.m.wikipedia.org
+    if len(labels) > 3 and labels[1] == "m":
+        labels = labels[:1] + labels[2:]
+    host = ".".join(labels)
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+    path = quote(unquote(parts.path), safe="/:@!$&'()*+,;=~").rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ))
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+def simhash(text: str) -> Optional[int]:
+    """
+    Return the 64-bit SimHash of a text over its word 3-shingles, or None for texts too short
+    to fingerprint. Near-duplicate texts have fingerprints a few bits apart.
+    """
+    tokens = WORD_PATTERN.findall((text or "").casefold())
+    if len(tokens) < SIMHASH_MIN_TOKENS:
+        return None
+    shingles = {" ".join(tokens[i:i + SIMHASH_SHINGLE_SIZE]) for i in range(len(tokens) - SIMHASH_SHINGLE_SIZE + 1)}
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big") for shingle in shingles]
+    # Bit i of the fingerprint is set when it is set in most shingle hashes; columns are counted on binary strings
+    majority = len(hashes) / 2
+    fingerprint = 0
+    for bit, column in enumerate(zip(*(f"{value:064b}" for value in hashes))):
+        if column.count("1") > majority:
+            fingerprint |= 1 << (63 - bit)
+    return fingerprint
+
+class MetaSearchAPI(APISearchEngine):
+    """
+    API engine that searches all of a user's active search APIs at once.
+
+    The query goes to every engine concurrently, each with its own deadline: engines that fail
+    or have not answered in time are left out. The rankings are merged with reciprocal rank
+    fusion, where a result scores the sum of 1 / (rrf_k + rank) over the engines that returned
+    it. Results are the same when their canonical URLs match or when the SimHashes of their
+    content are at most `simhash_distance` bits apart; duplicates add up their scores and keep
+    the best-ranked result, with the engines that found it in its metadata.
+
+    Attributes:
+        required_api (ApiType): Set to "meta_search".
+        engine_timeout (float): Seconds each engine has to answer.
+        rrf_k (int): Rank constant of reciprocal rank fusion.
+        simhash_distance (int): Maximum Hamming distance of the content SimHashes of duplicates.
+
+    Note:
+        api_data holds the API data of each engine under "engines", keyed on the engine's API
+        type (built by APIManager from the user's active search APIs). The API config of the
+        meta search API may set "engine_timeout", and "engine_timeouts" per engine.
+        Each engine's search goes through the search cache; the merged results are not cached,
+        so an engine that missed its deadline is back in the next search.
+    """
+    required_api: ApiType = "meta_search"
+    engine_timeout: float = Field(META_SEARCH_ENGINE_TIMEOUT, description="Seconds each engine has to answer")
+    rrf_k: int = Field(META_SEARCH_RRF_K, description="Rank constant of reciprocal rank fusion")
+    simhash_distance: int = Field(META_SEARCH_SIMHASH_DISTANCE, description="Maximum Hamming distance of the content SimHashes of duplicates")
+
+    async def generate_api_response(self, api_data: Dict[str, Any], prompt: str, **kwargs) -> References:
+        return await self.fetch_results(api_data, prompt=prompt, **kwargs)
+
+    async def fetch_results(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
+        api_data = api_data or {}
+        engines = {name: data for name, data in (api_data.get("engines") or {}).items() if name in SEARCH_ENGINES}
+        if not engines:
+            raise ValueError("No active search APIs to query")
+        max_results = max(1, int(max_results))
+        default_timeout = float(api_data.get("engine_timeout") or self.engine_timeout)
+        timeouts = api_data.get("engine_timeouts") or {}
+        names = list(engines)
+        rankings = await asyncio.gather(*(
+            self._search(name, engines[name], prompt, max_results, float(timeouts.get(name, default_timeout)))
+            for name in names
+        ))
+        results = self.fuse({name: ranking for name, ranking in zip(names, rankings) if ranking}, max_results)
+        if not results:
+            raise ValueError("No results found")
+        return References(search_results=results)
+
+    @staticmethod
+    async def _search(name: str, api_data: Dict[str, Any], prompt: str, max_results: int, timeout: float) -> List[URLReference]:
+        """The results of one engine, or no results if it fails or misses its deadline."""
+        engine = SEARCH_ENGINES[name]
+        try:
+            references = await asyncio.wait_for(engine.generate_api_response(api_data, prompt=prompt, max_results=max_results), timeout)
+        except asyncio.TimeoutError:
+            LOGGER.warning(f"Meta search: {name} did not answer within {timeout} seconds, leaving it out")
+            return []
+        except Exception as e:
+            LOGGER.warning(f"Meta search: {name} failed, leaving it out: {e}")
+            return []
+        return list(references.search_results or []) if references else []
+
+    def fuse(self, rankings: Dict[str, List[URLReference]], max_results: int) -> List[URLReference]:
+        """
+        Merge the rankings of several engines into one, dropping duplicates.
+
+        Args:
+            rankings (Dict[str, List[URLReference]]): The results of each engine, best first.
+            max_results (int): Maximum number of results to return.
+
+        Returns:
+            List[URLReference]: The merged results, best first.
+        """
+        # Each group is [best result, score, engines, content fingerprint]
+        groups: List[list] = []
+        by_url: Dict[str, list] = {}
+        depth = max((len(ranking) for ranking in rankings.values()), default=0)
+        # Rank by rank across engines, so the first result of a group is its best-ranked one
+        for rank in range(depth):
+            for name, ranking in rankings.items():
+                if rank >= len(ranking):
+                    continue
+                result = ranking[rank]
+                url = canonicalize_url(result.url)
+                fingerprint = simhash(result.content)
+                group = by_url.get(url) or self._near_duplicate(groups, fingerprint)
+                if group is None:
+                    group = [result, 0.0, [], fingerprint]
+                    groups.append(group)
+                elif group[3] is None:
+                    group[3] = fingerprint
+                by_url.setdefault(url, group)
+                group[1] += 1.0 / (self.rrf_k + rank + 1)
+                if name not in group[2]:
+                    group[2].append(name)
+        groups.sort(key=lambda group: group[1], reverse=True)
+        return [
+            URLReference(
+                title=result.title,
+                url=result.url,
+                content=result.content,
+                metadata={**result.metadata, "engines": ",".join(engines), "rrf_score": round(score, 6)}
+            ) for result, score, engines, _ in groups[:max_results]
+        ]
+
+    def _near_duplicate(self, groups: List[list], fingerprint: Optional[int]) -> Optional[list]:
+        if fingerprint is None:
+            return None
+        for group in groups:
+            if group[3] is not None and (group[3] ^ fingerprint).bit_count() <= self.simhash_distance:
+                return group
+        return None
@@ -1,5 +1,5 @@
 from pydantic import Field
-from openai import AsyncOpenAI
+from workflow.core.api.client_registry import get_client_registry
 from workflow.core.data_structures import ModelConfig, ApiType, FileReference, MessageDict, References, FunctionParameters, ParameterDefinition
 from workflow.core.api.engines.api_engine import APIEngine
 from workflow.util import LOGGER
@@ -36,13 +36,10 @@ class OpenAISpeechToTextEngine(APIEngine):
         Returns:
             References: A message dict containing the transcription.
         """
+        model = api_data.model
         LOGGER.info(f"Transcribing audio file {file_reference.storage_path} using OpenAI speech-to-text model {model}")
         LOGGER.info(f"API data: {api_data}")
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=api_data.base_url
-        )
-        model = api_data.model
+        client = get_client_registry().openai_client(api_data)
 
         try:
             with open(file_reference.storage_path, "rb") as audio_file:
@@ -2,7 +2,7 @@ from pydantic import Field
 from typing import List
 from workflow.core.data_structures import ModelConfig, FileReference, MessageDict, References, FunctionParameters, ParameterDefinition
 from workflow.core.api.engines.oai_stt_engine import OpenAISpeechToTextEngine
-from openai import AsyncOpenAI
+from workflow.core.api.client_registry import get_client_registry
 
 class OpenAIAdvancedSpeechToTextEngine(OpenAISpeechToTextEngine):
     input_variables: FunctionParameters = Field(
@@ -41,10 +41,7 @@ class OpenAIAdvancedSpeechToTextEngine(OpenAISpeechToTextEngine):
         Returns:
             References: A message dict containing the detailed transcription.
         """
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=api_data.base_url
-        )
+        client = get_client_registry().openai_client(api_data)
 
         try:
             with open(file_reference.storage_path, "rb") as audio_file:
@@ -1,13 +1,25 @@
-import wikipedia, praw
+import asyncio, httpx, praw
+from abc import abstractmethod
 from praw.models import Submission, ListingGenerator, Subreddits
 from arxiv import Result, Client, Search, SortCriterion
-from googleapiclient.discovery import build
 from exa_py import Exa
 from pydantic import Field
 from typing import Dict, Any, List
 from workflow.util import LOGGER
 from workflow.core.data_structures import URLReference, References, ApiType, FunctionParameters, ParameterDefinition
 from workflow.core.api.engines.api_engine import APIEngine
+from workflow.core.api.engines.engine_executor import run_blocking
+from workflow.core.api.client_registry import get_client_registry
+from workflow.core.api.search_cache import get_search_cache
+from workflow.util.const import WIKIPEDIA_API_URL, WIKIPEDIA_USER_AGENT
+
+# MediaWiki returns intro extracts for at most 20 pages per request
+WIKIPEDIA_EXTRACTS_LIMIT = 20
+
+# Custom Search JSON API: at most 10 results per request, and the first 100 results of a query
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+GOOGLE_SEARCH_PAGE_SIZE = 10
+GOOGLE_SEARCH_MAX_RESULTS = 100
 
 class APISearchEngine(APIEngine):
     """
@@ -16,6 +28,10 @@ class APISearchEngine(APIEngine):
     This class extends APIEngine to provide a common structure for search APIs.
     It defines a standard set of input parameters suitable for most search operations.
 
+    Searches go through the process-wide SearchCache (see core/api/search_cache.py), keyed on
+    the engine, the normalized prompt, the other inputs with their defaults filled in, and the
+    API configuration. Subclasses implement `fetch_results`, which runs the actual search.
+
     Attributes:
         input_variables (FunctionParameters): Defines the input structure for search operations,
                                               including 'prompt' and 'max_results'.
@@ -37,74 +53,155 @@ class APISearchEngine(APIEngine):
     required=["prompt"]
 ), description="This inputs this API engine takes: requires a prompt input, and optional inputs such as max_results. Default is 10.")
 
+    async def generate_api_response(self, api_data: Dict[str, Any], prompt: str, **kwargs) -> References:
+        """Return the results of a search, from the search cache when it holds them."""
+        cache = get_search_cache()
+        if not cache.enabled:
+            return await self.fetch_results(api_data, prompt=prompt, **kwargs)
+        engine = getattr(self.required_api, "value", self.required_api)
+        params = {name: definition.default for name, definition in self.input_variables.properties.items() if name != "prompt"}
+        params.update(kwargs)
+        key = cache.make_key(engine, prompt, params, api_data)
+        return await cache.fetch(engine, key, lambda: self.fetch_results(api_data, prompt=prompt, **kwargs))
+
+    @abstractmethod
+    async def fetch_results(self, api_data: Dict[str, Any], prompt: str, **kwargs) -> References:
+        """
+        Run the search on the API, bypassing the cache.
+
+        Args:
+            api_data (Dict[str, Any]): Configuration data for the API (e.g., API keys, endpoints).
+            prompt (str): The search query.
+            **kwargs: The other inputs of the engine, e.g. max_results.
+
+        Returns:
+            References: The search results.
+        """
+        pass
+
 class WikipediaSearchAPI(APISearchEngine):
     """
     API engine for searching Wikipedia.
 
-    This class implements the Wikipedia search functionality, utilizing the wikipedia library.
+    This class implements the Wikipedia search functionality on the MediaWiki action API:
+    a single `generator=search` query with `prop=extracts|info|pageprops` returns the search
+    hits with their intro extract, URL and page id, through the pooled HTTP client of the client
+    registry. Searches for more than 20 results follow the API's continuation. Disambiguation
+    pages are left out.
 
     Attributes:
         required_api (ApiType): Set to "wikipedia_search".
 
     Note:
-        This API does not require authentication, so api_data is not used in the generate_api_response method.
+        This API does not require authentication. An optional base_url in api_data points the
+        engine at another MediaWiki, e.g. another language edition.
     """
     required_api: ApiType = "wikipedia_search"
 
-    async def generate_api_response(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
-        # Wikipedia doesn't require API keys, so we don't need to use api_data
-        search_results = wikipedia.search(prompt, results=max_results, suggestion=True)
-        LOGGER.debug(f'search_results: {search_results} type: {type(search_results)} type of search_results[0]: {type(search_results[0])}')
-        detailed_results = []
-        for result in search_results[0]:
-            try:
-                detailed_results += [wikipedia.page(title=result, auto_suggest=False)]
-            except wikipedia.exceptions.DisambiguationError as e:
-                try:
-                    detailed_results += [wikipedia.page(title=e.options[0], auto_suggest=False)]
-                except:
-                    pass
-        if not detailed_results:
+    async def fetch_results(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
+        url = (api_data or {}).get('base_url') or WIKIPEDIA_API_URL
+        max_results = max(1, int(max_results))
+        pages = await self._search(get_client_registry().http_client("wikipedia_search"), url, prompt, max_results)
+        if not pages:
             raise ValueError("No results found")
         return References(search_results=[
             URLReference(
-                title=result.title,
-                url=result.url,
-                content=result.summary,
-                metadata={key: value for key, value in result.__dict__.items() if key not in {"title", "url", "summary"}}
-            ) for result in detailed_results
+                title=page['title'],
+                url=page.get('fullurl') or page.get('canonicalurl', ''),
+                content=page.get('extract', ''),
+                metadata={key: page[key] for key in ("pageid", "index", "touched", "lastrevid", "length", "pagelanguage") if key in page}
+            ) for page in pages
         ])
 
+    @staticmethod
+    async def _search(client: httpx.AsyncClient, url: str, prompt: str, max_results: int) -> List[Dict[str, Any]]:
+        """The search hits, in rank order, with their extract and URL."""
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": 2,
+            "generator": "search",
+            "gsrsearch": prompt,
+            "gsrlimit": max_results,
+            "prop": "extracts|info|pageprops",
+            "exintro": 1,
+            "explaintext": 1,
+            "exlimit": "max",
+            "inprop": "url",
+            "ppprop": "disambiguation",
+            "redirects": 1,
+        }
+        pages: Dict[int, Dict[str, Any]] = {}
+        continuation: Dict[str, Any] = {}
+        # One request for up to 20 results; beyond that, MediaWiki sends the missing extracts in continuations
+        for _ in range(max(1, -(-max_results // WIKIPEDIA_EXTRACTS_LIMIT))):
+            response = await client.get(url, params={**params, **continuation}, headers={"User-Agent": WIKIPEDIA_USER_AGENT})
+            response.raise_for_status()
+            data = response.json()
+            if 'error' in data:
+                raise ValueError(f"Wikipedia API error: {data['error'].get('info', data['error'])}")
+            for page in data.get('query', {}).get('pages', []):
+                pages.setdefault(page['pageid'], {}).update(page)
+            continuation = data.get('continue', {})
+            # Continue only for the extracts of the hits already found: with a pending prop continuation,
+            # MediaWiki re-runs the same batch of search hits rather than the next one
+            if 'excontinue' not in continuation:
+                break
+        results = [page for page in pages.values() if 'disambiguation' not in page.get('pageprops', {})]
+        return sorted(results, key=lambda page: page.get('index', 0))[:max_results]
+
 class GoogleSearchAPI(APISearchEngine):
     """
     API engine for Google Custom Search.
 
-    This class implements Google Custom Search functionality.
+    This class implements Google Custom Search functionality. It calls the Custom Search
+    JSON API directly through the pooled HTTP client of the client registry, so searches reuse
+    keep-alive connections and never block the event loop. Results beyond the first page of
+    10 are fetched concurrently, up to the API's limit of 100.
 
     Attributes:
         required_api (ApiType): Set to "google_search".
 
     Note:
-        Requires valid API key and Custom Search Engine ID in api_data.
+        Requires valid API key and Custom Search Engine ID in api_data. An optional base_url
+        overrides the endpoint.
     """
     required_api: ApiType = "google_search"
 
-    async def generate_api_response(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
+    async def fetch_results(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
         if not api_data.get('api_key') or not api_data.get('cse_id'):
             raise ValueError("Google Search API key or CSE ID not found in API data")
-        
-        service = build("customsearch", "v1", developerKey=api_data['api_key'])
-        res = service.cse().list(q=prompt, cx=api_data['cse_id'], num=max_results).execute()
-        results = res.get('items', [])
+
+        client = get_client_registry().http_client("google_search")
+        url = api_data.get('base_url') or GOOGLE_SEARCH_URL
+        params = {"key": api_data['api_key'], "cx": api_data['cse_id'], "q": prompt}
+        max_results = max(1, min(int(max_results), GOOGLE_SEARCH_MAX_RESULTS))
+
+        first_page = await self._search(client, url, params, 1, min(max_results, GOOGLE_SEARCH_PAGE_SIZE))
+        results = first_page.get('items', [])
+        total = int(first_page.get('searchInformation', {}).get('totalResults', 0) or 0)
+        if len(results) == GOOGLE_SEARCH_PAGE_SIZE and max_results > GOOGLE_SEARCH_PAGE_SIZE and total > GOOGLE_SEARCH_PAGE_SIZE:
+            last = min(max_results, total)
+            pages = await asyncio.gather(*(
+                self._search(client, url, params, start, min(GOOGLE_SEARCH_PAGE_SIZE, last - start + 1))
+                for start in range(GOOGLE_SEARCH_PAGE_SIZE + 1, last + 1, GOOGLE_SEARCH_PAGE_SIZE)
+            ))
+            results += [item for page in pages for item in page.get('items', [])]
         return References(search_results=[
             URLReference(
-                title=result['title'],
+                title=result.get('title', ''),
                 url=result['link'],
-                content=result['snippet'],
+                content=result.get('snippet', ''),
                 metadata={key: value for key, value in result.items() if key not in {"title", "link", "snippet"}}
-            ) for result in results
+            ) for result in results[:max_results]
         ])
 
+    @staticmethod
+    async def _search(client: httpx.AsyncClient, url: str, params: Dict[str, Any], start: int, num: int) -> Dict[str, Any]:
+        response = await client.get(url, params={**params, "start": start, "num": num})
+        response.raise_for_status()
+        return response.json()
+
 class ExaSearchAPI(APISearchEngine):
     """
     API engine for Exa Search.
@@ -119,12 +216,12 @@ class ExaSearchAPI(APISearchEngine):
     """
     required_api: ApiType = "exa_search"
 
-    async def generate_api_response(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
+    async def fetch_results(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
         if not api_data.get('api_key'):
             raise ValueError("Exa API key not found in API data")
         
         exa_api = Exa(api_key=api_data['api_key'])
-        exa_search = exa_api.search(query=prompt, num_results=max_results)
+        exa_search = await run_blocking("exa", exa_api.search, query=prompt, num_results=max_results)
         LOGGER.debug(f'exa_search: {exa_search.results}')
         results = exa_search.results
 
@@ -151,7 +248,7 @@ class ArxivSearchAPI(APISearchEngine):
     """
     required_api: ApiType = "arxiv_search"
 
-    async def generate_api_response(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
+    async def fetch_results(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
         # arXiv doesn't require API keys, so we don't need to use api_data
         client = Client(page_size=20)
         search = Search(
@@ -159,7 +256,8 @@ class ArxivSearchAPI(APISearchEngine):
             max_results=max_results,
             sort_by=SortCriterion.SubmittedDate
         )
-        results: List[Result] = list(client.results(search))
+        # The arxiv client pages through results with blocking requests
+        results: List[Result] = await run_blocking("arxiv", lambda: list(client.results(search)))
         if not results:
             raise ValueError("No results found")
 
@@ -180,7 +278,7 @@ class ArxivSearchAPI(APISearchEngine):
             ) for result in results
         ])
     
-class RedditSearchAPI(APIEngine):
+class RedditSearchAPI(APISearchEngine):
     """
     API engine for Reddit Search.
 
@@ -229,9 +327,9 @@ class RedditSearchAPI(APIEngine):
     ), description="This inputs this API engine takes: requires a prompt input, and optional inputs such as sort, time_filter, subreddit, and limit. Default is 'hot', 'week', 'all', and 10.")
     required_api: ApiType = "reddit_search"
 
-    async def generate_api_response(self, api_data: Dict[str, Any], prompt: str, sort: str = "hot", time_filter: str = "week", subreddit: str = "all", limit: int = 10, **kwargs) -> References:
+    async def fetch_results(self, api_data: Dict[str, Any], prompt: str, sort: str = "hot", time_filter: str = "week", subreddit: str = "all", limit: int = 10, **kwargs) -> References:
         """
-        Generate a response from a Reddit search.
+        Run a Reddit search.
 
         Args:
             api_data (Dict[str, Any]): Must contain 'client_id' and 'client_secret'.
@@ -258,11 +356,17 @@ class RedditSearchAPI(APIEngine):
             client_secret=api_data['client_secret'],
             user_agent=user_agent,
         )
+        search_result_list = await run_blocking("reddit", self._search, reddit, prompt, sort, time_filter, subreddit, limit)
+        return References(search_results=search_result_list)
+
+    @staticmethod
+    def _search(reddit: praw.Reddit, prompt: str, sort: str, time_filter: str, subreddit: str, limit: int) -> List[URLReference]:
+        # praw is blocking and lazy (listings and authors fetch on access): runs in the engine executor
         subredditObject: Subreddits = reddit.subreddit(subreddit)
         search_results: ListingGenerator = subredditObject.search(query=prompt, limit=int(limit), params={"sort": sort, "time_filter": time_filter})
         submissions: List[Submission] = [submission for submission in search_results]
 
-        search_result_list = [
+        return [
             URLReference(
                 title=submission.title,
                 url=submission.url,
@@ -277,5 +381,4 @@ class RedditSearchAPI(APIEngine):
                     "permalink": submission.permalink
                 }
             ) for submission in submissions
-        ]
-        return References(search_results=search_result_list)
\ No newline at end of file
+        ]
\ No newline at end of file
@@ -2,6 +2,7 @@ import base64, re
 from typing import List
 from pydantic import Field
 from openai import AsyncOpenAI
+from workflow.core.api.client_registry import get_client_registry
 from workflow.core.data_structures import ModelConfig, ApiType, FileContentReference, MessageDict, ContentType, FileType, References, FunctionParameters, ParameterDefinition
 from workflow.core.api.engines.api_engine import APIEngine
 from workflow.util import LOGGER, chunk_text
@@ -59,10 +60,7 @@ class OpenAITextToSpeechEngine(APIEngine):
         Returns:
             References: A message dict containing information about the generated audio file.
         """
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=api_data.base_url
-        )
+        client = get_client_registry().openai_client(api_data)
         model = api_data.model
         inputs: List[str] = []
         if len(input) > api_data.ctx_size:
@@ -1,7 +1,7 @@
 import base64
 from pydantic import Field
 from typing import List, Union, Optional
-from openai import AsyncOpenAI
+from workflow.core.api.client_registry import get_client_registry
 from workflow.core.data_structures import MessageDict, ModelConfig, FileReference, get_file_content, ApiType, References, FunctionParameters, ParameterDefinition
 from workflow.core.api.engines.api_engine import APIEngine
 from workflow.util import LOGGER
@@ -44,10 +44,7 @@ class VisionModelEngine(APIEngine):
         Returns:
             References: Analysis results wrapped in a References object.
         """
-        client = AsyncOpenAI(
-            api_key=api_data.api_key,
-            base_url=api_data.base_url
-        )
+        client = get_client_registry().openai_client(api_data)
         content = [{"type": "text", "text": prompt}]
         for file_ref in file_references:
             image_data = get_file_content(file_ref)
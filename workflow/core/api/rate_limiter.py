@@ -0,0 +1,260 @@
+import asyncio, hashlib, random, time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable, TypeVar, AsyncIterator
+from workflow.util import LOGGER
+from workflow.util.const import API_MAX_CONCURRENCY, API_MAX_RETRIES, API_RETRY_BASE_DELAY, API_RETRY_MAX_DELAY
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: rate limited, overloaded or temporarily unavailable
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+# Exception class names of transport-level failures across the provider SDKs and httpx
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "WriteTimeout", "PoolTimeout", "ConnectTimeout", "RemoteProtocolError", "TimeoutError"}
+
+class TokenBucket(BaseModel):
+    """
+    Token bucket refilled continuously at `per_minute / 60` tokens per second, holding at
+    most `per_minute` tokens. Waiters are served in arrival order.
+    """
+    per_minute: float = Field(..., description="Tokens added per minute, and bucket capacity")
+    _tokens: float = PrivateAttr(default=0.0)
+    _updated_at: float = PrivateAttr(default_factory=time.monotonic)
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+
+    def model_post_init(self, __context: Any):
+        self._tokens = self.per_minute
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.per_minute, self._tokens + (now - self._updated_at) * self.per_minute / 60)
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Take `amount` tokens, waiting for the bucket to refill if needed. Returns the seconds waited."""
+        amount = min(amount, self.per_minute)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                delay = (amount - self._tokens) * 60 / self.per_minute
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= amount
+        return waited
+
+class ProviderLimiter(BaseModel):
+    """
+    Limits the calls made with one provider credential: a concurrency semaphore, optional
+    request and token buckets, and retries with exponential backoff and jitter that honor
+    the provider's retry-after header.
+
+    Attributes:
+        max_concurrency (int): Maximum number of requests in flight.
+        requests_per_minute (Optional[float]): Request budget per minute, unlimited if None.
+        tokens_per_minute (Optional[float]): Token budget per minute, unlimited if None.
+        max_retries (int): Retries of a failed call on rate limits and transient errors.
+        base_delay (float): Backoff delay of the first retry, in seconds.
+        max_delay (float): Maximum backoff delay, in seconds.
+    """
+    max_concurrency: int = Field(API_MAX_CONCURRENCY, description="Maximum number of requests in flight")
+    requests_per_minute: Optional[float] = Field(None, description="Request budget per minute")
+    tokens_per_minute: Optional[float] = Field(None, description="Token budget per minute")
+    max_retries: int = Field(API_MAX_RETRIES, description="Retries on rate limits and transient errors")
+    base_delay: float = Field(API_RETRY_BASE_DELAY, description="Backoff delay of the first retry, in seconds")
+    max_delay: float = Field(API_RETRY_MAX_DELAY, description="Maximum backoff delay, in seconds")
+    _semaphore: asyncio.Semaphore = PrivateAttr()
+    _request_bucket: Optional[TokenBucket] = PrivateAttr(default=None)
+    _token_bucket: Optional[TokenBucket] = PrivateAttr(default=None)
+    _metrics: Dict[str, float] = PrivateAttr(default_factory=lambda: {
+        "requests": 0, "in_flight": 0, "queue_depth": 0, "max_queue_depth": 0,
+        "total_wait_seconds": 0.0, "max_wait_seconds": 0.0, "retries": 0, "rate_limited": 0, "failures": 0
+    })
+
+    def model_post_init(self, __context: Any):
+        self._semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        if self.requests_per_minute:
+            self._request_bucket = TokenBucket(per_minute=self.requests_per_minute)
+        if self.tokens_per_minute:
+            self._token_bucket = TokenBucket(per_minute=self.tokens_per_minute)
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Wait for a free concurrency slot and the request / token budget, then hold the slot."""
+        metrics = self._metrics
+        metrics["queue_depth"] += 1
+        metrics["max_queue_depth"] = max(metrics["max_queue_depth"], metrics["queue_depth"])
+        start = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            metrics["queue_depth"] -= 1
+        try:
+            if self._request_bucket:
+                await self._request_bucket.acquire(1)
+            if self._token_bucket and tokens:
+                await self._token_bucket.acquire(tokens)
+            waited = time.monotonic() - start
+            metrics["total_wait_seconds"] += waited
+            metrics["max_wait_seconds"] = max(metrics["max_wait_seconds"], waited)
+            metrics["requests"] += 1
+            metrics["in_flight"] += 1
+            try:
+                yield
+            finally:
+                metrics["in_flight"] -= 1
+        finally:
+            self._semaphore.release()
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """
+        Run an API call within the limits, retrying on rate limits and transient errors.
+
+        Args:
+            call (Callable[[], Awaitable[T]]): Zero-argument coroutine function making the call.
+            tokens (int): Estimated tokens the call consumes, charged to the token budget.
+
+        Returns:
+            T: The result of the call.
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self.slot(tokens):
+                    return await call()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    self._metrics["failures"] += 1
+                    raise
+                attempt += 1
+                self._metrics["retries"] += 1
+                LOGGER.warning(f"Retrying API call in {delay:.2f}s (attempt {attempt}/{self.max_retries}) after error: {e}")
+                await asyncio.sleep(delay)
+
+    async def stream(self, open_stream: Callable[[], AsyncIterator[T]], tokens: int = 0) -> AsyncIterator[T]:
+        """
+        Iterate a streamed API call within the limits, holding the slot until the stream ends.
+        The call is retried like in `run` only if it fails before producing its first item.
+
+        Args:
+            open_stream (Callable[[], AsyncIterator[T]]): Zero-argument function opening the stream.
+            tokens (int): Estimated tokens the call consumes, charged to the token budget.
+
+        Yields:
+            T: The items of the stream.
+        """
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self.slot(tokens):
+                    async for item in open_stream():
+                        started = True
+                        yield item
+                return
+            except Exception as e:
+                delay = None if started else self.retry_delay(e, attempt)
+                if delay is None:
+                    self._metrics["failures"] += 1
+                    raise
+                attempt += 1
+                self._metrics["retries"] += 1
+                LOGGER.warning(f"Retrying API stream in {delay:.2f}s (attempt {attempt}/{self.max_retries}) after error: {e}")
+                await asyncio.sleep(delay)
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Return the delay before retrying after `error`, or None if the call should not be retried.
+        Uses the retry-after header when the provider sends one, else exponential backoff with full jitter.
+        """
+        status = get_status_code(error)
+        if status == 429:
+            self._metrics["rate_limited"] += 1
+        if attempt >= self.max_retries or not is_retryable(error, status):
+            return None
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth, in-flight requests, wait times and retry counters."""
+        metrics = dict(self._metrics)
+        metrics["avg_wait_seconds"] = metrics["total_wait_seconds"] / metrics["requests"] if metrics["requests"] else 0.0
+        return metrics
+
+class RateLimiterRegistry(BaseModel):
+    """
+    Holds one ProviderLimiter per (api_name, api_key), configured from the API's api_config:
+    `max_concurrency`, `requests_per_minute`, `tokens_per_minute` and `max_retries`.
+    A limiter is rebuilt if its configuration changes.
+    """
+    _limiters: Dict[Tuple[str, str], Tuple[Tuple, ProviderLimiter]] = PrivateAttr(default_factory=dict)
+
+    def get_limiter(self, api_name: Any, api_config: Optional[Dict[str, Any]]) -> ProviderLimiter:
+        """Return the limiter for an API's credentials, creating it from its api_config if needed."""
+        api_config = api_config or {}
+        key = (getattr(api_name, "value", api_name), self._key_id(api_config.get("api_key")))
+        settings = {
+            name: api_config[name] for name in ("max_concurrency", "requests_per_minute", "tokens_per_minute", "max_retries")
+            if api_config.get(name) is not None
+        }
+        signature = tuple(sorted(settings.items()))
+        entry = self._limiters.get(key)
+        if entry is None or entry[0] != signature:
+            entry = self._limiters[key] = (signature, ProviderLimiter(**settings))
+        return entry[1]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Metrics of every limiter, keyed by 'api_name:key id'."""
+        return {f"{api_name}:{key_id}": limiter.stats() for (api_name, key_id), (_, limiter) in self._limiters.items()}
+
+    @staticmethod
+    def _key_id(api_key: Optional[str]) -> str:
+        # Never keep raw keys in metric labels
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8] if api_key else "none"
+
+def get_status_code(error: Exception) -> Optional[int]:
+    """Extract the HTTP status code from a provider SDK or httpx error, if any."""
+    for candidate in (getattr(error, "status_code", None), getattr(getattr(error, "response", None), "status_code", None), getattr(error, "code", None)):
+        try:
+            if candidate is not None:
+                return int(candidate)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+def is_retryable(error: Exception, status: Optional[int] = None) -> bool:
+    """Whether an error is a rate limit, an overloaded / unavailable provider or a transport failure."""
+    status = status if status is not None else get_status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError)) or any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read the retry-after (or retry-after-ms) header of an error response, in seconds."""
+    headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return max(0.0, float(retry_after_ms) / 1000)
+        retry_after = headers.get("retry-after")
+        if retry_after is None:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except Exception:
+        return None
+
+RATE_LIMITERS = RateLimiterRegistry()
+
+def get_rate_limiters() -> RateLimiterRegistry:
+    """Return the process-wide registry of provider limiters shared by all APIManagers."""
+    return RATE_LIMITERS
@@ -0,0 +1,183 @@
+import asyncio, hashlib, json, os, sqlite3, threading, time
+from collections import OrderedDict
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, Optional, Tuple
+from workflow.core.data_structures import References, ModelConfig, ApiType
+from workflow.util import LOGGER
+from workflow.util.const import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL, RESPONSE_CACHE_PATH
+
+# API types whose responses are deterministic enough, for identical inputs, to be reused.
+CACHEABLE_API_TYPES = {ApiType.LLM_MODEL}
+
+class ResponseCache(BaseModel):
+    """
+    Two-tier cache of API engine responses, used by APIManager for models with `use_cache`.
+
+    Entries are keyed on a canonical hash of the request (api, model, messages, system, tools,
+    temperature, seed, max_tokens and any other engine inputs) and stored as serialized
+    References. The first tier is an in-memory LRU; the second is a local SQLite file so
+    cached completions survive restarts. Every entry expires after `ttl` seconds.
+
+    Attributes:
+        max_entries (int): Maximum number of entries held in the in-memory tier.
+        ttl (float): Seconds an entry stays valid.
+        path (Optional[str]): Path of the SQLite file for the persistent tier. None disables it.
+    """
+    max_entries: int = Field(RESPONSE_CACHE_MAX_ENTRIES, description="Maximum number of entries held in memory")
+    ttl: float = Field(RESPONSE_CACHE_TTL, description="Seconds an entry stays valid")
+    path: Optional[str] = Field(RESPONSE_CACHE_PATH or None, description="Path of the SQLite file for the persistent tier")
+    _memory: "OrderedDict[str, Tuple[float, str]]" = PrivateAttr(default_factory=OrderedDict)
+    _connection: Optional[sqlite3.Connection] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "expired": 0, "errors": 0})
+
+    @staticmethod
+    def is_cacheable(api_type: ApiType, api_data: Any) -> bool:
+        """Whether the response for this API type and configuration should go through the cache."""
+        return ApiType(api_type) in CACHEABLE_API_TYPES and isinstance(api_data, ModelConfig) and bool(api_data.use_cache)
+
+    @staticmethod
+    def make_key(api_type: ApiType, api_data: ModelConfig, inputs: Dict[str, Any]) -> str:
+        """
+        Build the canonical cache key for a request.
+
+        Args:
+            api_type (ApiType): The type of API called.
+            api_data (ModelConfig): The model configuration used for the call.
+            inputs (Dict[str, Any]): The engine inputs (messages, system, tools, max_tokens, ...).
+
+        Returns:
+            str: A sha256 hex digest of the canonical JSON of the request.
+        """
+        payload = {
+            "api_type": ApiType(api_type).value,
+            "api_name": api_data.api_name.value if api_data.api_name else None,
+            "base_url": api_data.base_url,
+            "model": api_data.model,
+            "temperature": api_data.temperature,
+            "seed": api_data.seed,
+            "inputs": inputs,
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_to_jsonable)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[References]:
+        """Return the cached References for a key, or None on a miss or expired entry."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._load(value)
+            del self._memory[key]
+            self._stats["expired"] += 1
+
+        if self.path:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                expires_at, value = row
+                if expires_at > now:
+                    self._remember(key, expires_at, value)
+                    self._stats["disk_hits"] += 1
+                    return self._load(value)
+                self._stats["expired"] += 1
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, references: References, ttl: Optional[float] = None):
+        """Store a response in both tiers."""
+        if not isinstance(references, References):
+            return
+        expires_at = time.time() + (ttl if ttl is not None else self.ttl)
+        value = references.model_dump_json()
+        self._remember(key, expires_at, value)
+        self._stats["stores"] += 1
+        if self.path:
+            await asyncio.to_thread(self._disk_set, key, expires_at, value)
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        self._memory.clear()
+        if self.path:
+            with self._lock:
+                connection = self._get_connection()
+                if connection:
+                    connection.execute("DELETE FROM responses")
+                    connection.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit / miss counters and sizes of the cache."""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def _load(value: str) -> References:
+        references = References.model_validate_json(value)
+        for message in references.messages or []:
+            message.creation_metadata = {**(message.creation_metadata or {}), "cache_hit": True, "cost": 0.0}
+        return references
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        if self._connection is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._connection = sqlite3.connect(self.path, check_same_thread=False)
+                self._connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+                self._connection.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+                self._connection.commit()
+            except sqlite3.Error as e:
+                LOGGER.warning(f"Response cache persistent tier disabled, could not open {self.path}: {e}")
+                self.path = None
+                self._connection = None
+        return self._connection
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            try:
+                connection = self._get_connection()
+                if connection is None:
+                    return None
+                row = connection.execute("SELECT expires_at, value FROM responses WHERE key = ?", (key,)).fetchone()
+                return (row[0], row[1]) if row else None
+            except sqlite3.Error as e:
+                self._stats["errors"] += 1
+                LOGGER.warning(f"Response cache read failed: {e}")
+                return None
+
+    def _disk_set(self, key: str, expires_at: float, value: str):
+        with self._lock:
+            try:
+                connection = self._get_connection()
+                if connection is None:
+                    return
+                connection.execute("INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at))
+                connection.commit()
+            except sqlite3.Error as e:
+                self._stats["errors"] += 1
+                LOGGER.warning(f"Response cache write failed: {e}")
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return str(value)
+
+RESPONSE_CACHE = ResponseCache()
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache shared by all APIManagers."""
+    return RESPONSE_CACHE
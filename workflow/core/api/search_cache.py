@@ -0,0 +1,272 @@
+import asyncio, hashlib, json, os, re, sqlite3, threading, time, unicodedata
+from collections import OrderedDict
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable, Set
+from workflow.core.data_structures import References, URLReference
+from workflow.util import LOGGER
+from workflow.util.const import (
+    SEARCH_CACHE_ENABLED, SEARCH_CACHE_MAX_ENTRIES, SEARCH_CACHE_DEFAULT_TTL, SEARCH_CACHE_TTLS, SEARCH_CACHE_STALE_TTL, SEARCH_CACHE_PATH
+)
+
+# A cached search result: (title, url, content, metadata)
+CompactResult = Tuple[str, str, str, Dict[str, str]]
+# A cache entry: (fresh until, stale until, engine, results)
+CacheEntry = Tuple[float, float, str, List[CompactResult]]
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, width and whitespace insensitive form of a search query."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", prompt or "")).strip().casefold()
+
+class SearchCache(BaseModel):
+    """
+    Two-tier cache of search results shared by every APISearchEngine.
+
+    Entries are keyed on (engine, normalized prompt, max_results, other engine inputs, API
+    configuration) and hold the results in compact form, (title, url, content, metadata), which
+    rehydrate into URLReferences without validation. The first tier is an in-memory LRU; the
+    second a local SQLite file, so results survive restarts.
+
+    An entry is fresh for the TTL of its engine. For `stale_ttl` seconds after that it is still
+    served, while a single background refresh replaces it. Concurrent misses on the same key
+    share one search.
+
+    Attributes:
+        enabled (bool): Whether searches go through the cache.
+        max_entries (int): Maximum number of entries held in memory.
+        default_ttl (float): Seconds results stay fresh, for engines without their own TTL.
+        ttls (Dict[str, float]): Seconds results stay fresh, per engine.
+        stale_ttl (float): Seconds expired results are still served while being refreshed.
+        path (Optional[str]): Path of the SQLite file for the persistent tier. None disables it.
+    """
+    enabled: bool = Field(SEARCH_CACHE_ENABLED, description="Whether searches go through the cache")
+    max_entries: int = Field(SEARCH_CACHE_MAX_ENTRIES, description="Maximum number of entries held in memory")
+    default_ttl: float = Field(SEARCH_CACHE_DEFAULT_TTL, description="Seconds results stay fresh by default")
+    ttls: Dict[str, float] = Field(default_factory=lambda: dict(SEARCH_CACHE_TTLS), description="Seconds results stay fresh, per engine")
+    stale_ttl: float = Field(SEARCH_CACHE_STALE_TTL, description="Seconds expired results are served while being refreshed")
+    path: Optional[str] = Field(SEARCH_CACHE_PATH or None, description="Path of the SQLite file for the persistent tier")
+    _memory: "OrderedDict[str, CacheEntry]" = PrivateAttr(default_factory=OrderedDict)
+    _pending: Dict[str, asyncio.Future] = PrivateAttr(default_factory=dict)
+    _refreshing: Set[asyncio.Task] = PrivateAttr(default_factory=set)
+    _connection: Optional[sqlite3.Connection] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {
+        "memory_hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0, "shared_misses": 0,
+        "stores": 0, "refreshes": 0, "refresh_errors": 0, "errors": 0
+    })
+
+    @staticmethod
+    def make_key(engine: str, prompt: str, max_results: Any, params: Dict[str, Any], api_data: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the cache key of a search.
+
+        The API configuration is part of the key, since e.g. a custom search engine id or a
+        base_url change the results; the key is a hash, credentials are not stored.
+        """
+        payload = [engine, normalize_prompt(prompt), max_results, params, api_data or {}]
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def ttl(self, engine: str) -> float:
+        return self.ttls.get(engine, self.default_ttl)
+
+    async def fetch(self, engine: str, key: str, search: Callable[[], Awaitable[References]]) -> References:
+        """
+        Return the results of a search from the cache, running `search` on a miss.
+
+        Args:
+            engine (str): The engine name, which selects the TTL.
+            key (str): The key of the search, see `make_key`.
+            search (Callable[[], Awaitable[References]]): Runs the search.
+
+        Returns:
+            References: The search results.
+        """
+        entry = await self._get(key)
+        now = time.time()
+        if entry is not None and entry[0] > now:
+            return self._rehydrate(entry)
+        if entry is not None:
+            self._stats["stale_hits"] += 1
+            self._refresh(engine, key, search)
+            return self._rehydrate(entry)
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self._stats["shared_misses"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The search this call waited on was cancelled with its own caller: search again
+                if not pending.cancelled():
+                    raise
+        else:
+            self._stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            references = await search()
+            await self._store(engine, key, references)
+            future.set_result(references)
+            return references
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters retrieve the exception; mark it retrieved for the case nobody was waiting
+            future.exception()
+            raise
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def _refresh(self, engine: str, key: str, search: Callable[[], Awaitable[References]]):
+        """Refresh a stale entry in the background, once per key."""
+        if key in self._pending:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+
+        async def refresh():
+            try:
+                references = await search()
+                await self._store(engine, key, references)
+                self._stats["refreshes"] += 1
+                future.set_result(references)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                self._stats["refresh_errors"] += 1
+                LOGGER.warning(f"Search cache: refreshing a {engine} search failed, keeping the stale results: {e}")
+                future.set_exception(e)
+                future.exception()
+            finally:
+                if self._pending.get(key) is future:
+                    del self._pending[key]
+
+        task = asyncio.create_task(refresh())
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    async def _get(self, key: str) -> Optional[CacheEntry]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                self._memory.move_to_end(key)
+                if entry[0] > now:
+                    self._stats["memory_hits"] += 1
+                return entry
+            del self._memory[key]
+        if self.path:
+            entry = await asyncio.to_thread(self._disk_get, key)
+            if entry is not None and entry[1] > now:
+                if entry[0] > now:
+                    self._stats["disk_hits"] += 1
+                self._remember(key, entry)
+                return entry
+        return None
+
+    async def _store(self, engine: str, key: str, references: References):
+        # Empty results are not cached, the next search tries again
+        if not isinstance(references, References) or not references.search_results:
+            return
+        now = time.time()
+        fresh_until = now + self.ttl(engine)
+        entry: CacheEntry = (fresh_until, fresh_until + self.stale_ttl, engine, [self._compact(result) for result in references.search_results])
+        self._remember(key, entry)
+        self._stats["stores"] += 1
+        if self.path:
+            await asyncio.to_thread(self._disk_set, key, entry)
+
+    @staticmethod
+    def _compact(result: URLReference) -> CompactResult:
+        return (result.title, result.url, result.content, result.metadata)
+
+    @staticmethod
+    def _rehydrate(entry: CacheEntry) -> References:
+        # Cached results were validated when stored: build them without validating again
+        return References(search_results=[
+            URLReference.model_construct(title=title, url=url, content=content, metadata=dict(metadata))
+            for title, url, content, metadata in entry[3]
+        ])
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit / miss counters and sizes of the cache. Stale hits count as hits."""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["stale_hits"]
+        lookups = hits + self._stats["misses"] + self._stats["shared_misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "pending": len(self._pending),
+        }
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        self._memory.clear()
+        if self.path:
+            with self._lock:
+                connection = self._get_connection()
+                if connection:
+                    connection.execute("DELETE FROM search_results")
+                    connection.commit()
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        if self._connection is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._connection = sqlite3.connect(self.path, check_same_thread=False)
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS search_results (key TEXT PRIMARY KEY, engine TEXT NOT NULL, "
+                    "fresh_until REAL NOT NULL, stale_until REAL NOT NULL, value TEXT NOT NULL)"
+                )
+                self._connection.execute("DELETE FROM search_results WHERE stale_until <= ?", (time.time(),))
+                self._connection.commit()
+            except sqlite3.Error as e:
+                LOGGER.warning(f"Search cache persistent tier disabled, could not open {self.path}: {e}")
+                self.path = None
+                self._connection = None
+        return self._connection
+
+    def _disk_get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            try:
+                connection = self._get_connection()
+                if connection is None:
+                    return None
+                row = connection.execute("SELECT fresh_until, stale_until, engine, value FROM search_results WHERE key = ?", (key,)).fetchone()
+                return (row[0], row[1], row[2], [tuple(result) for result in json.loads(row[3])]) if row else None
+            except (sqlite3.Error, ValueError) as e:
+                self._stats["errors"] += 1
+                LOGGER.warning(f"Search cache read failed: {e}")
+                return None
+
+    def _disk_set(self, key: str, entry: CacheEntry):
+        with self._lock:
+            try:
+                connection = self._get_connection()
+                if connection is None:
+                    return
+                connection.execute(
+                    "INSERT OR REPLACE INTO search_results (key, engine, fresh_until, stale_until, value) VALUES (?, ?, ?, ?, ?)",
+                    (key, entry[2], entry[0], entry[1], json.dumps(entry[3], separators=(",", ":")))
+                )
+                connection.commit()
+            except sqlite3.Error as e:
+                self._stats["errors"] += 1
+                LOGGER.warning(f"Search cache write failed: {e}")
+
+SEARCH_CACHE = SearchCache()
+
+def get_search_cache() -> SearchCache:
+    """Return the process-wide cache of search results shared by all search engines."""
+    return SEARCH_CACHE
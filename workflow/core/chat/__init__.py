@@ -1,3 +1,4 @@
 from .chat import AliceChat
+from .chat_summarizer import ChatSummarizer, ChatSummary, get_chat_summarizer
 
-__all__ = ['AliceChat']
\ No newline at end of file
+__all__ = ['AliceChat', 'ChatSummarizer', 'ChatSummary', 'get_chat_summarizer']
\ No newline at end of file
@@ -1,13 +1,14 @@
 import traceback
 from bson import ObjectId
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Callable, Any
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
+from typing import List, Optional, Dict, Callable, Any, AsyncIterator
 from workflow.util import LOGGER
-from workflow.core.data_structures import MessageDict, ToolFunction
-from workflow.core.agent import AliceAgent
+from workflow.core.data_structures import MessageDict, ToolFunction, StreamEvent, ModelType
+from workflow.core.agent import AliceAgent, ToolRegistry
 from workflow.core.prompt import Prompt
 from workflow.core.api import APIManager
 from workflow.core.tasks import AliceTask
+from workflow.core.chat.chat_summarizer import get_chat_summarizer
 
 class AliceChat(BaseModel):
     """
@@ -29,8 +30,13 @@ class AliceChat(BaseModel):
             Returns a list of function configurations for the available tasks.
         tool_map(api_manager: APIManager) -> Optional[Dict[str, Callable]]:
             Combines all available function maps from the registered tasks.
+        tool_registry(api_manager: APIManager) -> ToolRegistry:
+            Returns the cached registry behind tool_list and tool_map.
         generate_response(api_manager: APIManager, new_message: Optional[str] = None) -> List[MessageDict]:
-            Generates a response in the chat, processing any new user message.
+            Generates a response in the chat, processing any new user message. Long histories are
+            compacted into a rolling summary when chat summarization is enabled (see ChatSummarizer).
+        stream_response(api_manager: APIManager, new_message: Optional[str] = None) -> AsyncIterator[StreamEvent]:
+            Streams the response in the chat as text deltas, tool calls and completed messages.
         deep_validate_required_apis(api_manager: APIManager) -> Dict[str, Any]:
             Performs a deep validation of all required APIs for the chat and its functions.
     """
@@ -48,6 +54,7 @@ class AliceChat(BaseModel):
         description="The Alice agent object. Default is base Alice Agent.")
     functions: Optional[List[AliceTask]] = Field([], description="List of functions to be registered with the agent")
     model_config = ConfigDict(protected_namespaces=(), json_encoders = {ObjectId: str})
+    _tool_registry: Optional[ToolRegistry] = PrivateAttr(default=None)
 
     def model_dump(self, *args, **kwargs):
         data = super().model_dump(*args, **kwargs)
@@ -65,15 +72,29 @@ class AliceChat(BaseModel):
         
         return data
     
+    def tool_registry(self, api_manager: APIManager) -> ToolRegistry:
+        """The registry of the chat's functions, rebuilt only when the functions or the API manager change."""
+        functions = self.functions or []
+        version = ToolRegistry.tasks_version(functions, api_manager)
+        if self._tool_registry is None or self._tool_registry.version != version:
+            self._tool_registry = ToolRegistry.from_tasks(functions, api_manager)
+        return self._tool_registry
+
     def tool_list(self, api_manager: APIManager) -> List[ToolFunction]:
-        return [func.get_function(api_manager)["tool_function"].model_dump() for func in self.functions] if self.functions else None
+        return self.tool_registry(api_manager).schemas if self.functions else None
     
     def tool_map(self, api_manager: APIManager) -> Optional[Dict[str, Callable]]:
-        combined_function_map = {}
-        for func in self.functions:
-            function_details = func.get_function(api_manager=api_manager)
-            combined_function_map.update(function_details["function_map"])
-        return combined_function_map
+        return self.tool_registry(api_manager).tool_map
+
+    async def context_messages(self, api_manager: APIManager) -> List[MessageDict]:
+        """The history to send to the agent: the messages, or a summary of the older ones followed by the recent ones."""
+        return await get_chat_summarizer().compact(
+            api_manager,
+            self.id,
+            self.messages,
+            model=self.alice_agent.llm_model,
+            summary_model=self.alice_agent.models.get(ModelType.INSTRUCT)
+        )
 
     async def generate_response(self, api_manager: APIManager, new_message: Optional[str] = None) -> List[MessageDict]:
         try:
@@ -82,7 +103,7 @@ class AliceChat(BaseModel):
             
             new_messages, start_messages = await self.alice_agent.chat(
                 api_manager=api_manager, 
-                messages=self.messages, 
+                messages=await self.context_messages(api_manager), 
                 tool_map=self.tool_map(api_manager), 
                 tools_list=self.tool_list(api_manager), 
                 max_turns=self.alice_agent.max_consecutive_auto_reply,
@@ -95,6 +116,29 @@ class AliceChat(BaseModel):
             LOGGER.error(f"Traceback: {traceback.format_exc()}")
             return []
     
+    async def stream_response(self, api_manager: APIManager, new_message: Optional[str] = None) -> AsyncIterator[StreamEvent]:
+        try:
+            if not self.messages: self.messages = []
+            if new_message: self.messages.append(MessageDict(role="user", content=new_message, generated_by="user", type="text"))
+
+            new_messages = []
+            async for event in self.alice_agent.stream_chat(
+                api_manager=api_manager, 
+                messages=await self.context_messages(api_manager), 
+                tool_map=self.tool_map(api_manager), 
+                tools_list=self.tool_list(api_manager), 
+                max_turns=self.alice_agent.max_consecutive_auto_reply,
+                ):
+                if event.type == "message":
+                    new_messages.append(event.message)
+                yield event
+            LOGGER.debug(f"New messages streamed: {new_messages}")
+            self.messages.extend(new_messages)
+        except Exception as e:
+            LOGGER.error(f"Error in chat stream_response: {str(e)}")
+            LOGGER.error(f"Traceback: {traceback.format_exc()}")
+            yield StreamEvent(type="error", content=str(e))
+    
     def deep_validate_required_apis(self, api_manager: APIManager) -> Dict[str, Any]:
         result = {
             "chat_name": self.name,
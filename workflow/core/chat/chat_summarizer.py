@@ -0,0 +1,172 @@
+import hashlib
+from collections import OrderedDict
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Optional
+from workflow.util import LOGGER, get_token_counter
+from workflow.util.const import CHAT_SUMMARY_ENABLED, CHAT_SUMMARY_THRESHOLD, CHAT_SUMMARY_KEEP_LAST, CHAT_SUMMARY_MAX_TOKENS, CHAT_SUMMARY_CACHE_SIZE
+from workflow.core.data_structures import MessageDict, ContentType, ApiType, ModelType, References
+from workflow.core.model import AliceModel
+from workflow.core.api import APIManager
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an AI assistant. "
+    "Update the summary with the new messages. Keep facts, decisions, names, numbers, open questions and "
+    "the results of tools; drop small talk. Answer with the updated summary only."
+)
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+class ChatSummary(BaseModel):
+    """
+    The rolling summary of a chat: the summary text and the prefix of the history it covers.
+
+    Attributes:
+        content (str): The summary.
+        covered (int): Number of leading messages of the history the summary replaces.
+        fingerprint (str): Hash of those messages, to detect an edited history.
+    """
+    content: str = Field(..., description="The summary")
+    covered: int = Field(..., description="Number of leading messages the summary replaces")
+    fingerprint: str = Field(..., description="Hash of the covered messages")
+
+class ChatSummarizer(BaseModel):
+    """
+    Keeps the prompts of long chats bounded by replacing older turns with a rolling summary.
+
+    Once the history sent to the model passes `threshold` tokens, the messages before the last
+    `keep_last` are summarized by a cheap model. The summary is cached per chat id: later turns
+    reuse it as is until the messages after it pass the threshold again, and then only those
+    new messages are folded into it. The chat's own history is never modified.
+
+    Attributes:
+        enabled (bool): Whether chats are compacted at all.
+        threshold (int): Token count of the history above which it is compacted.
+        keep_last (int): Number of trailing messages always sent verbatim.
+        max_summary_tokens (int): Maximum length of a summary, in tokens.
+        cache_size (int): Maximum number of cached chat summaries.
+        model (Optional[AliceModel]): Model writing the summaries. Defaults to the agent's instruct model, then the LLM API's default model.
+    """
+    enabled: bool = Field(CHAT_SUMMARY_ENABLED, description="Whether chats are compacted")
+    threshold: int = Field(CHAT_SUMMARY_THRESHOLD, description="Token count above which the history is compacted")
+    keep_last: int = Field(CHAT_SUMMARY_KEEP_LAST, description="Number of trailing messages always sent verbatim")
+    max_summary_tokens: int = Field(CHAT_SUMMARY_MAX_TOKENS, description="Maximum length of a summary, in tokens")
+    cache_size: int = Field(CHAT_SUMMARY_CACHE_SIZE, description="Maximum number of cached chat summaries")
+    model: Optional[AliceModel] = Field(None, description="Model writing the summaries")
+    _summaries: "OrderedDict[str, ChatSummary]" = PrivateAttr(default_factory=OrderedDict)
+
+    async def compact(self, api_manager: APIManager, chat_id: Optional[str], messages: List[MessageDict],
+                      model: Optional[AliceModel] = None, summary_model: Optional[AliceModel] = None) -> List[MessageDict]:
+        """
+        Return the messages to send for a chat: the history itself while it is small, or a summary
+        message followed by the recent messages.
+
+        Args:
+            api_manager (APIManager): The API manager used to call the summarization model.
+            chat_id (Optional[str]): The chat id the summary is cached under. Without one, nothing is cached.
+            messages (List[MessageDict]): The full chat history.
+            model (Optional[AliceModel]): The chat's model, whose tokenizer counts the history.
+            summary_model (Optional[AliceModel]): The model to summarize with when `self.model` is not set.
+
+        Returns:
+            List[MessageDict]: The messages to send to the agent.
+        """
+        if not self.enabled or not messages:
+            return messages
+        counter = get_token_counter(model.api_name if model else None, model.model_format if model else None)
+        costs = [counter.count_text(str(message)) for message in messages]
+        if sum(costs) <= self.threshold:
+            return messages
+
+        summary = self._get(chat_id, messages)
+        covered = summary.covered if summary else 0
+        summary_cost = counter.count_text(summary.content) if summary else 0
+        if summary and summary_cost + sum(costs[covered:]) <= self.threshold:
+            return [self._summary_message(summary)] + messages[covered:]
+
+        split = self._split_index(messages)
+        if split <= covered:
+            return [self._summary_message(summary)] + messages[covered:] if summary else messages
+        try:
+            content = await self._summarize(api_manager, summary.content if summary else None, messages[covered:split], summary_model)
+        except Exception as e:
+            LOGGER.warning(f"Chat summarization failed, sending the full history: {e}")
+            return [self._summary_message(summary)] + messages[covered:] if summary else messages
+        summary = ChatSummary(content=content, covered=split, fingerprint=self._fingerprint(messages[:split]))
+        self._store(chat_id, summary)
+        LOGGER.debug(f"Chat {chat_id}: summarized {split} messages ({sum(costs[:split])} tokens) into {counter.count_text(content)} tokens")
+        return [self._summary_message(summary)] + messages[split:]
+
+    def _split_index(self, messages: List[MessageDict]) -> int:
+        """
+        Index of the first message kept verbatim. It is always an assistant turn, so the summary (a
+        user message) is followed by the model's answer and roles keep alternating; this also keeps
+        tool results with their call. 0 if no assistant turn precedes the last `keep_last` messages.
+        """
+        split = max(0, len(messages) - self.keep_last)
+        while 0 < split < len(messages) and messages[split].role != "assistant":
+            split -= 1
+        return split
+
+    async def _summarize(self, api_manager: APIManager, previous: Optional[str], new_messages: List[MessageDict], summary_model: Optional[AliceModel]) -> str:
+        transcript = "\n\n".join(str(message) for message in new_messages)
+        prompt = f"Current summary:\n{previous}\n\nNew messages:\n{transcript}" if previous else f"Messages:\n{transcript}"
+        response: References = await api_manager.generate_response_with_api_engine(
+            api_type=ApiType.LLM_MODEL,
+            model=self.model or summary_model,
+            messages=[{"role": "user", "content": prompt}],
+            system=SUMMARY_SYSTEM_PROMPT,
+            tool_choice='none',
+            tools=[],
+            temperature=0.0,
+            max_tokens=self.max_summary_tokens
+        )
+        if not response or not response.messages or not response.messages[0].content:
+            raise ValueError("No summary returned by the API")
+        return response.messages[0].content.strip()
+
+    @staticmethod
+    def _summary_message(summary: ChatSummary) -> MessageDict:
+        return MessageDict(
+            role="user",
+            content=SUMMARY_PREFIX + summary.content,
+            generated_by="system",
+            step="chat_summary",
+            type=ContentType.TEXT
+        )
+
+    @staticmethod
+    def _fingerprint(messages: List[MessageDict]) -> str:
+        digest = hashlib.sha256()
+        for message in messages:
+            digest.update(str(message).encode("utf-8", "replace"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _get(self, chat_id: Optional[str], messages: List[MessageDict]) -> Optional[ChatSummary]:
+        """The cached summary of the chat, if it still matches the start of the history."""
+        summary = self._summaries.get(chat_id) if chat_id else None
+        if summary is None:
+            return None
+        if summary.covered > len(messages) or summary.fingerprint != self._fingerprint(messages[:summary.covered]):
+            LOGGER.debug(f"Chat {chat_id}: history changed, discarding its summary")
+            del self._summaries[chat_id]
+            return None
+        self._summaries.move_to_end(chat_id)
+        return summary
+
+    def _store(self, chat_id: Optional[str], summary: ChatSummary):
+        if not chat_id:
+            return
+        self._summaries[chat_id] = summary
+        self._summaries.move_to_end(chat_id)
+        while len(self._summaries) > self.cache_size:
+            self._summaries.popitem(last=False)
+
+    def forget(self, chat_id: str):
+        """Drop the cached summary of a chat."""
+        self._summaries.pop(chat_id, None)
+
+CHAT_SUMMARIZER = ChatSummarizer()
+
+def get_chat_summarizer() -> ChatSummarizer:
+    """Return the process-wide chat summarizer."""
+    return CHAT_SUMMARIZER
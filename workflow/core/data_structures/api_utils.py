@@ -8,6 +8,7 @@ class ApiType(str, Enum):
     WIKIPEDIA_SEARCH = 'wikipedia_search'
     EXA_SEARCH = 'exa_search'
     ARXIV_SEARCH = 'arxiv_search'
+    META_SEARCH = 'meta_search'
     IMG_VISION = 'img_vision'
     IMG_GENERATION = 'img_generation'
     SPEECH_TO_TEXT = 'speech_to_text'
@@ -48,9 +49,11 @@ class ApiName(str, Enum):
     WIKIPEDIA_SEARCH = 'wikipedia_search',
     EXA_SEARCH = 'exa_search',
     ARXIV_SEARCH = 'arxiv_search'
+    META_SEARCH = 'meta_search'
     GOOGLE_KNOWLEDGE_GRAPH = 'google_knowledge_graph'
 
 ModelApis: List[ApiType] = [ApiType.LLM_MODEL, ApiType.IMG_VISION, ApiType.IMG_GENERATION, ApiType.SPEECH_TO_TEXT, ApiType.TEXT_TO_SPEECH, ApiType.EMBEDDINGS]
+SearchApis: List[ApiType] = [ApiType.GOOGLE_SEARCH, ApiType.REDDIT_SEARCH, ApiType.WIKIPEDIA_SEARCH, ApiType.EXA_SEARCH, ApiType.ARXIV_SEARCH]
     
 class ModelType(str, Enum):
     INSTRUCT = 'instruct'
@@ -1,11 +1,13 @@
 from __future__ import annotations
-import base64, io, magic, os
-from typing import Union, BinaryIO, Optional
-from pydantic import Field, field_validator
+import ast, base64, hashlib, io, json, magic, mmap, os, struct, sys
+from array import array
+from typing import Union, BinaryIO, Optional, List, Tuple, Any
+from pydantic import Field, field_validator, PrivateAttr
 from PIL import Image
 from workflow.core.data_structures.base_models import BaseDataStructure, FileType
 from workflow.core.data_structures.message import MessageDict
 from workflow.util import LOGGER
+from workflow.util.const import EMBEDDINGS_DIR, EMBEDDING_INLINE_MAX_BYTES
 
 class FileReference(BaseDataStructure):
     id: Optional[str] = Field(None, description="The unique identifier for the file reference", alias="_id")
@@ -76,6 +78,172 @@ class FileContentReference(FileReference):
     storage_path: Optional[str] = Field(None, description="The path to the file in the shared volume")
     content: str = Field(..., description="The base64 encoded content of the file")
 
+NPY_MAGIC = b"\x93NUMPY"
+
+class EmbeddingReference(FileContentReference):
+    """
+    A matrix of embeddings held as a contiguous float32 buffer instead of JSON.
+
+    In process, consumers read the buffer (or memory-map the file). Towards the backend it is a
+    regular FileContentReference whose content is a complete `.npy` file, so it is stored like
+    any other file and the dtype and shape travel in the file's own header.
+
+    Large matrices are written once as a `.npy` file under EMBEDDINGS_DIR and the reference
+    only carries that handle (`storage_path`) plus the dtype and shape; consumers memory-map
+    the file, and the file is only read back to upload it when the reference is stored. Small
+    matrices, or when the shared volume is not writable, travel inline as the base64 of the
+    `.npy` file.
+    """
+    type: FileType = Field(FileType.FILE, description="The type of the file reference")
+    storage_path: Optional[str] = Field(None, description="The path to the .npy file in the shared volume")
+    dtype: str = Field("float32", description="The element type of the embeddings")
+    shape: Tuple[int, int] = Field(..., description="The number of vectors and their dimension")
+    content: Optional[str] = Field(None, description="The base64 encoded .npy file, when not stored as a file")
+    _buffer: Optional[memoryview] = PrivateAttr(default=None)
+    _mmap: Optional[mmap.mmap] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_vectors(cls, vectors: List[List[float]], filename: str, transcript: Optional[MessageDict] = None,
+                     directory: Optional[str] = EMBEDDINGS_DIR, inline_max_bytes: int = EMBEDDING_INLINE_MAX_BYTES) -> EmbeddingReference:
+        """
+        Pack vectors into a float32 buffer and build the reference.
+
+        Args:
+            vectors (List[List[float]]): The embeddings, all of the same dimension.
+            filename (str): Name of the reference; the stored file gets a `.npy` extension.
+            transcript (Optional[MessageDict]): The input and creation metadata of the embeddings.
+            directory (Optional[str]): Where to store matrices larger than `inline_max_bytes`. None keeps them inline.
+            inline_max_bytes (int): Largest matrix, in bytes, carried inline in the reference.
+
+        Returns:
+            EmbeddingReference: The reference, holding the buffer in memory.
+        """
+        dimension = len(vectors[0]) if vectors else 0
+        if any(len(vector) != dimension for vector in vectors):
+            raise ValueError("All embedding vectors must have the same dimension")
+        data = array('f')
+        for vector in vectors:
+            data.extend(vector)
+        raw = _to_little_endian(data)
+        filename = os.path.splitext(filename)[0] + ".npy"
+
+        reference = cls(filename=filename, shape=(len(vectors), dimension), transcript=transcript)
+        if directory and len(raw) > inline_max_bytes:
+            try:
+                reference.storage_path = _write_npy(directory, raw, reference.shape)
+            except OSError as e:
+                LOGGER.warning(f"Could not store embeddings in {directory}, keeping them inline: {e}")
+        if reference.storage_path is None:
+            reference.content = base64.b64encode(_npy_bytes(raw, reference.shape)).decode('utf-8')
+        reference._buffer = memoryview(data).cast('B').cast('f', list(reference.shape)) if data else memoryview(data)
+        return reference
+
+    @property
+    def buffer(self) -> memoryview:
+        """A read-only, zero-copy float32 view of the embeddings with `shape`, loaded (or memory-mapped) on first access."""
+        if self._buffer is None:
+            if self.content is not None:
+                data = base64.b64decode(self.content)
+                offset, shape = _read_npy_header(data)
+                self._check_shape(shape, self.filename)
+                raw = _from_little_endian(data[offset:])
+            elif self.storage_path:
+                raw = self._map_file()
+            else:
+                raise ValueError("Invalid EmbeddingReference: No content or storage_path provided")
+            self._buffer = raw.cast('f', list(self.shape)) if len(raw) else raw
+        return self._buffer.toreadonly()
+
+    def model_dump(self, *args, **kwargs):
+        data = super().model_dump(*args, **kwargs)
+        # A matrix stored under EMBEDDINGS_DIR is uploaded with its file content when the reference is first stored
+        if self.id is None and self.content is None and self.storage_path and 'content' in data:
+            with open(self.storage_path, 'rb') as file:
+                data['content'] = base64.b64encode(file.read()).decode('utf-8')
+        return data
+
+    def as_numpy(self) -> Any:
+        """The embeddings as a NumPy array sharing the buffer (requires numpy)."""
+        import numpy
+        return numpy.frombuffer(self.buffer.cast('B'), dtype=numpy.float32).reshape(self.shape)
+
+    def to_list(self) -> List[List[float]]:
+        """The embeddings as nested lists of floats."""
+        return self.buffer.tolist() if self.shape[0] and self.shape[1] else [[] for _ in range(self.shape[0])]
+
+    def get_content_string(self, max_chars: int = 1000) -> str:
+        file_info = f"\n\nFile: {self.filename}\n\nType: embeddings ({self.shape[0]} x {self.shape[1]} {self.dtype})"
+        if self.transcript:
+            model_name = self.transcript.creation_metadata.get('model', 'Unknown') if self.transcript.creation_metadata else 'Unknown'
+            return f"{file_info}\n\nInput (embedded by {model_name}):\n\n{str(self.transcript.content)[:max_chars]}"
+        return file_info
+
+    def _map_file(self) -> memoryview:
+        with open(self.storage_path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        offset, shape = _read_npy_header(self._mmap)
+        self._check_shape(shape, self.storage_path)
+        raw = memoryview(self._mmap)[offset:]
+        if sys.byteorder != 'little':
+            return _from_little_endian(bytes(raw))
+        return raw
+
+    def _check_shape(self, shape: Tuple[int, ...], source: str):
+        if tuple(shape) != tuple(self.shape):
+            raise ValueError(f"Embeddings {source} have shape {shape}, expected {self.shape}")
+
+def _to_little_endian(data: array) -> bytes:
+    if sys.byteorder == 'little':
+        return data.tobytes()
+    swapped = array('f', data)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+def _from_little_endian(raw: bytes) -> memoryview:
+    data = array('f')
+    data.frombytes(raw)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return memoryview(data).cast('B')
+
+def _write_npy(directory: str, raw: bytes, shape: Tuple[int, int]) -> str:
+    """Write a little-endian float32 matrix as a version 1.0 .npy file, named by its content hash."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"embeddings_{hashlib.sha256(raw).hexdigest()[:24]}.npy")
+    if os.path.exists(path):
+        return path
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(_npy_header(shape))
+        file.write(raw)
+    os.replace(temp_path, path)
+    return path
+
+def _npy_header(shape: Tuple[int, int]) -> bytes:
+    """The version 1.0 .npy header of a little-endian float32 matrix."""
+    header = f"{{'descr': '<f4', 'fortran_order': False, 'shape': ({shape[0]}, {shape[1]}), }}"
+    # Magic, version and header length take 10 bytes; the header is padded so the data starts 64-byte aligned
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    return NPY_MAGIC + b"\x01\x00" + struct.pack('<H', len(header)) + header.encode('latin1')
+
+def _npy_bytes(raw: bytes, shape: Tuple[int, int]) -> bytes:
+    """A little-endian float32 matrix as the content of a .npy file."""
+    return _npy_header(shape) + raw
+
+def _read_npy_header(data: Union[bytes, mmap.mmap]) -> Tuple[int, Tuple[int, ...]]:
+    """Return the data offset and shape of a little-endian float32 .npy file."""
+    if data[:6] != NPY_MAGIC:
+        raise ValueError("Not a .npy file")
+    major = data[6]
+    if major == 1:
+        header_length, offset = struct.unpack('<H', data[8:10])[0], 10
+    else:
+        header_length, offset = struct.unpack('<I', data[8:12])[0], 12
+    header = ast.literal_eval(bytes(data[offset:offset + header_length]).decode('latin1'))
+    if header.get('descr') != '<f4' or header.get('fortran_order'):
+        raise ValueError(f"Unsupported .npy layout: {header}")
+    return offset + header_length, tuple(header['shape'])
+
 def generate_file_content_reference(file: Union[BinaryIO, io.BytesIO], filename: str) -> FileContentReference:
     # Ensure we're at the start of the file
     file.seek(0)
@@ -146,6 +314,8 @@ def get_file_content(file_reference: FileReference, max_pixels: int = 1024*1024,
     try:
         LOGGER.debug(f"Processing file: {file_reference.filename}, Type: {file_reference.type}")
         content = None
+        if isinstance(file_reference, EmbeddingReference):
+            return json.dumps(file_reference.to_list())
         if isinstance(file_reference, FileContentReference) and file_reference.content:
             LOGGER.debug('FileContentReference with content found')
             content = base64.b64decode(file_reference.content)
@@ -160,6 +330,13 @@ def get_file_content(file_reference: FileReference, max_pixels: int = 1024*1024,
         else:
             raise ValueError("Invalid FileReference: No content or valid storage_path provided")
 
+        # Embeddings loaded back from the backend are plain file references to a .npy file
+        if content.startswith(NPY_MAGIC):
+            offset, shape = _read_npy_header(content)
+            if not all(shape):
+                return json.dumps([[] for _ in range(shape[0])])
+            return json.dumps(_from_little_endian(content[offset:]).cast('f', list(shape)).tolist())
+
         # Process image files
         if file_reference.type == FileType.IMAGE:
             LOGGER.debug("Processing image file")
@@ -1,13 +1,17 @@
 from typing import List, Optional
 from pydantic import BaseModel, ConfigDict
+from workflow.core.data_structures.api_utils import ApiName
 
 class ModelConfig(BaseModel):
     model: str
+    api_name: Optional[ApiName] = None
+    model_format: Optional[str] = None
     api_key: Optional[str]
     base_url: Optional[str]
     temperature: Optional[float] = 0.9
     timeout: Optional[int] = 300
     use_cache: Optional[bool] = False
+    seed: Optional[int] = None
     tools: Optional[List[str]] = None
     model_config = ConfigDict(protected_namespaces=())
     ctx_size: Optional[int] = 1024
@@ -1,13 +1,13 @@
 from typing import List, Optional, Union, Any, Dict
 from pydantic import BaseModel, Field
 from workflow.core.data_structures.message import MessageDict
-from workflow.core.data_structures.file_reference import FileReference, FileContentReference
+from workflow.core.data_structures.file_reference import FileReference, FileContentReference, EmbeddingReference
 from workflow.core.data_structures.task_response import TaskResponse
 from workflow.core.data_structures.url_reference import URLReference
 
 class References(BaseModel):
     messages: Optional[List[MessageDict]] = Field(default=None, description="List of message references")
-    files: Optional[List[Union[FileReference, FileContentReference]]] = Field(default=None, description="List of file references")
+    files: Optional[List[Union[EmbeddingReference, FileContentReference, FileReference]]] = Field(default=None, description="List of file references")
     task_responses: Optional[List[TaskResponse]] = Field(default=None, description="List of task response references")
     search_results: Optional[List[URLReference]] = Field(default=None, description="List of search result references")
     string_outputs: Optional[List[str]] = Field(default=None, description="List of string output references")
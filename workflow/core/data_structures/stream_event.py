@@ -0,0 +1,33 @@
+from typing import Optional, Literal, Dict, Any
+from pydantic import BaseModel, Field
+from workflow.core.data_structures.message import MessageDict
+from workflow.core.data_structures.parameters import ToolCall
+
+StreamEventType = Literal["delta", "tool_call", "message", "error", "done"]
+
+class StreamEvent(BaseModel):
+    """
+    A single event of a streamed response.
+
+    - delta: a chunk of generated text, in `content`.
+    - tool_call: a complete tool call requested by the model, in `tool_call`.
+    - message: a complete message (assistant reply, tool result, code output), in `message`.
+    - error: an error that ended the stream, in `content`.
+    - done: the stream finished.
+    """
+    type: StreamEventType = Field(..., description="The type of the event")
+    content: Optional[str] = Field(default=None, description="Text delta or error description")
+    tool_call: Optional[ToolCall] = Field(default=None, description="Tool call requested by the model")
+    message: Optional[MessageDict] = Field(default=None, description="A completed message")
+
+    def to_sse(self) -> str:
+        """Serialize the event as a Server-Sent Events frame."""
+        return f"event: {self.type}\ndata: {self.model_dump_json(exclude_none=True)}\n\n"
+
+    def model_dump(self, *args, **kwargs) -> Dict[str, Any]:
+        data = super().model_dump(*args, **kwargs)
+        if self.tool_call is not None and 'tool_call' in data:
+            data['tool_call'] = self.tool_call.model_dump(*args, **kwargs)
+        if self.message is not None and 'message' in data:
+            data['message'] = self.message.model_dump(*args, **kwargs)
+        return data
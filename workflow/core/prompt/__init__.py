@@ -1,3 +1,4 @@
 from .prompt import Prompt
+from .template_cache import TemplateCache, CompiledTemplate, get_template_cache
 
-__all__ = ['Prompt']
\ No newline at end of file
+__all__ = ['Prompt', 'TemplateCache', 'CompiledTemplate', 'get_template_cache']
\ No newline at end of file
@@ -58,9 +58,10 @@ class Prompt(BaseModel):
 import re
 from bson import ObjectId
 from jinja2 import Template
-from typing import Optional, List, Any, Dict
-from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
+from typing import Optional, List, Any, Dict, FrozenSet, Tuple
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator, ConfigDict
 from workflow.core.data_structures import FunctionParameters
+from workflow.core.prompt.template_cache import CompiledTemplate, get_template_cache
 
 TYPE_MAPPING = {
     "string": str,
@@ -79,6 +80,7 @@ class Prompt(BaseModel):
     parameters: Optional[FunctionParameters] = Field(None, description="The parameters that the prompt expects if it's templated.")
     partial_variables: Dict[str, Any] = Field(default_factory=dict, description="A dictionary of the partial variables the prompt template carries.")
     model_config = ConfigDict(protected_namespaces=(), json_encoders = {ObjectId: str})
+    _compiled: Optional[Tuple[str, CompiledTemplate]] = PrivateAttr(default=None)
 
     @model_validator(mode='after')
     def validate_templated_prompt(self):
@@ -95,6 +97,18 @@ class Prompt(BaseModel):
             return []
         return list(set(self.parameters.properties.keys()) - set(self.partial_variables.keys()))
 
+    @property
+    def compiled_template(self) -> CompiledTemplate:
+        """The compiled template of the content, from the shared template cache, kept until the content changes."""
+        if self._compiled is None or self._compiled[0] is not self.content:
+            self._compiled = (self.content, get_template_cache().get(self.content))
+        return self._compiled[1]
+
+    @property
+    def undeclared_variables(self) -> FrozenSet[str]:
+        """Variables used in the content without being defined in it."""
+        return self.compiled_template.undeclared_variables
+
     def format(self, **kwargs: Any) -> str:
         """Format the prompt with the inputs using Jinja2 templating."""
         all_variables = {**self.partial_variables, **kwargs}
@@ -105,8 +119,7 @@ class Prompt(BaseModel):
                 if param_name not in all_variables and param.default is not None:
                     all_variables[param_name] = param.default
         
-        template = Template(self.content)
-        return template.render(**all_variables)
+        return self.compiled_template.template.render(**all_variables)
 
     def validate_input(self, **kwargs: Any) -> Union[bool, str]:
         """Validate the input against the prompt's parameters."""
@@ -144,7 +157,7 @@ class Prompt(BaseModel):
         return self.format(**kwargs)
 
     def get_template(self) -> Template:
-        return Template(self.content)
+        return self.compiled_template.template
 
     def partial(self, **kwargs: Any) -> 'Prompt':
         """Return a partial of the prompt with some variables pre-filled."""
@@ -183,8 +196,7 @@ class Prompt(BaseModel):
     def validate_content(cls, v: str, info: Any) -> str:
         """Validate that all parameters are used in the content for templated prompts"""
         if info.data.get('is_templated') and 'parameters' in info.data:
-            template = Template(v)
-            undefined = template.undefined_names
+            undefined = get_template_cache().get(v).undeclared_variables
             for param in info.data['parameters'].properties:
                 if param not in undefined:
                     raise ValueError(f"Parameter '{param}' is not used in the prompt content")
@@ -0,0 +1,67 @@
+import hashlib
+from collections import OrderedDict
+from jinja2 import Environment, Template, meta
+from pydantic import BaseModel, Field, PrivateAttr, ConfigDict
+from typing import Dict, Any, FrozenSet
+from workflow.util.const import PROMPT_TEMPLATE_CACHE_SIZE
+
+class CompiledTemplate(BaseModel):
+    """A compiled Jinja2 template and the variables its content uses without defining them."""
+    template: Template = Field(..., description="The compiled template")
+    undeclared_variables: FrozenSet[str] = Field(..., description="Variables the template expects from its context")
+    model_config = ConfigDict(arbitrary_types_allowed=True, frozen=True)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "CompiledTemplate":
+        # Compiled templates are shared and immutable, copies of a Prompt keep using the same one
+        return self
+
+class TemplateCache(BaseModel):
+    """
+    Compiles prompt templates once, in a shared jinja2.Environment, and keeps them in a bounded
+    LRU keyed by a hash of their content. Prompts with the same content share one compiled
+    template, whichever Prompt instance they come from.
+
+    The environment has the defaults of jinja2.Template, so templates render as before.
+
+    Attributes:
+        max_entries (int): Maximum number of compiled templates kept.
+    """
+    max_entries: int = Field(PROMPT_TEMPLATE_CACHE_SIZE, description="Maximum number of compiled templates kept")
+    _environment: Environment = PrivateAttr(default_factory=Environment)
+    _templates: "OrderedDict[str, CompiledTemplate]" = PrivateAttr(default_factory=OrderedDict)
+    _metrics: Dict[str, int] = PrivateAttr(default_factory=lambda: {"hits": 0, "misses": 0})
+
+    def get(self, content: str) -> CompiledTemplate:
+        """Return the compiled template of `content`, compiling it on a miss."""
+        key = self.content_key(content)
+        compiled = self._templates.get(key)
+        if compiled is not None:
+            self._templates.move_to_end(key)
+            self._metrics["hits"] += 1
+            return compiled
+        self._metrics["misses"] += 1
+        source = self._environment.parse(content)
+        compiled = CompiledTemplate(
+            template=self._environment.from_string(source),
+            undeclared_variables=frozenset(meta.find_undeclared_variables(source))
+        )
+        self._templates[key] = compiled
+        if len(self._templates) > self.max_entries:
+            self._templates.popitem(last=False)
+        return compiled
+
+    @staticmethod
+    def content_key(content: str) -> str:
+        return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._metrics, "entries": len(self._templates), "max_entries": self.max_entries}
+
+    def clear(self):
+        self._templates.clear()
+
+TEMPLATE_CACHE = TemplateCache()
+
+def get_template_cache() -> TemplateCache:
+    """Return the process-wide cache of compiled prompt templates."""
+    return TEMPLATE_CACHE
@@ -1,7 +1,8 @@
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 from typing import List, Dict, Optional, Callable, Tuple, Union
 from workflow.core.api import APIManager
 from workflow.core.agent.agent import AliceAgent
+from workflow.core.agent.tool_registry import ToolRegistry
 from workflow.core.tasks.task import AliceTask
 from workflow.core.data_structures import References, MessageDict, TaskResponse, ApiType, FunctionParameters, ParameterDefinition, FunctionConfig
 from workflow.util import LOGGER
@@ -20,6 +21,7 @@ class BasicAgentTask(AliceTask):
     Methods:
         tool_list: Returns a list of available functions for the agent.
         tool_map: Creates a combined map of all available functions.
+        tool_registry: Returns the cached registry behind tool_list and tool_map.
         generate_agent_response: Generates a response using the chat execution functionality.
         run: Executes the task and returns a TaskResponse.
         get_exit_code: Determines the exit code based on the chat output and response status.
@@ -40,21 +42,26 @@ class BasicAgentTask(AliceTask):
         description="Inputs that the agent will require. Default is a list of messages."
     )
     required_apis: List[ApiType] = Field([ApiType.LLM_MODEL], description="A list of required APIs for the task")
+    _tool_registry: Optional[ToolRegistry] = PrivateAttr(default=None)
 
     def create_message_list(self, **kwargs) -> List[MessageDict]:
         """Create a list of messages from the input data."""
         messages: List[MessageDict] = kwargs.get('messages', [])
         return messages
         
+    def tool_registry(self, api_manager: APIManager) -> ToolRegistry:
+        """The registry of the task's subtasks as tools, rebuilt only when the subtasks or the API manager change."""
+        tasks = list(self.tasks.values()) if self.tasks else []
+        version = ToolRegistry.tasks_version(tasks, api_manager)
+        if self._tool_registry is None or self._tool_registry.version != version:
+            self._tool_registry = ToolRegistry.from_tasks(tasks, api_manager)
+        return self._tool_registry
+
     def tool_list(self, api_manager: APIManager) -> List[FunctionConfig]:
-        return [func.get_function(api_manager)["tool_function"] for func in self.tasks.values()] if self.tasks else None
+        return self.tool_registry(api_manager).tool_functions if self.tasks else None
     
     def tool_map(self, api_manager: APIManager) -> Optional[Dict[str, Callable]]:
-        combined_function_map = {}
-        for func in self.tasks.values():
-            function_details = func.get_function(api_manager=api_manager)
-            combined_function_map.update(function_details["function_map"])
-        return combined_function_map
+        return self.tool_registry(api_manager).tool_map
     
     async def generate_agent_response(self, api_manager: APIManager, **kwargs) ->  Tuple[Optional[References], int, Optional[Union[List[MessageDict], Dict[str, str]]]]:   
         messages = self.create_message_list(**kwargs)  
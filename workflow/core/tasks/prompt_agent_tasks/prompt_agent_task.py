@@ -1,7 +1,7 @@
 from pydantic import Field
 from typing import List, Dict, Any, Tuple, Optional
 from workflow.core.api import APIManager
-from workflow.util import LOGGER
+from workflow.util import LOGGER, get_sandbox_pool
 from workflow.core.data_structures import TaskResponse, MessageDict, ApiType, References
 from workflow.util.utils import json_to_python_type_mapping
 from workflow.core.agent.agent import AliceAgent
@@ -186,7 +186,8 @@ class CodeExecutionLLMTask(PromptAgentTask):
     A task for executing code that is extracted from a prompt or previous outputs.
 
     This task is capable of executing code in specified languages and handling
-    the execution results.
+    the execution results. Code runs in the warm containers of the sandbox pool
+    (see util/sandbox_pool.py), which the task keeps warm for its valid languages.
 
     Attributes:
         agent (AliceAgent): The agent responsible for code execution.
@@ -219,7 +220,9 @@ class CodeExecutionLLMTask(PromptAgentTask):
             LOGGER.warning(f"No messages to execute code from in task {self.task_name}")
             return {}, self.get_exit_code([], False), {}
 
+        # Keep the sandbox containers of the languages this task runs warm for the following executions
+        get_sandbox_pool().warm(self.valid_languages)
         # Process and execute the code blocks
-        code_execs, code_blocs = await self.agent._process_code_execution(messages)
+        code_execs, code_blocs = await self.agent._process_code_execution(messages, timeout=self.timeout)
         
         return References(messages=code_execs), self.get_exit_code(code_execs, True), code_blocs
@@ -215,6 +215,8 @@ class AliceTask(BaseModel, ABC):
             params = {"api_manager": api_manager} if api_manager else {}
             final_params = {"execution_history": execution_history, **params, **kwargs}
             return await self.a_execute(**final_params)
+        # Agents running the function as a tool stop waiting for it after the task's timeout
+        function_callable.timeout = self.timeout
         
         function_dict = FunctionConfig(
             name=self.task_name, 
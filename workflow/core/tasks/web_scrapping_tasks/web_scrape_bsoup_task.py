@@ -1,4 +1,4 @@
-import json
+import asyncio, json
 from typing import List, Tuple, Dict, Optional, Union
 from pydantic import Field, BaseModel, ValidationError
 from workflow.core.tasks.web_scrapping_tasks.web_scrape_utils import clean_text, fetch_webpage_and_title, preprocess_html, sample_html, extract_json, fallback_parsing_strategy, apply_parsing_strategy
@@ -17,7 +17,7 @@ class WebScrapeBeautifulSoupTask(BasicAgentTask):
             properties={
                 "url": ParameterDefinition(
                     type="string",
-                    description="The URL of the webpage to scrape."
+                    description="The URL of the webpage to scrape. Several URLs, separated by whitespace, are scraped concurrently."
                 ),
             },
             required=["url", "selector"]
@@ -26,13 +26,15 @@ class WebScrapeBeautifulSoupTask(BasicAgentTask):
     required_apis: List[ApiType] = Field([ApiType.LLM_MODEL], description="A list of required APIs for the task")
 
     async def generate_agent_response(self, api_manager: APIManager, **kwargs) -> Tuple[Optional[References], int, Optional[Union[List[MessageDict], Dict[str, str]]]]:
-        url: str = kwargs.get('url', "")
+        url: Union[str, List[str]] = kwargs.get('url', "")
+        urls = url.split() if isinstance(url, str) else list(url)
 
-        page_content: URLReference = await self.retrieve_and_parse_webpage(url, api_manager)
-        if not page_content:
+        pages = await asyncio.gather(*(self.retrieve_and_parse_webpage(page_url, api_manager) for page_url in urls))
+        page_contents: List[URLReference] = [page for page in pages if isinstance(page, URLReference)]
+        if not page_contents:
             LOGGER.error("No output returned from API engine.")
             return {}, 1, None
-        output = References(search_results=[page_content])
+        output = References(search_results=page_contents)
         return output, 0, None
     
     async def run(self, api_manager: APIManager, **kwargs) -> TaskResponse:     
@@ -64,13 +66,14 @@ class WebScrapeBeautifulSoupTask(BasicAgentTask):
         """
         LOGGER.info(f"Starting summarization process for URL: {url}")
         try:
-            html_content, title = fetch_webpage_and_title(url)
-            cleaned_html = preprocess_html(html_content)
+            html_content, title = await fetch_webpage_and_title(url)
+            # HTML parsing is CPU bound: keep it off the event loop so concurrent scrapes progress
+            cleaned_html = await asyncio.to_thread(preprocess_html, html_content)
             html_samples = sample_html(cleaned_html)
             selectors, creation_metadata = await self.generate_parsing_instructions(html_samples, api_manager)
             if selectors:
                 LOGGER.info(f"Selectors generated by the agent: {selectors}")
-                content = apply_parsing_strategy(cleaned_html, selectors)
+                content = await asyncio.to_thread(apply_parsing_strategy, cleaned_html, selectors)
                 if content:
                     return URLReference(title=title, url=url, content=clean_text(content), metadata={"selectors": selectors, "creation_metadata": creation_metadata})
                 else:
@@ -79,7 +82,7 @@ class WebScrapeBeautifulSoupTask(BasicAgentTask):
                 LOGGER.warning("Failed to generate selectors. Falling back to default parsing.")
                 # Fallback to default method: Extract all <p> tags
             try:
-                content: str = fallback_parsing_strategy(cleaned_html)
+                content: str = await asyncio.to_thread(fallback_parsing_strategy, cleaned_html)
                 return URLReference(title=title, url=url, content=clean_text(content), metadata={"selectors": ["p"]})
             except Exception as e:
                 LOGGER.error(f"An error occurred while implementing the fallback_parsing_strategy: {e}")
@@ -1,8 +1,8 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 from typing import List, Optional
-from workflow.util import LOGGER
+from workflow.util import LOGGER, get_web_fetcher
 
 def extract_json(text: str) -> str:
 
@@ -16,10 +16,12 @@ def extract_json(text: str) -> str:
     LOGGER.warning(f"No JSON code block found, returning original string: {text[:100]}...")
     return text
 
-def fetch_webpage_and_title(url: str) -> tuple[str, str]:
+async def fetch_webpage_and_title(url: str) -> tuple[str, str]:
     """
     Fetch the HTML content of the webpage and extract its title.
 
+    The page is fetched with the shared WebFetcher, and the title is parsed off the event loop.
+
     Args:
         url (str): The URL of the webpage to fetch.
 
@@ -27,25 +29,25 @@ def fetch_webpage_and_title(url: str) -> tuple[str, str]:
         tuple[str, str]: A tuple containing the HTML content and the title of the webpage.
 
     Raises:
-        requests.HTTPError: If the HTTP request returned an unsuccessful status code.
+        aiohttp.ClientResponseError: If the HTTP request returned an unsuccessful status code.
+        WebFetchError: If the page is not a text document or is too large.
     """
     LOGGER.info(f"Fetching webpage content from URL: {url}")
-    response = requests.get(url)
-    response.raise_for_status()
-    LOGGER.info("Webpage fetched successfully.")
-    
-    html_content = response.text
-    
-    # Parse the HTML content
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # Extract the title
-    title = soup.title.string if soup.title else "No title found"
-    
+    page = await get_web_fetcher().fetch(url)
+    LOGGER.info(f"Webpage fetched successfully: {page.size} bytes, {page.charset}.")
+
+    html_content = page.text
+    title = await asyncio.to_thread(extract_title, html_content)
+
     LOGGER.info(f"Extracted title: {title}")
-    
+
     return html_content, title
 
+def extract_title(html: str) -> str:
+    """Extract the title of an HTML document, building only its <title> element."""
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('title'))
+    return soup.title.string if soup.title and soup.title.string else "No title found"
+
 
 def preprocess_html(html: str) -> str:
     """
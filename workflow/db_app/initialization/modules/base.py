@@ -334,6 +334,15 @@ base_module = BaseModule(
                 "is_active": True,
                 "health_status": "healthy" if GOOGLE_API_KEY and GOOGLE_CSE_ID else "unhealthy",
             },
+            {
+                "key": "meta_search",
+                "api_type": "meta_search",
+                "api_name": "meta_search",
+                "name": "Meta Search",
+                "api_config": {},
+                "is_active": True,
+                "health_status": "healthy",
+            },
             {
                 "key": "openai_llm",
                 "api_type": "llm_api",
@@ -167,6 +167,21 @@ base_tasks_module = BaseTasksModule(
                 },
                 "required_apis": ["arxiv_search"]
             },
+            {
+                "key": "meta_search",
+                "task_type": "APITask",
+                "task_name": "meta_search",
+                "task_description": "Searches all the available search engines at once and returns a single merged ranking",
+                "input_variables": {
+                    "type": "object",
+                    "properties": {
+                        "prompt": "prompt_parameter",
+                        "limit": "max_results_parameter"
+                    },
+                    "required": ["prompt"]
+                },
+                "required_apis": ["meta_search"]
+            },
             {   
                 "key": "search_hub",
                 "task_type": "PromptAgentTask", 
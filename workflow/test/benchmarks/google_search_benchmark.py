@@ -0,0 +1,76 @@
+"""
+Benchmark of the per-call overhead of GoogleSearchAPI against a local fake Custom Search endpoint.
+
+Compares the previous implementation, which built the googleapiclient service (discovery
+document and httplib2 transport) on every search and ran it in the engine executor, with the
+current one, which calls the REST endpoint through the pooled httpx client. Run from the
+repository root:
+
+    python -m workflow.test.benchmarks.google_search_benchmark
+"""
+import asyncio, json, logging, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from googleapiclient.discovery import build
+from workflow.core.api import GoogleSearchAPI
+from workflow.core.api.engines.engine_executor import run_blocking
+
+CALLS = 200
+CONCURRENCY = 10
+API_DATA = {"api_key": "key", "cse_id": "cse"}
+RESPONSE = json.dumps({
+    "searchInformation": {"totalResults": "10"},
+    "items": [{"title": f"Result {index}", "link": f"https://example.com/{index}", "snippet": "lorem ipsum " * 20,
+               "pagemap": {"metatags": [{"og:title": f"Result {index}"}]}} for index in range(10)]
+}).encode()
+
+class FakeCustomSearch(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately: without TCP_NODELAY, keep-alive connections wait on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+def previous_search(endpoint: str, prompt: str):
+    service = build("customsearch", "v1", developerKey=API_DATA["api_key"], client_options={"api_endpoint": endpoint})
+    return service.cse().list(q=prompt, cx=API_DATA["cse_id"], num=10).execute()
+
+async def run_calls(call) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    async def one(index: int):
+        async with semaphore:
+            await call(f"query {index}")
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(CALLS)))
+    return time.perf_counter() - start
+
+async def main():
+    # Request logging would dominate the timings of both sides
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCustomSearch)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+    engine = GoogleSearchAPI()
+    api_data = {**API_DATA, "base_url": f"{endpoint}/customsearch/v1"}
+
+    # One call each first, so neither side pays for imports or its first connection
+    await run_blocking("google_search", previous_search, endpoint, "warm up")
+    await engine.generate_api_response(api_data, "warm up")
+
+    previous = await run_calls(lambda prompt: run_blocking("google_search", previous_search, endpoint, prompt))
+    current = await run_calls(lambda prompt: engine.generate_api_response(api_data, prompt))
+    print(f"{CALLS} searches, {CONCURRENCY} concurrent, against {endpoint}")
+    print(f"{'previous (build per call)':>28}: {previous:.3f}s total, {previous / CALLS * 1000:.2f} ms/call")
+    print(f"{'current (pooled REST)':>28}: {current:.3f}s total, {current / CALLS * 1000:.2f} ms/call")
+    print(f"{'speedup':>28}: {previous / current:.1f}x")
+    server.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""
+Micro-benchmark of prompt formatting: Prompt.format with the shared template cache, against
+compiling a jinja2.Template on every call as Prompt.format used to. Run from the repository root:
+
+    python -m workflow.test.benchmarks.prompt_benchmark
+"""
+import timeit
+from jinja2 import Template
+from workflow.core.prompt import Prompt
+from workflow.core.data_structures import FunctionParameters, ParameterDefinition
+
+ITERATIONS = 2000
+
+PROMPTS = {
+    "short": "Hello, {{ name }}!",
+    "task": (
+        "You are {{ name }}, working on the following task.\n\n"
+        "{% for step in steps %}Step {{ loop.index }}: {{ step }}\n{% endfor %}"
+        "{% if context %}Context:\n{{ context }}{% endif %}\n\n"
+    ) * 10,
+}
+
+def make_prompt(content: str) -> Prompt:
+    return Prompt(
+        name="benchmark",
+        content=content,
+        is_templated=True,
+        parameters=FunctionParameters(
+            type="object",
+            properties={
+                "name": ParameterDefinition(type="string", description="Name"),
+                "steps": ParameterDefinition(type="list", description="Steps", default=[]),
+                "context": ParameterDefinition(type="string", description="Context", default=""),
+            },
+            required=["name"]
+        )
+    )
+
+def main():
+    variables = {"name": "Alice", "steps": ["Read", "Plan", "Write"], "context": "Some context"}
+    print(f"{'prompt':>8} {'uncached (us)':>14} {'cached (us)':>12} {'speedup':>9}")
+    for label, content in PROMPTS.items():
+        prompt = make_prompt(content)
+        assert prompt.format(**variables) == Template(content).render(**variables)
+        uncached = timeit.timeit(lambda: Template(content).render(**variables), number=ITERATIONS) / ITERATIONS
+        cached = timeit.timeit(lambda: prompt.format(**variables), number=ITERATIONS) / ITERATIONS
+        print(f"{label:>8} {uncached * 1e6:>14.1f} {cached * 1e6:>12.1f} {uncached / cached:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
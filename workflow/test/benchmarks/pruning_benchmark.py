@@ -0,0 +1,69 @@
+"""
+Benchmark of context pruning on long synthetic histories.
+
+Compares MessagePruner with the previous pruning loop, which re-counted the whole history after
+each replaced message (quadratic in the number of messages). Run from the repository root:
+
+    python -m workflow.test.benchmarks.pruning_benchmark
+"""
+import copy, time
+from typing import List, Dict, Any
+from workflow.util.pruning import MessagePruner, PRUNED_CONTENT
+from workflow.util.token_counter import get_token_counter
+
+SIZES = [1000, 2000, 5000, 10000]
+CTX_SIZE = 8000
+# The previous algorithm takes minutes beyond this size
+PREVIOUS_MAX_SIZE = 2000
+
+def make_history(size: int) -> List[Dict[str, Any]]:
+    messages = [{"role": "system", "content": "You are a helpful assistant."}]
+    for index in range(size):
+        if index % 5 == 3:
+            messages.append({"role": "assistant", "content": "", "tool_calls": [{"id": f"call_{index}", "type": "function", "function": {"name": "search", "arguments": f'{{"query": "topic {index}"}}'}}]})
+        elif index % 5 == 4:
+            messages.append({"role": "tool", "tool_call_id": f"call_{index - 1}", "content": f"Result {index}: " + "lorem ipsum dolor sit amet " * 40})
+        else:
+            messages.append({"role": "user" if index % 2 else "assistant", "content": f"Message {index} " + "the quick brown fox jumps over the lazy dog " * 8})
+    return messages
+
+def quadratic_prune(messages: List[Dict[str, Any]], ctx_size: int) -> List[Dict[str, Any]]:
+    """The previous algorithm: replace the most recent unpruned message, then re-count everything."""
+    counter = get_token_counter("openai_llm")
+    pruned_messages = messages.copy()
+    previous_tokens = None
+    while (tokens := counter.count_messages(pruned_messages)) > ctx_size:
+        if tokens == previous_tokens:
+            break
+        previous_tokens = tokens
+        for i in range(len(pruned_messages) - 2, 0, -1):
+            if pruned_messages[i]['content'] != PRUNED_CONTENT:
+                pruned_messages[i]['content'] = PRUNED_CONTENT
+                break
+        else:
+            break
+    return pruned_messages
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def main():
+    counter = get_token_counter("openai_llm")
+    pruner = MessagePruner()
+    print(f"{'messages':>10} {'pruner (s)':>12} {'previous (s)':>14} {'speedup':>9} {'tokens':>8}")
+    for size in SIZES:
+        history = make_history(size)
+        # Warm the shared token cache so both sides count the same memoized contents
+        counter.count_messages(history)
+        pruner_time = timed(lambda: pruner.prune(history, CTX_SIZE, counter=counter))
+        tokens = counter.count_messages(pruner.prune(history, CTX_SIZE, counter=counter))
+        if size <= PREVIOUS_MAX_SIZE:
+            previous_time = timed(quadratic_prune, copy.deepcopy(history), CTX_SIZE)
+            print(f"{size:>10} {pruner_time:>12.4f} {previous_time:>14.4f} {previous_time / pruner_time:>8.1f}x {tokens:>8}", flush=True)
+        else:
+            print(f"{size:>10} {pruner_time:>12.4f} {'-':>14} {'-':>9} {tokens:>8}", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import pytest
 from typing import List
 from unittest.mock import Mock, AsyncMock
 from workflow.core import Prompt, AliceModel, APIManager, AliceAgent
-from workflow.core.data_structures import MessageDict, ToolFunction, FunctionConfig, FunctionParameters, ParameterDefinition
+from workflow.core.data_structures import MessageDict, ToolFunction, FunctionConfig, FunctionParameters, ParameterDefinition, ToolCall, StreamEvent, References, FileReference, FileType
 
 @pytest.fixture
 def mock_api_manager():
@@ -112,5 +112,132 @@ async def test_generate_response_recursion_limit(sample_agent, mock_api_manager)
     assert result[1].role == "tool", f"Expected second message role to be 'tool', but got {result[1].role}"
     assert result[1].content == "Function called", f"Expected second message content to be 'Function called', but got {result[1].content}"
 
+@pytest.mark.asyncio
+async def test_stream_response_with_tool_call(sample_agent, mock_api_manager):
+    tool_call = ToolCall(id="call_1", function={"name": "test_function", "arguments": '{"arg1": "value1"}'})
+
+    async def stream_response_with_api_engine(**kwargs):
+        yield StreamEvent(type="delta", content="Calling ")
+        yield StreamEvent(type="delta", content="tool")
+        yield StreamEvent(type="tool_call", tool_call=tool_call)
+        yield StreamEvent(type="message", message=MessageDict(role="assistant", content="Calling tool", tool_calls=[tool_call], generated_by="llm"))
+    mock_api_manager.stream_response_with_api_engine = stream_response_with_api_engine
+
+    async def test_function(arg1: str):
+        return f"Function result: {arg1}"
+
+    tools_list = [ToolFunction(function=FunctionConfig(
+        name="test_function",
+        description="Test function",
+        parameters=FunctionParameters(
+            type="object",
+            properties={"arg1": ParameterDefinition(type="string", description="Test string argument")},
+            required=["arg1"]
+        )
+    ))]
+
+    messages = [MessageDict(role="user", content="Use test function")]
+    events = [event async for event in sample_agent.stream_response(mock_api_manager, messages, {"test_function": test_function}, tools_list)]
+
+    assert [event.type for event in events] == ["delta", "delta", "tool_call", "message", "message"]
+    assert "".join(event.content for event in events if event.type == "delta") == "Calling tool"
+    assert events[3].message.role == "assistant"
+    assert events[3].message.assistant_name == "TestAgent"
+    assert events[4].message.role == "tool"
+    assert events[4].message.content == "Function result: value1"
+
+def test_prepare_messages_renders_each_message_once(sample_agent, monkeypatch):
+    from workflow.core.agent import MessageRenderCache
+    import workflow.core.agent.agent as agent_module
+    cache = MessageRenderCache(max_entries=100)
+    monkeypatch.setattr(agent_module, "get_message_render_cache", lambda: cache)
+    rendered = []
+    render = sample_agent._render_message_for_api
+    monkeypatch.setattr(sample_agent.__class__, "_render_message_for_api", lambda self, msg: rendered.append(msg) or render(msg))
+
+    messages = [MessageDict(role="user", content=f"Message {i}") for i in range(3)]
+    first = sample_agent._prepare_messages_for_api(messages)
+    messages.append(MessageDict(role="assistant", content="Reply"))
+    second = sample_agent._prepare_messages_for_api(messages)
+    assert len(rendered) == 4
+    assert second[:3] == first and second[3]["content"] == "assistant: Reply"
+
+    # Edited messages are rendered again, equal copies are found by content
+    messages[0].content = "Edited"
+    copies = [MessageDict(**message.model_dump()) for message in messages[1:]]
+    third = sample_agent._prepare_messages_for_api(messages[:1] + copies)
+    assert len(rendered) == 5 and third[0]["content"] == "user: Edited"
+    assert cache.stats()["content_hits"] == 3
+
+def test_rendered_messages_follow_referenced_files(sample_agent, monkeypatch, tmp_path):
+    from workflow.core.agent import MessageRenderCache
+    import os, workflow.core.agent.agent as agent_module
+    cache = MessageRenderCache(max_entries=100)
+    monkeypatch.setattr(agent_module, "get_message_render_cache", lambda: cache)
+    path = tmp_path / "notes.txt"
+    path.write_text("first version")
+
+    def message():
+        return MessageDict(role="user", content="See file", references=References(files=[FileReference(filename="notes.txt", type=FileType.FILE, storage_path=str(path))]))
+    assert "first version" in sample_agent._prepare_messages_for_api([message()])[0]["content"]
+    path.write_text("second version, longer")
+    os.utime(path, ns=(0, 0))
+    assert "second version" in sample_agent._prepare_messages_for_api([message()])[0]["content"]
+    assert cache.stats()["content_hits"] == 0
+
+@pytest.mark.asyncio
+async def test_tool_calls_run_concurrently_in_order(sample_agent):
+    import asyncio, time
+    delays = {"slow_search": 0.3, "fast_search": 0.1, "stuck_search": 5}
+
+    def make_tool(name):
+        async def tool(query: str):
+            await asyncio.sleep(delays[name])
+            return f"{name}: {query}"
+        return tool
+
+    tool_map = {name: make_tool(name) for name in delays}
+    tool_map["stuck_search"].timeout = 0.2
+    tools_list = [ToolFunction(function=FunctionConfig(
+        name=name,
+        description="Search",
+        parameters=FunctionParameters(type="object", properties={"query": ParameterDefinition(type="string", description="Query")}, required=["query"])
+    )) for name in delays]
+    tool_calls = [ToolCall(id=f"call_{name}", type="function", function={"name": name, "arguments": '{"query": "q"}'}) for name in delays]
+
+    start = time.monotonic()
+    messages = await sample_agent._process_tool_calls(tool_calls, tool_map, tools_list)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5
+    assert [message.content for message in messages[:2]] == ["slow_search: q", "fast_search: q"]
+    assert [message.tool_call_id for message in messages[:2]] == ["call_slow_search", "call_fast_search"]
+    assert "timed out" in messages[2].content and messages[2].tool_call_id == "call_stuck_search"
+
+@pytest.mark.asyncio
+async def test_code_execution_runs_off_loop_with_timeout(sample_agent, monkeypatch):
+    import time
+    jobs = []
+
+    def fake_run_code(code, language, timeout=30, log_level='info', job=None):
+        jobs.append(job)
+        # Blocking, like docker; the event loop keeps running while it sleeps
+        time.sleep(1.0 if "sleep" in code else 0.3)
+        return f"ran {language}", 0
+
+    monkeypatch.setattr("workflow.core.agent.agent.run_code", fake_run_code)
+    messages = [MessageDict(role="assistant", content="```python\nprint(1)\n```\n```bash\necho 1\n```")]
+
+    start = time.monotonic()
+    executed, code_by_lang = await sample_agent._process_code_execution(messages, timeout=5)
+    assert time.monotonic() - start < 0.55
+    assert list(code_by_lang) == ["python", "bash"]
+    assert [message.content.splitlines()[0] for message in executed] == ["Language: python", "Language: bash"]
+    assert all("Exit Code: 0" in message.content for message in executed)
+
+    timed_out, _ = await sample_agent._process_code_execution([MessageDict(role="assistant", content="```bash\nsleep 60\n```")], timeout=0.2)
+    assert "Exit Code: 1" in timed_out[0].content and "Execution exceeded" in timed_out[0].content
+    assert jobs[-1].cancelled
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -1,7 +1,8 @@
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from workflow.core.api import APIManager, API, APIEngine
-from workflow.core import AliceModel, FunctionParameters, ParameterDefinition, SearchOutput, ModelConfig, ApiType, ApiName
+from workflow.core import AliceModel, FunctionParameters, ParameterDefinition, ModelConfig, ApiType, ApiName
+from workflow.core.data_structures import References, URLReference
 
 @pytest.fixture
 def sample_api():
@@ -112,8 +113,8 @@ async def test_generate_response_with_api_engine_search(api_manager):
     api_manager.add_api(search_api)
     
     mock_search_engine = AsyncMock(spec=APIEngine)
-    mock_search_engine.generate_api_response.return_value = SearchOutput(
-        content=[{"title": "Test Result", "url": "https://test.com", "content": "Test content"}]
+    mock_search_engine.generate_api_response.return_value = References(
+        search_results=[URLReference(title="Test Result", url="https://test.com", content="Test content")]
     )
     mock_search_engine.input_variables = FunctionParameters(
         type="object",
@@ -130,9 +131,9 @@ async def test_generate_response_with_api_engine_search(api_manager):
             query="test query"
         )
     
-    assert isinstance(response, SearchOutput)
-    assert len(response.content) == 1
-    assert response.content[0]["title"] == "Test Result"
+    assert isinstance(response, References)
+    assert len(response.search_results) == 1
+    assert response.search_results[0].title == "Test Result"
 
 @pytest.mark.asyncio
 async def test_generate_response_with_api_engine_no_api(api_manager):
@@ -155,5 +156,44 @@ async def test_generate_response_with_api_engine_invalid_inputs(api_manager, sam
                 model=sample_api.default_model
             )
 
+def test_get_api_by_type_uses_index(api_manager, sample_api):
+    anthropic_api = sample_api.model_copy(update={"id": "anthropic", "api_name": ApiName.ANTHROPIC})
+    sample_api.id = "openai"
+    api_manager.add_api(sample_api)
+    api_manager.add_api(anthropic_api)
+    anthropic_model = sample_api.default_model.model_copy(update={"api_name": ApiName.ANTHROPIC})
+    assert api_manager.get_api_by_type(ApiType.LLM_MODEL, anthropic_model) is anthropic_api
+    assert api_manager.get_api_by_type(ApiType.LLM_MODEL) is sample_api
+
+def test_index_invalidated_on_change(api_manager, sample_api):
+    sample_api.id = "openai"
+    api_manager.add_api(sample_api)
+    assert api_manager.get_api_by_type(ApiType.LLM_MODEL) is sample_api
+    sample_api.is_active = False
+    api_manager.invalidate_cache()
+    assert api_manager.get_api_by_type(ApiType.LLM_MODEL) is None
+    # Adding an API rebuilds the index
+    api_manager.add_api(sample_api.model_copy(update={"id": "other", "is_active": True}))
+    assert api_manager.get_api_by_type(ApiType.LLM_MODEL).id == "other"
+
+def test_model_config_is_cached(api_manager, sample_api):
+    api_manager.add_api(sample_api)
+    first = api_manager.retrieve_api_data(ApiType.LLM_MODEL)
+    assert api_manager.retrieve_api_data(ApiType.LLM_MODEL, sample_api.default_model) is first
+    other_model = sample_api.default_model.model_copy(update={"model_name": "other-model"})
+    assert api_manager.retrieve_api_data(ApiType.LLM_MODEL, other_model).model == "other-model"
+    api_manager.add_api(sample_api)
+    assert api_manager.retrieve_api_data(ApiType.LLM_MODEL) is not first
+
+@pytest.mark.asyncio
+async def test_engine_instance_is_reused(api_manager, sample_api):
+    api_manager.add_api(sample_api)
+    engine_class = Mock(return_value=AsyncMock(spec=APIEngine))
+    engine_class.return_value.input_variables = FunctionParameters(type="object", properties={}, required=[])
+    with patch('workflow.core.api.api_manager.get_api_engine', return_value=engine_class):
+        await api_manager.generate_response_with_api_engine(api_type=ApiType.LLM_MODEL)
+        await api_manager.generate_response_with_api_engine(api_type=ApiType.LLM_MODEL)
+    assert engine_class.call_count == 1
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,46 @@
+import pytest
+from workflow.core.api import ClientRegistry, API
+from workflow.core.data_structures import ModelConfig, ApiName, ApiType
+
+@pytest.fixture
+def registry():
+    return ClientRegistry(max_connections=10, max_keepalive_connections=5)
+
+def make_config(api_name=ApiName.OPENAI, api_key="key", base_url="https://api.example.com/v1/"):
+    return ModelConfig(model="test-model", api_name=api_name, api_key=api_key, base_url=base_url)
+
+@pytest.mark.asyncio
+async def test_openai_client_is_reused(registry):
+    first = registry.openai_client(make_config())
+    second = registry.openai_client(make_config(base_url="https://api.example.com/v1"))
+    assert first is second
+    assert len(registry) == 1
+    await registry.aclose()
+
+@pytest.mark.asyncio
+async def test_clients_are_keyed_by_credentials(registry):
+    openai_client = registry.openai_client(make_config())
+    other_key = registry.openai_client(make_config(api_key="other"))
+    other_api = registry.openai_client(make_config(api_name=ApiName.GROQ))
+    assert openai_client is not other_key
+    assert openai_client is not other_api
+    assert len(registry) == 3
+    await registry.aclose()
+
+@pytest.mark.asyncio
+async def test_client_for_api_and_close(registry):
+    anthropic_api = API(api_type=ApiType.LLM_MODEL, api_name=ApiName.ANTHROPIC, name="Anthropic", api_config={"api_key": "key"})
+    gemini_api = API(api_type=ApiType.LLM_MODEL, api_name=ApiName.GEMINI, name="Gemini", api_config={"api_key": "key"})
+    client = registry.client_for_api(anthropic_api.api_name, anthropic_api.api_config)
+    assert client is registry.anthropic_client(ModelConfig(model="", api_name=ApiName.ANTHROPIC, api_key="key", base_url=None))
+    assert registry.client_for_api(gemini_api.api_name, gemini_api.api_config) is None
+    await registry.aclose()
+    assert len(registry) == 0
+
+@pytest.mark.asyncio
+async def test_sdk_retries_are_disabled(registry):
+    # The rate limiter retries failed calls; SDK retries would multiply them
+    assert registry.openai_client(make_config()).max_retries == 0
+    assert registry.anthropic_client(make_config(api_name=ApiName.ANTHROPIC)).max_retries == 0
+    assert registry.cohere_client(make_config(api_name=ApiName.COHERE))._client_wrapper.httpx_client.base_max_retries == 0
+    await registry.aclose()
@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from workflow.core.api import EmbeddingBatcher
+
+def make_sender(calls, fail=False):
+    async def send(texts):
+        calls.append(list(texts))
+        await asyncio.sleep(0)
+        if fail:
+            raise RuntimeError("provider down")
+        return [[float(len(text))] for text in texts], {"prompt_tokens": 100, "total_tokens": 100}
+    return send
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_request():
+    batcher = EmbeddingBatcher(window=0.05)
+    calls = []
+    send = make_sender(calls)
+    results = await asyncio.gather(
+        batcher.embed("model", ["a" * 40], send),
+        batcher.embed("model", ["b" * 120, "cc"], send),
+    )
+    assert calls == [["a" * 40, "b" * 120, "cc"]]
+    (first, first_usage), (second, second_usage) = results
+    assert first == [[40.0]]
+    assert second == [[120.0], [2.0]]
+    assert first_usage["prompt_tokens"] == 25 and second_usage["prompt_tokens"] == 75
+    assert first_usage["batch_size"] == 3
+
+@pytest.mark.asyncio
+async def test_batches_are_split_by_key_and_size():
+    batcher = EmbeddingBatcher(window=0.05, max_batch_size=2)
+    calls = []
+    send = make_sender(calls)
+    await asyncio.gather(
+        batcher.embed("small", ["a"], send),
+        batcher.embed("large", ["b"], send),
+        batcher.embed("small", ["c", "d"], send),
+    )
+    assert sorted(calls) == [["a"], ["b"], ["c", "d"]]
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    batcher = EmbeddingBatcher(window=0.01)
+    send = make_sender([], fail=True)
+    results = await asyncio.gather(batcher.embed("model", ["a"], send), batcher.embed("model", ["b"], send), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
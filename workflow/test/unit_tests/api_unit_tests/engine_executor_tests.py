@@ -0,0 +1,52 @@
+import asyncio, threading, time
+import pytest
+from workflow.core.api import EngineExecutor, EnginePool
+
+@pytest.mark.asyncio
+async def test_blocking_calls_do_not_block_the_loop():
+    pool = EnginePool(name="test", max_workers=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    results = await asyncio.gather(*(pool.run(lambda value=value: time.sleep(0.1) or value) for value in range(3)))
+    ticking.cancel()
+    assert results == [0, 1, 2]
+    assert ticks >= 10
+    stats = pool.stats()
+    assert stats["calls"] == 3 and stats["in_flight"] == 0
+    assert stats["max_blocking_seconds"] >= 0.1
+    pool.shutdown()
+
+@pytest.mark.asyncio
+async def test_pools_are_sized_per_engine():
+    executor = EngineExecutor(default_workers=3, pool_sizes={"wikipedia": 1})
+    assert executor.pool("wikipedia").max_workers == 1
+    assert executor.pool("gemini").max_workers == 3
+    assert executor.pool("wikipedia") is executor.pool("wikipedia")
+    assert await executor.run("gemini", sum, [1, 2]) == 3
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_timeout_releases_queued_calls():
+    pool = EnginePool(name="test", max_workers=1)
+    release = threading.Event()
+    running = asyncio.create_task(pool.run(release.wait, timeout=0.05))
+    queued = asyncio.create_task(pool.run(lambda: "never", timeout=0.01))
+
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await running
+        with pytest.raises(asyncio.TimeoutError):
+            await queued
+        assert pool.stats()["abandoned"] == 1
+    finally:
+        release.set()
+    assert await pool.run(lambda: "done", timeout=1) == "done"
+    assert pool.stats()["timeouts"] == 2
+    pool.shutdown()
@@ -0,0 +1,48 @@
+import httpx, pytest
+from types import SimpleNamespace
+from workflow.core.api import GoogleSearchAPI
+from workflow.core.api.search_cache import SearchCache
+
+def make_items(start: int, num: int):
+    return [{"title": f"Result {index}", "link": f"https://example.com/{index}", "snippet": f"Snippet {index}", "displayLink": "example.com"}
+            for index in range(start, start + num)]
+
+@pytest.fixture
+def fake_endpoint(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        params = request.url.params
+        if params["key"] != "google_key":
+            return httpx.Response(403, json={"error": {"code": 403, "message": "Forbidden"}})
+        start, num = int(params["start"]), int(params["num"])
+        return httpx.Response(200, json={"searchInformation": {"totalResults": "25"}, "items": make_items(start, min(num, 26 - start))})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    registry = SimpleNamespace(http_client=lambda *args, **kwargs: client)
+    monkeypatch.setattr("workflow.core.api.engines.search_engine.get_client_registry", lambda: registry)
+    monkeypatch.setattr("workflow.core.api.engines.search_engine.get_search_cache", lambda: SearchCache(enabled=False))
+    return requests
+
+@pytest.mark.asyncio
+async def test_google_search_pages_results(fake_endpoint):
+    engine = GoogleSearchAPI()
+    references = await engine.generate_api_response({"api_key": "google_key", "cse_id": "cse"}, "test query", max_results=30)
+    results = references.search_results
+    # Only 25 results exist: 3 requests, in order, without going past the last one
+    assert [result.title for result in results] == [f"Result {index}" for index in range(1, 26)]
+    assert results[0].url == "https://example.com/1"
+    assert results[0].metadata == {"displayLink": "example.com"}
+    assert sorted(int(request.url.params["start"]) for request in fake_endpoint) == [1, 11, 21]
+    assert fake_endpoint[0].url.params["q"] == "test query" and fake_endpoint[0].url.params["cx"] == "cse"
+
+@pytest.mark.asyncio
+async def test_google_search_single_page_and_errors(fake_endpoint):
+    engine = GoogleSearchAPI()
+    references = await engine.generate_api_response({"api_key": "google_key", "cse_id": "cse"}, "test", max_results=5)
+    assert len(references.search_results) == 5 and len(fake_endpoint) == 1
+    with pytest.raises(httpx.HTTPStatusError):
+        await engine.generate_api_response({"api_key": "wrong_key", "cse_id": "cse"}, "test")
+    with pytest.raises(ValueError):
+        await engine.generate_api_response({"api_key": "google_key"}, "test")
@@ -0,0 +1,101 @@
+import asyncio, pytest
+from unittest.mock import Mock, patch
+from workflow.core.api import APIManager, API, APIEngine, ApiStatsRegistry
+from workflow.core import AliceModel
+from workflow.core.data_structures import References, MessageDict, ApiType, ApiName, FunctionParameters, ParameterDefinition
+
+def make_api(api_id, health_status="healthy", api_name=ApiName.AZURE, model_type="chat"):
+    return API(
+        _id=api_id,
+        api_type=ApiType.LLM_MODEL,
+        api_name=api_name,
+        name=f"{api_name.value} {api_id}",
+        health_status=health_status,
+        api_config={"api_key": f"key-{api_id}", "base_url": f"https://{api_id}.example.com"},
+        default_model=AliceModel(short_name=f"{api_id} model", model_name=f"{api_id}-model", model_format="OpenChat", ctx_size=1000, model_type=model_type, api_name=api_name, use_cache=False)
+    )
+
+class SlowEngine(APIEngine):
+    """Engine whose latency depends on the base_url of the API it is called for."""
+    delays: dict = {}
+    cancelled: list = []
+    models: list = []
+    input_variables: FunctionParameters = FunctionParameters(type="object", properties={"messages": ParameterDefinition(type="array", description="Messages")}, required=["messages"])
+    required_api: ApiType = ApiType.LLM_MODEL
+
+    async def generate_api_response(self, api_data, **kwargs) -> References:
+        delay = self.delays[api_data.base_url]
+        if isinstance(delay, Exception):
+            raise delay
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(api_data.base_url)
+            raise
+        self.models.append(api_data.model)
+        return References(messages=[MessageDict(role="assistant", content=api_data.base_url, generated_by="llm")])
+
+@pytest.fixture
+def manager():
+    api_manager = APIManager(hedge_requests=True)
+    api_manager.add_api(make_api("primary"))
+    api_manager.add_api(make_api("backup"))
+    return api_manager
+
+async def generate(api_manager, delays):
+    engine = SlowEngine(delays=delays, cancelled=[], models=[])
+    with patch('workflow.core.api.api_manager.get_api_engine', return_value=Mock(return_value=engine)), \
+         patch('workflow.core.api.api_manager.get_api_stats', return_value=ApiStatsRegistry()), \
+         patch('workflow.core.api.api_manager.API_HEDGE_DEFAULT_DELAY', 0.05):
+        response = await api_manager.generate_response_with_api_engine(api_type=ApiType.LLM_MODEL, messages=[{"role": "user", "content": "Hi"}])
+        await asyncio.sleep(0)  # Let the losing request process its cancellation
+    return response.messages[0].content, engine.cancelled
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged(manager):
+    content, cancelled = await generate(manager, {"https://primary.example.com": 0.0, "https://backup.example.com": 0.0})
+    assert content == "https://primary.example.com"
+    assert cancelled == []
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled(manager):
+    content, cancelled = await generate(manager, {"https://primary.example.com": 5, "https://backup.example.com": 0.0})
+    assert content == "https://backup.example.com"
+    assert cancelled == ["https://primary.example.com"]
+
+@pytest.mark.asyncio
+async def test_failing_primary_fails_over(manager):
+    content, _ = await generate(manager, {"https://primary.example.com": RuntimeError("stalled"), "https://backup.example.com": 0.0})
+    assert content == "https://backup.example.com"
+
+def test_unhealthy_apis_are_not_hedge_candidates(manager):
+    manager.apis["backup"].health_status = "unhealthy"
+    manager.invalidate_cache()
+    assert manager._hedge_candidates(ApiType.LLM_MODEL, manager.apis["primary"]) == []
+
+@pytest.mark.asyncio
+async def test_hedges_to_another_provider_with_its_default_model():
+    api_manager = APIManager(hedge_requests=True)
+    api_manager.add_api(make_api("primary"))
+    api_manager.add_api(make_api("groq", api_name=ApiName.GROQ))
+    api_manager.add_api(make_api("embedder", api_name=ApiName.OPENAI, model_type="embeddings"))
+    assert api_manager._hedge_candidates(ApiType.LLM_MODEL, api_manager.apis["primary"]) == [api_manager.apis["groq"]]
+    engine = SlowEngine(delays={"https://primary.example.com": 5, "https://groq.example.com": 0.0}, cancelled=[], models=[])
+    with patch('workflow.core.api.api_manager.get_api_engine', return_value=Mock(return_value=engine)), \
+         patch('workflow.core.api.api_manager.get_api_stats', return_value=ApiStatsRegistry()), \
+         patch('workflow.core.api.api_manager.API_HEDGE_DEFAULT_DELAY', 0.05):
+        response = await api_manager.generate_response_with_api_engine(api_type=ApiType.LLM_MODEL, messages=[{"role": "user", "content": "Hi"}])
+    assert response.messages[0].content == "https://groq.example.com"
+    assert engine.models == ["groq-model"]
+
+def test_same_provider_candidates_come_first(manager):
+    manager.add_api(make_api("groq", api_name=ApiName.GROQ))
+    assert manager._hedge_candidates(ApiType.LLM_MODEL, manager.apis["primary"]) == [manager.apis["backup"], manager.apis["groq"]]
+
+def test_hedge_delay_uses_rolling_p95():
+    stats = ApiStatsRegistry()
+    api = make_api("primary")
+    for latency in range(1, 101):
+        stats.get(api).record(latency / 100, True)
+    with patch('workflow.core.api.api_manager.get_api_stats', return_value=stats):
+        assert APIManager()._hedge_delay(api) == 0.95
@@ -58,6 +58,34 @@ class TestLLMAnthropic(unittest.IsolatedAsyncioTestCase):
         expected_cost = (1000 / 1000) * 0.015 + (1000 / 1000) * 0.075
         self.assertAlmostEqual(cost, expected_cost, places=6)
 
+    def test_calculate_cost_with_prompt_cache(self):
+        cost = self.llm_anthropic.calculate_cost(1000, 1000, "claude-3-opus-20240229", cache_read_tokens=10000, cache_write_tokens=2000)
+
+        expected_cost = 0.015 + 0.075 + 10 * 0.015 * 0.1 + 2 * 0.015 * 1.25
+        self.assertAlmostEqual(cost, expected_cost, places=6)
+
+    def test_prepare_api_params_adds_cache_breakpoints(self):
+        messages = [
+            {"role": "user", "content": "First question"},
+            {"role": "assistant", "content": "First answer"},
+            {"role": "user", "content": "Second question"},
+        ]
+        tools = [
+            ToolFunction(type="function", function=FunctionConfig(name=name, description=name, parameters=FunctionParameters(type="object", properties={}, required=[])))
+            for name in ("first_tool", "last_tool")
+        ]
+        api_data = self.api_data.model_copy(update={"ctx_size": 100000, "temperature": 0.7})
+
+        api_params = self.llm_anthropic._prepare_api_params(api_data, messages, "You are a helpful assistant.", tools, 100)
+
+        self.assertEqual(api_params["system"][0]["cache_control"], {"type": "ephemeral"})
+        self.assertNotIn("cache_control", api_params["tools"][0])
+        self.assertEqual(api_params["tools"][-1]["cache_control"], {"type": "ephemeral"})
+        marked = [msg for msg in api_params["messages"] if isinstance(msg["content"], list)]
+        self.assertEqual([msg["content"][0]["text"] for msg in marked], ["First question", "Second question"])
+        self.assertEqual(api_params["messages"][1]["content"], "First answer")
+        self.assertEqual(messages[2]["content"], "Second question")
+
     def test_convert_into_tool_params(self):
         tool_functions = [
             ToolFunction(
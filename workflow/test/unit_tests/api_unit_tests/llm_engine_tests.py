@@ -1,7 +1,8 @@
 import unittest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch, MagicMock
 from workflow.core.api.engines import LLMEngine
-from workflow.core.data_structures import MessageDict, ModelConfig
+from workflow.core.data_structures import MessageDict, ModelConfig, ApiName
 
 class TestLLMEngine(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
@@ -69,6 +70,46 @@ class TestLLMEngine(unittest.IsolatedAsyncioTestCase):
         with self.assertRaises(Exception):
             await self.llm_engine.generate_api_response(self.api_data, messages=self.messages)
 
+    @patch('workflow.core.api.engines.llm_engine.get_client_registry')
+    async def test_stream_api_response(self, mock_get_registry):
+        def chunk(content=None, tool_calls=None, finish_reason=None, usage=None):
+            choices = [SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls), finish_reason=finish_reason)] if not usage else []
+            return SimpleNamespace(model="test-model", system_fingerprint=None, usage=usage, choices=choices)
+
+        def tool_delta(index, id=None, name=None, arguments=None):
+            return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+        async def stream():
+            for item in [
+                chunk(content="Hello"),
+                chunk(content=" there"),
+                chunk(tool_calls=[tool_delta(0, id="call_1", name="search", arguments='{"q": ')]),
+                chunk(tool_calls=[tool_delta(0, arguments='"jokes"}')], finish_reason="tool_calls"),
+                chunk(usage=MagicMock(prompt_tokens=10, completion_tokens=5, model_dump=lambda: {"total_tokens": 15})),
+            ]:
+                yield item
+
+        mock_client = AsyncMock()
+        mock_client.chat.completions.create.return_value = stream()
+        mock_get_registry.return_value.openai_client.return_value = mock_client
+
+        events = [event async for event in self.llm_engine.stream_api_response(self.api_data, messages=self.messages)]
+
+        self.assertEqual([event.type for event in events], ["delta", "delta", "tool_call", "message"])
+        self.assertEqual(events[2].tool_call.function.arguments, '{"q": "jokes"}')
+        message = events[-1].message
+        self.assertEqual(message.content, "Hello there")
+        self.assertEqual(message.tool_calls[0].id, "call_1")
+        self.assertEqual(message.creation_metadata["finish_reason"], "tool_calls")
+        self.assertEqual(message.creation_metadata["usage"]["total_tokens"], 15)
+        self.assertTrue(mock_client.chat.completions.create.call_args.kwargs["stream"])
+        # Only providers known to accept it are asked for usage in the stream
+        self.assertNotIn("stream_options", mock_client.chat.completions.create.call_args.kwargs)
+        mock_client.chat.completions.create.return_value = stream()
+        openai_data = self.api_data.model_copy(update={"api_name": ApiName.OPENAI})
+        [event async for event in self.llm_engine.stream_api_response(openai_data, messages=self.messages)]
+        self.assertEqual(mock_client.chat.completions.create.call_args.kwargs["stream_options"], {"include_usage": True})
+
     def test_get_usage(self):
         mock_response = MessageDict(
             role="assistant",
@@ -82,5 +123,21 @@ class TestLLMEngine(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(usage['prompt_tokens'], 10)
         self.assertEqual(usage['completion_tokens'], 10)
 
+    def test_calculate_cost_discounts_cached_prompt_tokens(self):
+        full_price = self.llm_engine.calculate_cost(2000, 1000, "gpt-4")
+        cached = self.llm_engine.calculate_cost(2000, 1000, "gpt-4", cached_tokens=1000)
+
+        self.assertAlmostEqual(full_price - cached, 0.03 * 0.5, places=6)
+
+    def test_prompt_cache_key_only_for_openai(self):
+        api_data = self.api_data.model_copy(update={"ctx_size": 100000})
+        openai_data = api_data.model_copy(update={"api_name": ApiName.OPENAI})
+
+        key = self.llm_engine._prepare_api_params(openai_data, self.messages, "System prompt")["prompt_cache_key"]
+
+        self.assertEqual(key, self.llm_engine._prepare_api_params(openai_data, self.messages[1:], "System prompt")["prompt_cache_key"])
+        self.assertNotEqual(key, self.llm_engine._prepare_api_params(openai_data, self.messages, "Other prompt")["prompt_cache_key"])
+        self.assertNotIn("prompt_cache_key", self.llm_engine._prepare_api_params(api_data, self.messages, "System prompt"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
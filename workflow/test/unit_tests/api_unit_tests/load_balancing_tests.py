@@ -0,0 +1,59 @@
+import pytest
+from unittest.mock import patch
+from workflow.core.api import APIManager, API, ApiStatsRegistry, BalancingPolicy
+from workflow.core import AliceModel
+from workflow.core.data_structures import ApiType, ApiName
+
+def make_api(api_id, health_status="healthy"):
+    return API(
+        _id=api_id,
+        api_type=ApiType.LLM_MODEL,
+        api_name=ApiName.OPENAI,
+        name=f"OpenAI {api_id}",
+        health_status=health_status,
+        api_config={"api_key": f"key-{api_id}", "base_url": "https://api.example.com"},
+        default_model=AliceModel(short_name="TestModel", model_name="test-model", model_format="OpenChat", ctx_size=1000, model_type="chat", api_name=ApiName.OPENAI)
+    )
+
+@pytest.fixture
+def stats():
+    stats = ApiStatsRegistry()
+    with patch('workflow.core.api.api_manager.get_api_stats', return_value=stats):
+        yield stats
+
+def make_manager(policy, *apis):
+    api_manager = APIManager(balancing_policy=policy)
+    for api in apis:
+        api_manager.add_api(api)
+    return api_manager
+
+def picks(api_manager, n=6):
+    model = next(iter(api_manager.apis.values())).default_model
+    return [api_manager.get_api_by_type(ApiType.LLM_MODEL, model).id for _ in range(n)]
+
+def test_first_policy_keeps_first_api(stats):
+    assert set(picks(make_manager(BalancingPolicy.FIRST, make_api("a"), make_api("b")))) == {"a"}
+
+def test_round_robin_skips_unhealthy(stats):
+    api_manager = make_manager(BalancingPolicy.ROUND_ROBIN, make_api("a"), make_api("b", "unhealthy"), make_api("c"))
+    assert picks(api_manager) == ["a", "c", "a", "c", "a", "c"]
+
+def test_all_unhealthy_falls_back_to_all(stats):
+    api_manager = make_manager(BalancingPolicy.ROUND_ROBIN, make_api("a", "unhealthy"), make_api("b", "unhealthy"))
+    assert set(picks(api_manager)) == {"a", "b"}
+
+def test_least_outstanding(stats):
+    api_a, api_b = make_api("a"), make_api("b")
+    stats.get(api_a).outstanding = 3
+    stats.get(api_b).outstanding = 1
+    assert set(picks(make_manager(BalancingPolicy.LEAST_OUTSTANDING, api_a, api_b))) == {"b"}
+
+def test_weighted_prefers_fast_reliable_apis(stats):
+    api_a, api_b = make_api("a"), make_api("b")
+    for _ in range(20):
+        stats.get(api_a).record(0.1, True)
+        stats.get(api_b).record(5.0, True)
+    with patch('workflow.core.api.api_manager.random.choices', side_effect=lambda population, weights: [population[weights.index(max(weights))]]) as choices:
+        assert set(picks(make_manager(BalancingPolicy.WEIGHTED, api_a, api_b))) == {"a"}
+    weights = choices.call_args.kwargs["weights"]
+    assert weights[0] > weights[1] * 10
@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from typing import Any, Dict, List, Tuple
+from workflow.core.api import APIManager, API
+from workflow.core.api.engines.search_engine import APISearchEngine
+from workflow.core.api.engines.meta_search_engine import MetaSearchAPI, SEARCH_ENGINES, canonicalize_url, simhash
+from workflow.core.api.search_cache import SearchCache
+from workflow.core.data_structures import References, URLReference, ApiType, ApiName
+
+ARTICLE = "Reciprocal rank fusion merges the rankings of several search engines by summing the inverse of each result's rank plus a constant"
+
+class FakeSearchAPI(APISearchEngine):
+    required_api: str = "google_search"
+    results: List[Tuple[str, str]] = []
+    delay: float = 0.0
+    error: bool = False
+
+    async def fetch_results(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise RuntimeError("quota exceeded")
+        return References(search_results=[
+            URLReference(title=url, url=url, content=content, metadata={"engine_rank": rank})
+            for rank, (url, content) in enumerate(self.results[:max_results])
+        ])
+
+@pytest.fixture
+def engines(monkeypatch):
+    monkeypatch.setattr("workflow.core.api.engines.search_engine.get_search_cache", lambda: SearchCache(enabled=False))
+    engines = {
+        "google_search": FakeSearchAPI(results=[
+            ("https://www.example.com/rrf/?utm_source=google", ARTICLE),
+            ("https://docs.python.org/3/library/asyncio.html", "asyncio is a library to write concurrent code"),
+        ]),
+        "wikipedia_search": FakeSearchAPI(results=[
+            ("https://en.m.wikipedia.org/wiki/Rank_fusion", ARTICLE + "."),
+            ("https://example.com/rrf#history", "A page with a different summary"),
+        ]),
+        "exa_search": FakeSearchAPI(delay=1.0, results=[("https://slow.example.com", "late")]),
+        "arxiv_search": FakeSearchAPI(error=True),
+    }
+    for name, engine in engines.items():
+        monkeypatch.setitem(SEARCH_ENGINES, ApiType(name), engine)
+    return engines
+
+def test_canonicalize_url():
+    assert canonicalize_url("https://www.Example.com/a/?utm_medium=x&b=2&a=1#top") == canonicalize_url("http://example.com/a?a=1&b=2")
+    assert canonicalize_url("https://en.m.wikipedia.org/wiki/Caf%C3%A9") == canonicalize_url("https://en.wikipedia.org/wiki/Café/")
+    assert canonicalize_url("https://example.com/a?id=1") != canonicalize_url("https://example.com/a?id=2")
+    assert canonicalize_url("https://example.com:8080/") != canonicalize_url("https://example.com/")
+
+def test_simhash_near_duplicates():
+    distance = (simhash(ARTICLE) ^ simhash(ARTICLE + ".")).bit_count()
+    assert distance <= 3
+    assert (simhash(ARTICLE) ^ simhash("asyncio is a library to write concurrent code using the async and await syntax")).bit_count() > 3
+    assert simhash("too short") is None
+
+@pytest.mark.asyncio
+async def test_meta_search_fuses_and_drops_duplicates(engines):
+    api_data = {"engines": {name: {} for name in engines}, "engine_timeout": 0.2}
+    references = await MetaSearchAPI().generate_api_response(api_data, prompt="rank fusion", max_results=10)
+    results = references.search_results
+    # The slow and failing engines are left out; the three copies of the article are one result
+    assert [result.url for result in results] == [
+        "https://www.example.com/rrf/?utm_source=google",
+        "https://docs.python.org/3/library/asyncio.html",
+    ]
+    assert results[0].metadata["engines"] == "google_search,wikipedia_search"
+    assert float(results[0].metadata["rrf_score"]) == pytest.approx(1 / 61 + 1 / 61 + 1 / 62, abs=1e-6)
+    assert results[0].metadata["engine_rank"] == "0"
+
+@pytest.mark.asyncio
+async def test_meta_search_without_search_apis():
+    with pytest.raises(ValueError):
+        await MetaSearchAPI().generate_api_response({"engines": {}}, prompt="query")
+
+def test_api_manager_builds_meta_search_data():
+    api_manager = APIManager()
+    api_manager.add_api(API(id="meta", api_type=ApiType.META_SEARCH, api_name=ApiName.META_SEARCH, name="Meta Search", is_active=True,
+                            health_status="healthy", api_config={"engine_timeout": 5}))
+    api_manager.add_api(API(id="exa", api_type=ApiType.EXA_SEARCH, api_name=ApiName.EXA_SEARCH, name="Exa Search", is_active=True,
+                            health_status="healthy", api_config={"api_key": "exa"}))
+    api_manager.add_api(API(id="google", api_type=ApiType.GOOGLE_SEARCH, api_name=ApiName.GOOGLE_SEARCH, name="Google Search", is_active=False,
+                            health_status="healthy", api_config={"api_key": "google", "cse_id": "cse"}))
+    assert api_manager.retrieve_api_data(ApiType.META_SEARCH) == {"engine_timeout": 5, "engines": {"exa_search": {"api_key": "exa"}}}
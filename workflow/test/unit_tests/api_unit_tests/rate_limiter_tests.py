@@ -0,0 +1,103 @@
+import asyncio, httpx, pytest
+from workflow.core.api import ProviderLimiter, RateLimiterRegistry
+from workflow.core.api.rate_limiter import TokenBucket, get_retry_after, is_retryable
+
+def http_error(status, headers=None):
+    request = httpx.Request("POST", "https://api.example.com")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited():
+    limiter = ProviderLimiter(max_concurrency=2)
+    running, peak = 0, 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "ok"
+
+    results = await asyncio.gather(*[limiter.run(call) for _ in range(6)])
+    assert results == ["ok"] * 6
+    assert peak == 2
+    stats = limiter.stats()
+    assert stats["requests"] == 6
+    assert stats["max_queue_depth"] >= 4
+    assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_retries_honor_retry_after():
+    limiter = ProviderLimiter(max_retries=2, base_delay=10)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise http_error(429, {"retry-after-ms": "5"})
+        return "ok"
+
+    assert await asyncio.wait_for(limiter.run(call), timeout=1) == "ok"
+    assert limiter.stats()["retries"] == 2
+    assert limiter.stats()["rate_limited"] == 2
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_are_raised():
+    limiter = ProviderLimiter(max_retries=3)
+
+    async def call():
+        raise http_error(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await limiter.run(call)
+    assert limiter.stats()["retries"] == 0
+    assert limiter.stats()["failures"] == 1
+
+@pytest.mark.asyncio
+async def test_stream_retries_only_before_first_item():
+    limiter = ProviderLimiter(max_retries=2, base_delay=0.001)
+    attempts = 0
+
+    def open_stream():
+        async def stream():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise http_error(503)
+            yield "a"
+            raise http_error(503)
+        return stream()
+
+    items = []
+    with pytest.raises(httpx.HTTPStatusError):
+        async for item in limiter.stream(open_stream):
+            items.append(item)
+    assert items == ["a"]
+    assert attempts == 2
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=6000)
+    assert await bucket.acquire(6000) == 0
+    assert await bucket.acquire(10) > 0
+
+def test_registry_keys_and_reconfiguration():
+    registry = RateLimiterRegistry()
+    first = registry.get_limiter("openai", {"api_key": "a", "max_concurrency": 2})
+    assert registry.get_limiter("openai", {"api_key": "a", "max_concurrency": 2}) is first
+    assert registry.get_limiter("openai", {"api_key": "b"}) is not first
+    reconfigured = registry.get_limiter("openai", {"api_key": "a", "max_concurrency": 4})
+    assert reconfigured is not first and reconfigured.max_concurrency == 4
+    assert len(registry.stats()) == 2
+    assert not any(key.endswith(":a") or key.endswith(":b") for key in registry.stats())
+
+def test_error_classification():
+    assert is_retryable(http_error(429)) and is_retryable(http_error(503))
+    assert not is_retryable(http_error(401))
+    assert is_retryable(httpx.ConnectError("refused"))
+    assert not is_retryable(ValueError("bad input"))
+    assert get_retry_after(http_error(429, {"retry-after": "2"})) == 2.0
+    assert get_retry_after(http_error(429)) is None
@@ -0,0 +1,80 @@
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from workflow.core.api import ResponseCache, APIManager, API, APIEngine
+from workflow.core import AliceModel
+from workflow.core.data_structures import References, MessageDict, ModelConfig, ApiType, ApiName, FunctionParameters, ParameterDefinition
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(max_entries=2, ttl=60, path=str(tmp_path / "responses.sqlite3"))
+
+def make_config(**kwargs):
+    return ModelConfig(model="test-model", api_name=ApiName.OPENAI, api_key="key", base_url="https://api.example.com", use_cache=True, **kwargs)
+
+def make_references(content="Hello"):
+    return References(messages=[MessageDict(role="assistant", content=content, generated_by="llm", creation_metadata={"cost": 0.5})])
+
+def test_make_key_is_canonical():
+    messages = [{"role": "user", "content": "Hi"}]
+    key = ResponseCache.make_key(ApiType.LLM_MODEL, make_config(), {"messages": messages, "max_tokens": 10})
+    assert key == ResponseCache.make_key(ApiType.LLM_MODEL, make_config(), {"max_tokens": 10, "messages": messages})
+    assert key != ResponseCache.make_key(ApiType.LLM_MODEL, make_config(seed=1), {"messages": messages, "max_tokens": 10})
+    assert key != ResponseCache.make_key(ApiType.LLM_MODEL, make_config(), {"messages": messages, "max_tokens": 20})
+
+def test_is_cacheable():
+    assert ResponseCache.is_cacheable(ApiType.LLM_MODEL, make_config())
+    assert not ResponseCache.is_cacheable(ApiType.LLM_MODEL, make_config().model_copy(update={"use_cache": False}))
+    assert not ResponseCache.is_cacheable(ApiType.GOOGLE_SEARCH, {"api_key": "key"})
+
+@pytest.mark.asyncio
+async def test_memory_and_disk_tiers(cache, tmp_path):
+    await cache.set("a", make_references("first"))
+    hit = await cache.get("a")
+    assert hit.messages[0].content == "first"
+    assert hit.messages[0].creation_metadata["cache_hit"] is True
+    assert hit.messages[0].creation_metadata["cost"] == 0.0
+    assert await cache.get("missing") is None
+
+    # A fresh cache on the same file is served from the persistent tier
+    reopened = ResponseCache(path=str(tmp_path / "responses.sqlite3"))
+    assert (await reopened.get("a")).messages[0].content == "first"
+    assert reopened.stats()["disk_hits"] == 1
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl():
+    cache = ResponseCache(max_entries=2, ttl=60, path=None)
+    await cache.set("a", make_references())
+    await cache.set("b", make_references())
+    await cache.get("a")
+    await cache.set("c", make_references())
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+    await cache.set("expired", make_references(), ttl=-1)
+    assert await cache.get("expired") is None
+    assert cache.stats()["expired"] == 1
+
+@pytest.mark.asyncio
+async def test_api_manager_serves_cached_response(cache):
+    api_manager = APIManager()
+    api_manager.add_api(API(
+        api_type=ApiType.LLM_MODEL,
+        api_name=ApiName.OPENAI,
+        name="Test API",
+        api_config={"api_key": "key", "base_url": "https://api.example.com"},
+        default_model=AliceModel(short_name="TestModel", model_name="test-model", model_format="OpenChat", ctx_size=1000, model_type="chat", api_name=ApiName.OPENAI, use_cache=True)
+    ))
+    engine = AsyncMock(spec=APIEngine)
+    engine.generate_api_response.return_value = make_references("fresh")
+    engine.input_variables = FunctionParameters(type="object", properties={"messages": ParameterDefinition(type="array", description="Messages")}, required=["messages"])
+
+    with patch('workflow.core.api.api_manager.get_api_engine', return_value=Mock(return_value=engine)), \
+         patch('workflow.core.api.api_manager.get_response_cache', return_value=cache):
+        first = await api_manager.generate_response_with_api_engine(api_type=ApiType.LLM_MODEL, messages=[{"role": "user", "content": "Hi"}])
+        second = await api_manager.generate_response_with_api_engine(api_type=ApiType.LLM_MODEL, messages=[{"role": "user", "content": "Hi"}])
+        await api_manager.generate_response_with_api_engine(api_type=ApiType.LLM_MODEL, messages=[{"role": "user", "content": "Bye"}])
+
+    assert first.messages[0].content == second.messages[0].content == "fresh"
+    assert second.messages[0].creation_metadata["cache_hit"] is True
+    assert engine.generate_api_response.await_count == 2
@@ -0,0 +1,69 @@
+import asyncio, time
+import pytest
+from typing import Any, Dict
+from workflow.core.api.engines.search_engine import APISearchEngine
+from workflow.core.api.search_cache import SearchCache
+from workflow.core.data_structures import References, URLReference
+
+class CountingSearchAPI(APISearchEngine):
+    required_api: str = "google_search"
+    calls: int = 0
+
+    async def fetch_results(self, api_data: Dict[str, Any], prompt: str, max_results: int = 10, **kwargs) -> References:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return References(search_results=[
+            URLReference(title=f"{prompt} {self.calls}", url=f"https://example.com/{index}", content="content", metadata={"rank": index})
+            for index in range(max_results)
+        ])
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = SearchCache(path=str(tmp_path / "search.sqlite3"), ttls={"google_search": 60}, stale_ttl=60)
+    monkeypatch.setattr("workflow.core.api.engines.search_engine.get_search_cache", lambda: cache)
+    return cache
+
+@pytest.mark.asyncio
+async def test_normalized_queries_share_an_entry(cache):
+    engine = CountingSearchAPI()
+    first = await engine.generate_api_response({"api_key": "k"}, "Python  Asyncio ", max_results=3)
+    # Same query once normalized, and max_results given explicitly as its default: one search
+    await engine.generate_api_response({"api_key": "k"}, "python asyncio", max_results=3)
+    await engine.generate_api_response({"api_key": "k"}, "other", max_results=10)
+    await engine.generate_api_response({"api_key": "k"}, "other")
+    assert engine.calls == 2
+    cached = await engine.generate_api_response({"api_key": "k"}, "python asyncio", max_results=3)
+    assert [result.title for result in cached.search_results] == [result.title for result in first.search_results]
+    assert cached.search_results[0].metadata == {"rank": "0"}
+    stats = cache.stats()
+    assert stats["misses"] == 2 and stats["memory_hits"] == 3 and stats["hit_ratio"] == 0.6
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_run_one_search(cache):
+    engine = CountingSearchAPI()
+    results = await asyncio.gather(*(engine.generate_api_response({}, "query", max_results=2) for _ in range(5)))
+    assert engine.calls == 1
+    assert all(len(result.search_results) == 2 for result in results)
+
+@pytest.mark.asyncio
+async def test_stale_results_are_served_while_refreshing(cache):
+    engine = CountingSearchAPI()
+    await engine.generate_api_response({}, "query", max_results=1)
+    # Age every entry past its TTL, but not past the stale window
+    for key, entry in list(cache._memory.items()):
+        cache._memory[key] = (time.time() - 1, time.time() + 60) + entry[2:]
+    stale = await engine.generate_api_response({}, "query", max_results=1)
+    assert stale.search_results[0].title == "query 1"
+    await asyncio.sleep(0.05)
+    assert engine.calls == 2 and cache.stats()["refreshes"] == 1
+    fresh = await engine.generate_api_response({}, "query", max_results=1)
+    assert fresh.search_results[0].title == "query 2"
+
+@pytest.mark.asyncio
+async def test_results_persist_on_disk(cache):
+    engine = CountingSearchAPI()
+    await engine.generate_api_response({}, "query", max_results=2)
+    cache._memory.clear()
+    results = await engine.generate_api_response({}, "query", max_results=2)
+    assert engine.calls == 1 and cache.stats()["disk_hits"] == 1
+    assert results.search_results[1].url == "https://example.com/1"
@@ -0,0 +1,51 @@
+import httpx, pytest
+from types import SimpleNamespace
+from workflow.core.api import WikipediaSearchAPI
+from workflow.core.api.search_cache import SearchCache
+
+def make_page(index: int, with_extract: bool = True):
+    page = {"pageid": 1000 + index, "title": f"Page {index}", "index": index, "fullurl": f"https://en.wikipedia.org/wiki/Page_{index}"}
+    if with_extract:
+        page["extract"] = f"Extract {index}"
+    if index == 2:
+        page["pageprops"] = {"disambiguation": ""}
+    return page
+
+@pytest.fixture
+def fake_mediawiki(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        params = request.url.params
+        assert params["generator"] == "search" and params["prop"] == "extracts|info|pageprops"
+        limit = int(params["gsrlimit"])
+        offset = int(params.get("excontinue", 0))
+        # Pages are returned out of rank order, with extracts for 20 of them per response
+        pages = [make_page(index, offset < index <= offset + 20) for index in reversed(range(1, limit + 1))]
+        data = {"batchcomplete": offset + 20 >= limit, "query": {"pages": pages}}
+        if offset + 20 < limit:
+            data["continue"] = {"excontinue": offset + 20, "continue": "||"}
+        return httpx.Response(200, json=data)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("workflow.core.api.engines.search_engine.get_client_registry", lambda: SimpleNamespace(http_client=lambda *args, **kwargs: client))
+    monkeypatch.setattr("workflow.core.api.engines.search_engine.get_search_cache", lambda: SearchCache(enabled=False))
+    return requests
+
+@pytest.mark.asyncio
+async def test_search_is_one_round_trip(fake_mediawiki):
+    references = await WikipediaSearchAPI().generate_api_response({}, "test query", max_results=10)
+    results = references.search_results
+    assert len(fake_mediawiki) == 1
+    # Ranked by search index, without the disambiguation page
+    assert [result.title for result in results] == [f"Page {index}" for index in range(1, 11) if index != 2]
+    assert results[0].content == "Extract 1"
+    assert results[0].url == "https://en.wikipedia.org/wiki/Page_1"
+    assert results[0].metadata["pageid"] == "1001"
+
+@pytest.mark.asyncio
+async def test_large_search_follows_extract_continuation(fake_mediawiki):
+    references = await WikipediaSearchAPI().generate_api_response({}, "test query", max_results=30)
+    assert len(fake_mediawiki) == 2
+    assert all(result.content for result in references.search_results)
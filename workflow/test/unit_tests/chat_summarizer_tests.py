@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import Mock, AsyncMock
+from workflow.core import APIManager, MessageDict
+from workflow.core.chat import ChatSummarizer
+from workflow.core.data_structures import References
+
+def history(count: int):
+    return [MessageDict(role="user" if i % 2 == 0 else "assistant", content=f"Message {i}: " + "some words about the topic " * 20) for i in range(count)]
+
+def summary_api(*summaries: str):
+    api_manager = Mock(spec=APIManager)
+    api_manager.generate_response_with_api_engine = AsyncMock(side_effect=[References(messages=[MessageDict(role="assistant", content=summary)]) for summary in summaries])
+    return api_manager
+
+@pytest.mark.asyncio
+async def test_short_or_disabled_history_is_unchanged():
+    messages = history(40)
+    api_manager = summary_api()
+    assert await ChatSummarizer(enabled=False, threshold=100).compact(api_manager, "chat", messages) is messages
+    assert await ChatSummarizer(enabled=True, threshold=100000).compact(api_manager, "chat", messages) is messages
+    api_manager.generate_response_with_api_engine.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_summary_is_cached_and_extended_incrementally():
+    summarizer = ChatSummarizer(enabled=True, threshold=1500, keep_last=4)
+    api_manager = summary_api("first summary", "second summary")
+    messages = history(40)
+
+    # The last 4 messages start on a user turn: the kept window starts on the assistant turn before it
+    compacted = await summarizer.compact(api_manager, "chat", messages)
+    assert compacted[0].content.endswith("first summary")
+    assert compacted[1:] == messages[-5:] and compacted[1].role == "assistant"
+
+    # A new turn that still fits reuses the cached summary without calling the model
+    messages += history(2)
+    compacted = await summarizer.compact(api_manager, "chat", messages)
+    assert compacted[0].content.endswith("first summary") and compacted[1:] == messages[-7:]
+    assert api_manager.generate_response_with_api_engine.await_count == 1
+
+    # Past the threshold again, only the messages after the summary are sent to the model
+    messages += history(20)
+    compacted = await summarizer.compact(api_manager, "chat", messages)
+    assert compacted[0].content.endswith("second summary") and compacted[1:] == messages[-5:]
+    prompt = api_manager.generate_response_with_api_engine.await_args.kwargs["messages"][0]["content"]
+    assert "first summary" in prompt and "Message 34" not in prompt and "Message 35" in prompt
+
+@pytest.mark.asyncio
+async def test_edited_history_discards_summary():
+    summarizer = ChatSummarizer(enabled=True, threshold=1500, keep_last=4)
+    api_manager = summary_api("first summary", "rewritten summary")
+    messages = history(40)
+    await summarizer.compact(api_manager, "chat", messages)
+
+    messages[0] = MessageDict(role="user", content="An edited first message")
+    compacted = await summarizer.compact(api_manager, "chat", messages)
+    assert compacted[0].content.endswith("rewritten summary")
+    prompt = api_manager.generate_response_with_api_engine.await_args.kwargs["messages"][0]["content"]
+    assert "Current summary" not in prompt and "An edited first message" in prompt
+
+@pytest.mark.asyncio
+async def test_kept_window_starts_on_an_assistant_turn():
+    summarizer = ChatSummarizer(enabled=True, threshold=1500, keep_last=1)
+    messages = history(40)
+    messages[36:] = [
+        MessageDict(role="user", content="Run the tool"),
+        MessageDict(role="assistant", content="Running it", tool_calls=[{"id": "call_1", "type": "function", "function": {"name": "search", "arguments": "{}"}}]),
+        MessageDict(role="tool", content="Tool result", tool_call_id="call_1"),
+        MessageDict(role="user", content="Thanks"),
+    ]
+    compacted = await summarizer.compact(summary_api("summary"), "chat", messages)
+    # keep_last=1 would start on a user turn after a tool result; the window moves back to the assistant's tool call
+    assert [message.role for message in compacted] == ["user", "assistant", "tool", "user"]
+    assert compacted[1] is messages[37]
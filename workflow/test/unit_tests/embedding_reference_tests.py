@@ -0,0 +1,68 @@
+import base64, json, os, pytest
+from unittest.mock import AsyncMock
+from workflow.core.data_structures import EmbeddingReference, References, FileReference, get_file_content
+from workflow.api_app.util.reference_utils import check_references
+
+VECTORS = [[0.5, -1.0, 2.0], [0.25, 0.0, 3.5]]
+
+def test_small_embeddings_are_inline(tmp_path):
+    reference = EmbeddingReference.from_vectors(VECTORS, filename="embeddings_model.json", directory=str(tmp_path))
+    assert reference.storage_path is None
+    assert reference.filename == "embeddings_model.npy"
+    assert reference.shape == (2, 3)
+    assert reference.buffer.format == 'f' and reference.buffer.shape == (2, 3)
+    assert reference.to_list() == VECTORS
+
+    restored = References.model_validate_json(References(files=[reference]).model_dump_json())
+    assert isinstance(restored.files[0], EmbeddingReference)
+    assert restored.files[0].to_list() == VECTORS
+
+def test_large_embeddings_are_stored_as_npy(tmp_path):
+    reference = EmbeddingReference.from_vectors(VECTORS, filename="embeddings_model", directory=str(tmp_path), inline_max_bytes=8)
+    assert reference.content is None
+    assert reference.storage_path.startswith(str(tmp_path)) and reference.storage_path.endswith(".npy")
+
+    handle = EmbeddingReference.model_validate_json(reference.model_dump_json())
+    assert handle.to_list() == VECTORS
+    with pytest.raises(TypeError):
+        handle.buffer[0, 0] = 1.0
+
+def test_npy_file_is_readable_by_numpy(tmp_path):
+    numpy = pytest.importorskip("numpy")
+    reference = EmbeddingReference.from_vectors(VECTORS, filename="embeddings_model", directory=str(tmp_path), inline_max_bytes=0)
+    assert numpy.load(reference.storage_path).tolist() == VECTORS
+    assert reference.as_numpy().shape == (2, 3)
+
+def test_mismatched_dimensions_are_rejected():
+    with pytest.raises(ValueError):
+        EmbeddingReference.from_vectors([[1.0], [1.0, 2.0]], filename="embeddings")
+
+def fake_backend(upload_dir):
+    """A db_app whose file creation behaves like the backend's storeFileReference."""
+    async def create_entity_in_db(entity_type, entity_data):
+        assert entity_type == 'files'
+        if not entity_data.get('content'):
+            raise ValueError("File content is missing")
+        content = base64.b64decode(entity_data['content'])
+        path = os.path.join(upload_dir, f"stored_{entity_data['filename']}")
+        with open(path, 'wb') as file:
+            file.write(content)
+        return {"_id": "file-1", "filename": entity_data['filename'], "type": entity_data['type'], "file_size": len(content), "storage_path": path}
+    return AsyncMock(create_entity_in_db=AsyncMock(side_effect=create_entity_in_db))
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("inline_max_bytes", [64 * 1024, 0])
+async def test_check_references_stores_embeddings(tmp_path, inline_max_bytes):
+    embeddings_dir, upload_dir = tmp_path / "embeddings", tmp_path / "uploads"
+    upload_dir.mkdir()
+    reference = EmbeddingReference.from_vectors(VECTORS, filename="embeddings_model", directory=str(embeddings_dir), inline_max_bytes=inline_max_bytes)
+    references = await check_references(References(files=[reference]), fake_backend(str(upload_dir)))
+
+    stored = references.files[0]
+    assert isinstance(stored, EmbeddingReference) and stored.id == "file-1"
+    assert stored.storage_path.startswith(str(upload_dir)) and stored.content is None
+    assert stored.to_list() == VECTORS
+    # Loaded back from the backend, the reference is a plain file reference to a valid .npy file
+    loaded = FileReference(filename=stored.filename, type=stored.type, storage_path=stored.storage_path)
+    assert json.loads(get_file_content(loaded)) == VECTORS
+    assert EmbeddingReference(filename=stored.filename, shape=(2, 3), storage_path=stored.storage_path).to_list() == VECTORS
@@ -190,5 +190,22 @@ def test_prompt_with_list_parameter():
     result = prompt.format_prompt(items=["apples", "bananas", "oranges"])
     assert result == "Items to buy: apples, bananas, oranges"
 
+def test_prompt_templates_are_compiled_once(monkeypatch):
+    from workflow.core.prompt import TemplateCache
+    import workflow.core.prompt.prompt as prompt_module
+    cache = TemplateCache(max_entries=2)
+    monkeypatch.setattr(prompt_module, "get_template_cache", lambda: cache)
+
+    prompt = Prompt(name="Greeting", content="Hello, {{name}}! {% set x = 1 %}{{ x }}")
+    other = Prompt(name="Same content", content=prompt.content)
+    assert prompt.format(name="Alice") == "Hello, Alice! 1"
+    assert other.format(name="Bob") == "Hello, Bob! 1"
+    assert prompt.undeclared_variables == {"name"}
+    assert cache.stats()["misses"] == 1
+
+    prompt.content = "Bye, {{name}}!"
+    assert prompt.format(name="Alice") == "Bye, Alice!"
+    assert cache.stats()["misses"] == 2
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
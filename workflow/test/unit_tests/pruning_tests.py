@@ -0,0 +1,56 @@
+import copy
+from workflow.util import MessagePruner, HeuristicTokenCounter, prune_messages, est_messages_token_count
+from workflow.util.pruning import PRUNED_CONTENT
+
+COUNTER = HeuristicTokenCounter(name="test", message_overhead=4)
+
+def make_history(turns: int, tool_output: str = "result " * 50):
+    messages = [{"role": "system", "content": "You are a helpful assistant."}]
+    for turn in range(turns):
+        messages.append({"role": "user", "content": f"Question number {turn} " * 5})
+        messages.append({"role": "assistant", "content": "", "tool_calls": [{"id": f"call_{turn}", "type": "function", "function": {"name": "search", "arguments": "{}"}}]})
+        messages.append({"role": "tool", "content": tool_output, "tool_call_id": f"call_{turn}"})
+        messages.append({"role": "assistant", "content": f"Answer number {turn} " * 5})
+    return messages
+
+def test_does_not_mutate_input():
+    messages = make_history(20)
+    original = copy.deepcopy(messages)
+    pruned = MessagePruner().prune(messages, 400, counter=COUNTER)
+    assert messages == original
+    assert COUNTER.count_messages(pruned) <= 400
+
+def test_drops_oldest_tool_outputs_first():
+    messages = make_history(10)
+    budget = COUNTER.count_messages(messages) - 100
+    pruned = MessagePruner(strategies=["drop_tool_outputs"]).prune(messages, budget, counter=COUNTER)
+    tool_contents = [message["content"] for message in pruned if message["role"] == "tool"]
+    assert tool_contents[0] == PRUNED_CONTENT
+    assert tool_contents[-1] != PRUNED_CONTENT
+    assert all(message["content"] != PRUNED_CONTENT for message in pruned if message["role"] != "tool")
+
+def test_keeps_system_and_last_turns_intact():
+    messages = make_history(10)
+    pruned = MessagePruner(strategies=["keep_last_turns"], keep_last=4).prune(messages, 10, counter=COUNTER)
+    assert pruned[0] == messages[0]
+    assert pruned[-4:] == messages[-4:]
+    assert all(message["content"] == PRUNED_CONTENT for message in pruned[1:-4])
+
+def test_truncates_longest_message_to_fit():
+    messages = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "word " * 1000}]
+    pruned = MessagePruner(strategies=["truncate_longest"]).prune(messages, 200, counter=COUNTER)
+    assert COUNTER.count_messages(pruned) <= 200
+    assert pruned[1]["content"].endswith(PRUNED_CONTENT)
+    assert pruned[0] is messages[0]
+
+def test_prune_messages_uses_model_counter():
+    messages = make_history(30)
+    pruned = prune_messages(messages, 1000, api_name="openai_llm")
+    assert est_messages_token_count(pruned, api_name="openai_llm") <= 1000
+    assert pruned[0] == messages[0] and pruned[-4:] == messages[-4:]
+    # Dropped turns are merged into placeholders without orphaning tool results
+    call_ids = set()
+    for message in pruned:
+        call_ids.update(call["id"] for call in message.get("tool_calls") or [])
+        if message["role"] == "tool":
+            assert message["tool_call_id"] in call_ids
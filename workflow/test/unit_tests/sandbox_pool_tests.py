@@ -0,0 +1,88 @@
+import pytest, time
+from unittest.mock import Mock
+from docker.models.containers import ExecResult
+from workflow.util.sandbox_pool import LanguagePool, SandboxJob, SandboxCancelledError, RESET_COMMAND
+
+def make_client(exit_code: int = 0, output: bytes = b"hello\n", delay: float = 0.0, writes: tuple = ()):
+    """A docker client whose containers run each execution for `delay` seconds, changing the paths in `writes`."""
+    def run(*args, **kwargs):
+        container = Mock()
+        container.status = "running"
+        container.short_id = "abc123"
+        changes = [{"Path": "/etc/hostname", "Kind": 0}]
+        def exec_run(command, **kwargs):
+            if command == RESET_COMMAND or command == ['true']:
+                return ExecResult(0, b"")
+            time.sleep(delay)
+            changes.extend({"Path": path, "Kind": 1} for path in writes)
+            return ExecResult(exit_code, output)
+        container.exec_run.side_effect = exec_run
+        container.diff.side_effect = lambda: list(changes)
+        return container
+    client = Mock()
+    client.containers.run.side_effect = run
+    return client
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_containers_are_reused_until_max_uses():
+    client = make_client()
+    pool = LanguagePool(language="python", image="mypython:latest", size=1, max_uses=3, client=client)
+    for _ in range(3):
+        assert pool.execute("print('hello')", timeout=5) == ("hello\n", 0)
+    stats = pool.stats()
+    assert stats["cold_starts"] == 1
+    assert stats["warm_hits"] == 2
+    assert stats["recycled"] == 1
+    # The replacement of the recycled container is started in the background
+    wait_for(lambda: pool.stats()["idle"] == 1)
+    assert client.containers.run.call_count == 2
+    pool.shutdown()
+
+def test_failed_execution_recycles_the_container():
+    pool = LanguagePool(language="bash", image="mybash:latest", size=1, client=make_client(exit_code=1, output=b"boom"))
+    assert pool.execute("exit 1", timeout=5) == ("boom", 1)
+    assert pool.stats()["recycled"] == 1
+    pool.shutdown()
+
+def test_timeout_raises_and_recycles():
+    # `timeout -s KILL` exits with 128 + SIGKILL when it kills the code
+    pool = LanguagePool(language="python", image="mypython:latest", size=1, client=make_client(exit_code=137, delay=1.0))
+    with pytest.raises(TimeoutError):
+        pool.execute("while True: pass", timeout=1)
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["recycled"] == 1
+    pool.shutdown()
+
+def test_quick_kill_is_not_a_timeout():
+    # Killed long before its timeout, e.g. out of memory
+    pool = LanguagePool(language="python", image="mypython:latest", size=1, client=make_client(exit_code=137, output=b"Killed"))
+    assert pool.execute("x = ' ' * 2**40", timeout=5) == ("Killed", 137)
+    assert pool.stats()["timeouts"] == 0 and pool.stats()["recycled"] == 1
+    pool.shutdown()
+
+def test_reset_kills_processes_and_clears_scratch_dirs():
+    assert "kill -9 -1" in RESET_COMMAND[-1]
+    pool = LanguagePool(language="python", image="mypython:latest", size=1, client=make_client(writes=("/app/out.txt", "/root/.cache/pip")))
+    pool.execute("open('out.txt', 'w')", timeout=5)
+    assert pool.stats()["recycled"] == 0 and pool.stats()["idle"] == 1
+    pool.shutdown()
+
+def test_changes_outside_scratch_dirs_recycle_the_container():
+    pool = LanguagePool(language="python", image="mypython:latest", size=1, client=make_client(writes=("/usr/local/lib/python3.11/site-packages/requests",)))
+    assert pool.execute("import subprocess; subprocess.run(['pip', 'install', 'requests'])", timeout=5) == ("hello\n", 0)
+    assert pool.stats()["recycled"] == 1
+    pool.shutdown()
+
+def test_cancelled_job_does_not_run():
+    pool = LanguagePool(language="python", image="mypython:latest", size=1, client=make_client())
+    job = SandboxJob()
+    job.cancel()
+    with pytest.raises(SandboxCancelledError):
+        pool.execute("print('hello')", timeout=5, job=job)
+    # The container was not used, it stays warm
+    assert pool.stats()["idle"] == 1 and pool.stats()["recycled"] == 0
+    pool.shutdown()
@@ -0,0 +1,42 @@
+from workflow.util import HeuristicTokenCounter, get_token_counter, est_messages_token_count
+from workflow.util.token_counter import TokenCounterRegistry
+
+def test_heuristic_counts_words_digits_and_symbols():
+    counter = HeuristicTokenCounter(name="test")
+    assert counter.count_text("the cat") == 2
+    assert counter.count_text("internationalization") == 4
+    assert counter.count_text("1234567") == 3
+    assert counter.count_text("你好!") == 3
+    assert counter.count_text("") == 0
+
+def test_margin_and_memoization():
+    counter = HeuristicTokenCounter(name="test", margin=0.5)
+    text = "one two three four"
+    assert counter.count_text(text) == 6  # 4 tokens + 50%
+    assert text in counter._cache
+    counter._cache[text] = 100
+    assert counter.count_text(text) == 100
+
+def test_messages_count_tool_calls_names_and_images():
+    counter = HeuristicTokenCounter(name="test", message_overhead=4, image_tokens=500)
+    plain = counter.count_messages([{"role": "user", "content": "hello"}])
+    with_name = counter.count_messages([{"role": "user", "content": "hello", "name": "alice"}])
+    with_image = counter.count_messages([{"role": "user", "content": [{"type": "text", "text": "hello"}, {"type": "image_url", "image_url": {"url": "x"}}]}])
+    with_tool_call = counter.count_messages([{"role": "assistant", "content": "hello", "tool_calls": [{"id": "1", "type": "function", "function": {"name": "search", "arguments": '{"query": "weather today"}'}}]}])
+    assert with_name == plain + 2
+    assert with_image == plain + 500
+    assert with_tool_call > plain + 4
+
+def test_registry_resolves_by_model_format_then_api_name():
+    registry = TokenCounterRegistry()
+    custom = HeuristicTokenCounter(name="custom")
+    registry.register("Llama3", custom)
+    assert registry.get("lm-studio_llm", "Llama3") is custom
+    assert registry.get("anthropic_llm", "Base").name.endswith("anthropic")
+    assert registry.get("anthropic_llm") is registry.get("anthropic_llm", "Base")
+    assert registry.get(None, None).name == "heuristic:default"
+
+def test_est_messages_token_count_uses_the_model_counter():
+    messages = [{"role": "user", "content": "Summarize the following document for me please"}]
+    assert est_messages_token_count(messages, api_name="anthropic_llm") >= est_messages_token_count(messages, api_name="gemini_llm")
+    assert get_token_counter("gemini_llm") is get_token_counter("gemini_llm")
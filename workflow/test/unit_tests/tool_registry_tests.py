@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import Mock, AsyncMock
+from workflow.core import AliceChat, Prompt, APIManager, AliceAgent, AliceTask
+from workflow.core.agent import ToolRegistry, compile_validator
+from workflow.core.data_structures import ToolFunction, FunctionConfig, FunctionParameters, ParameterDefinition
+
+def make_tool_function(name: str = "test_function") -> ToolFunction:
+    return ToolFunction(function=FunctionConfig(
+        name=name,
+        description="Test function",
+        parameters=FunctionParameters(
+            type="object",
+            properties={
+                "query": ParameterDefinition(type="string", description="Search query"),
+                "count": ParameterDefinition(type="integer", description="Number of results"),
+            },
+            required=["query"]
+        )
+    ))
+
+def make_task(name: str = "test_function") -> Mock:
+    task = Mock(spec=AliceTask)
+    task.get_function.return_value = {
+        "tool_function": make_tool_function(name),
+        "function_map": {name: AsyncMock()}
+    }
+    return task
+
+@pytest.fixture
+def sample_chat():
+    return AliceChat(
+        name="TestChat",
+        alice_agent=AliceAgent(
+            name="TestAgent",
+            system_message=Prompt(name="test", content="You are a test assistant"),
+            has_functions=True,
+        ),
+    )
+
+def test_compiled_validator_messages():
+    validate = compile_validator(make_tool_function())
+    assert validate({"query": "cats", "count": 3}) == (True, None)
+    assert validate({"count": 3}) == (False, "Missing required parameter: query")
+    assert validate({"query": "cats", "page": 2}) == (False, "Unexpected parameter: page")
+    assert validate({"query": 1}) == (False, "Invalid type for parameter 'query'. Expected string, got int")
+
+def test_chat_registry_built_once_per_function_set(sample_chat):
+    api_manager = Mock(spec=APIManager)
+    task = make_task()
+    sample_chat.functions = [task]
+
+    for _ in range(3):
+        assert [tool["function"]["name"] for tool in sample_chat.tool_list(api_manager)] == ["test_function"]
+        assert "test_function" in sample_chat.tool_map(api_manager)
+    assert task.get_function.call_count == 1
+
+    other_task = make_task("other_function")
+    sample_chat.functions = [task, other_task]
+    assert set(sample_chat.tool_map(api_manager)) == {"test_function", "other_function"}
+    assert other_task.get_function.call_count == 1
+
+def test_registry_only_registers_callable_tools():
+    registry = ToolRegistry.from_tools([make_tool_function("a"), make_tool_function("b")], {"a": AsyncMock()})
+    assert registry.get("a") is not None
+    assert registry.get("b") is None
+    assert len(registry.schemas) == 2
@@ -0,0 +1,83 @@
+import asyncio, gzip
+from contextlib import asynccontextmanager
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from workflow.util.web_fetcher import WebFetcher, ResponseTooLargeError, UnsupportedContentTypeError, detect_charset
+
+PAGE = "<html><head><meta charset='iso-8859-1'><title>Café</title></head><body><p>Crème brûlée</p></body></html>"
+
+async def latin1_gzip(request):
+    return web.Response(body=gzip.compress(PAGE.encode("latin-1")), headers={"Content-Type": "text/html", "Content-Encoding": "gzip"})
+
+async def endless(request):
+    # Chunked, without Content-Length: only streaming can tell the page is too large
+    response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+    await response.prepare(request)
+    for _ in range(1000):
+        await response.write(b"x" * 65536)
+    return response
+
+async def declared_large(request):
+    return web.Response(body=b"x" * 4096, headers={"Content-Type": "text/plain"})
+
+async def image(request):
+    return web.Response(body=b"\x89PNG" * 10, content_type="image/png")
+
+async def slow(request):
+    request.app["active"] += 1
+    request.app["max_active"] = max(request.app["max_active"], request.app["active"])
+    await asyncio.sleep(0.05)
+    request.app["active"] -= 1
+    return web.Response(text=f"<p>{request.match_info['n']}</p>", content_type="text/html")
+
+@asynccontextmanager
+async def serve():
+    """A local server for the pages above, and a fetcher to fetch them."""
+    app = web.Application()
+    app["active"] = app["max_active"] = 0
+    app.router.add_get("/latin1", latin1_gzip)
+    app.router.add_get("/endless", endless)
+    app.router.add_get("/declared", declared_large)
+    app.router.add_get("/image", image)
+    app.router.add_get("/slow/{n}", slow)
+    server = TestServer(app)
+    await server.start_server()
+    fetcher = WebFetcher(max_bytes=1024 * 1024, max_connections_per_host=2)
+    try:
+        yield server, fetcher
+    finally:
+        await fetcher.aclose()
+        await server.close()
+
+def test_detect_charset():
+    assert detect_charset(b"<meta charset='windows-1252'>", "utf-8") == "utf-8"
+    assert detect_charset(b'<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">') == "shift_jis"
+    assert detect_charset("hi".encode("utf-8-sig"), "latin-1") == "utf-8-sig"
+    assert detect_charset(b"<p>hi</p>", "no-such-charset") == "utf-8"
+
+@pytest.mark.asyncio
+async def test_fetch_decompresses_and_decodes():
+    async with serve() as (server, fetcher):
+        page = await fetcher.fetch(str(server.make_url("/latin1")))
+        assert page.charset == "iso8859-1" and page.content_type == "text/html"
+        assert page.text == PAGE and page.size == len(PAGE)
+
+@pytest.mark.asyncio
+async def test_fetch_aborts_large_pages():
+    async with serve() as (server, fetcher):
+        with pytest.raises(ResponseTooLargeError):
+            await fetcher.fetch(str(server.make_url("/endless")))
+        with pytest.raises(ResponseTooLargeError):
+            await fetcher.fetch(str(server.make_url("/declared")), max_bytes=1024)
+        with pytest.raises(UnsupportedContentTypeError):
+            await fetcher.fetch(str(server.make_url("/image")))
+
+@pytest.mark.asyncio
+async def test_fetch_many_is_concurrent_within_host_limit():
+    async with serve() as (server, fetcher):
+        urls = [str(server.make_url(f"/slow/{n}")) for n in range(6)] + [str(server.make_url("/image"))]
+        pages = await fetcher.fetch_many(urls)
+        assert [page.text for page in pages[:6]] == [f"<p>{n}</p>" for n in range(6)]
+        assert isinstance(pages[6], UnsupportedContentTypeError)
+        assert server.app["max_active"] == 2
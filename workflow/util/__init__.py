@@ -2,5 +2,9 @@ from .logging_config import LOGGER, LOG_LEVEL
 from .const import BACKEND_PORT, FRONTEND_PORT, WORKFLOW_PORT, HOST
 from .run_code import run_code
 from .utils import chunk_text, est_token_count, est_messages_token_count, prune_messages
+from .token_counter import TokenCounter, HeuristicTokenCounter, get_token_counter
+from .pruning import MessagePruner, PruningState
+from .sandbox_pool import SandboxPool, LanguagePool, SandboxJob, get_sandbox_pool
+from .web_fetcher import WebFetcher, FetchedPage, get_web_fetcher
 
-__all__ = ['BACKEND_PORT', 'FRONTEND_PORT',  'LOGGER', 'WORKFLOW_PORT', 'HOST', 'LOG_LEVEL', 'run_code', 'chunk_text', 'est_token_count', 'est_messages_token_count', 'prune_messages']
+__all__ = ['BACKEND_PORT', 'FRONTEND_PORT',  'LOGGER', 'WORKFLOW_PORT', 'HOST', 'LOG_LEVEL', 'run_code', 'chunk_text', 'est_token_count', 'est_messages_token_count', 'prune_messages', 'TokenCounter', 'HeuristicTokenCounter', 'get_token_counter', 'MessagePruner', 'PruningState', 'SandboxPool', 'LanguagePool', 'SandboxJob', 'get_sandbox_pool', 'WebFetcher', 'FetchedPage', 'get_web_fetcher']
\ No newline at end of file
@@ -18,6 +18,141 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
 LOGGING_FOLDER = os.getenv("LOGGING_FOLDER", "logs")
 
+# Connection pool settings for the shared provider clients (see core/api/client_registry.py)
+API_CLIENT_MAX_CONNECTIONS = int(os.getenv("API_CLIENT_MAX_CONNECTIONS", 100))
+API_CLIENT_MAX_KEEPALIVE = int(os.getenv("API_CLIENT_MAX_KEEPALIVE", 20))
+API_CLIENT_KEEPALIVE_EXPIRY = float(os.getenv("API_CLIENT_KEEPALIVE_EXPIRY", 60))
+
+# Per-provider limits applied by APIManager (see core/api/rate_limiter.py). An API's api_config can override
+# max_concurrency and max_retries, and set requests_per_minute / tokens_per_minute
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", 10))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", 3))
+API_RETRY_BASE_DELAY = float(os.getenv("API_RETRY_BASE_DELAY", 1.0))
+API_RETRY_MAX_DELAY = float(os.getenv("API_RETRY_MAX_DELAY", 30.0))
+
+# Hedged LLM requests (see APIManager): when enabled, a request slower than the API's rolling p95 latency is
+# duplicated to another eligible API. API_HEDGE_DEFAULT_DELAY is used until API_HEDGE_MIN_SAMPLES latencies are known
+API_STATS_WINDOW = int(os.getenv("API_STATS_WINDOW", 200))
+API_HEDGING_ENABLED = os.getenv("API_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+API_HEDGE_DEFAULT_DELAY = float(os.getenv("API_HEDGE_DEFAULT_DELAY", 10.0))
+API_HEDGE_MIN_SAMPLES = int(os.getenv("API_HEDGE_MIN_SAMPLES", 20))
+
+# How APIManager spreads requests over several eligible API entries: first, round_robin, least_outstanding or weighted
+API_BALANCING_POLICY = os.getenv("API_BALANCING_POLICY", "first")
+
+# Response cache for models with use_cache (see core/api/response_cache.py). Set RESPONSE_CACHE_PATH to "" to keep it in memory only
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1000))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 24 * 60 * 60))
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", os.path.join(LOGGING_FOLDER, "cache", "responses.sqlite3"))
+
+# Embedding micro-batching (see core/api/engines/embedding_batcher.py): concurrent embedding calls to the same model
+# within EMBEDDING_BATCH_WINDOW seconds are sent as one request of at most EMBEDDING_BATCH_MAX_SIZE inputs / MAX_TOKENS tokens
+EMBEDDING_BATCH_WINDOW = float(os.getenv("EMBEDDING_BATCH_WINDOW", 0.01))
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", 256))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", 100000))
+# Embedding matrices larger than EMBEDDING_INLINE_MAX_BYTES are stored as .npy files in EMBEDDINGS_DIR (shared volume)
+# and referenced by path; smaller ones travel inline as a base64 .npy file (see EmbeddingReference)
+EMBEDDINGS_DIR = os.getenv("EMBEDDINGS_DIR", os.path.join(SHARED_UPLOAD_DIR, "embeddings"))
+EMBEDDING_INLINE_MAX_BYTES = int(os.getenv("EMBEDDING_INLINE_MAX_BYTES", 64 * 1024))
+
+# Thread pools running the blocking SDK calls of the engines off the event loop (see core/api/engines/engine_executor.py).
+# ENGINE_EXECUTOR_POOL_SIZES sizes pools by name, e.g. "arxiv=4,gemini=16"; calls slower than ENGINE_EXECUTOR_SLOW_CALL are logged
+ENGINE_EXECUTOR_WORKERS = int(os.getenv("ENGINE_EXECUTOR_WORKERS", 8))
+ENGINE_EXECUTOR_POOL_SIZES = {
+    name.strip(): int(size) for name, size in
+    (entry.split("=", 1) for entry in os.getenv("ENGINE_EXECUTOR_POOL_SIZES", "").split(",") if "=" in entry)
+}
+ENGINE_EXECUTOR_TIMEOUT = float(os.getenv("ENGINE_EXECUTOR_TIMEOUT", 120))
+ENGINE_EXECUTOR_SLOW_CALL = float(os.getenv("ENGINE_EXECUTOR_SLOW_CALL", 5))
+
+# Offline token counting (see util/token_counter.py). TOKENIZER_FILES maps an api_name or model_format to a local
+# tokenizer.json, e.g. "Llama3=/models/llama3/tokenizer.json"; tiktoken reads its vocabulary from TIKTOKEN_CACHE_DIR
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", 20000))
+TOKENIZER_FILES = {
+    name.strip(): path.strip() for name, path in
+    (entry.split("=", 1) for entry in os.getenv("TOKENIZER_FILES", "").split(",") if "=" in entry)
+}
+
+# Context pruning (see util/pruning.py): strategies applied in order until the history fits, among
+# drop_tool_outputs, drop_oldest, truncate_longest and keep_last_turns; the last PRUNING_KEEP_LAST messages are kept intact
+PRUNING_STRATEGIES = [name.strip() for name in os.getenv("PRUNING_STRATEGIES", "drop_tool_outputs,drop_oldest,truncate_longest").split(",") if name.strip()]
+PRUNING_KEEP_LAST = int(os.getenv("PRUNING_KEEP_LAST", 4))
+
+# Rolling chat summarization (see core/chat/chat_summarizer.py), opt-in: once a chat's history passes CHAT_SUMMARY_THRESHOLD
+# tokens, the turns before the last CHAT_SUMMARY_KEEP_LAST messages are replaced by a summary, extended incrementally.
+# Summaries are written by the agent's instruct model, or the default model of the LLM API, and cached per chat id
+CHAT_SUMMARY_ENABLED = os.getenv("CHAT_SUMMARY_ENABLED", "false").lower() in ("1", "true", "yes")
+CHAT_SUMMARY_THRESHOLD = int(os.getenv("CHAT_SUMMARY_THRESHOLD", 6000))
+CHAT_SUMMARY_KEEP_LAST = int(os.getenv("CHAT_SUMMARY_KEEP_LAST", 8))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", 800))
+CHAT_SUMMARY_CACHE_SIZE = int(os.getenv("CHAT_SUMMARY_CACHE_SIZE", 1000))
+
+# Messages rendered to the provider format by AliceAgent, memoized per message and model family (see core/agent/message_render_cache.py)
+MESSAGE_RENDER_CACHE_SIZE = int(os.getenv("MESSAGE_RENDER_CACHE_SIZE", 5000))
+
+# Compiled Jinja2 templates of prompts, shared by content hash (see core/prompt/template_cache.py)
+PROMPT_TEMPLATE_CACHE_SIZE = int(os.getenv("PROMPT_TEMPLATE_CACHE_SIZE", 512))
+
+# Provider-side prompt caching: Anthropic requests mark the tools, the system prompt and the recent history as cache
+# breakpoints, and OpenAI requests carry a prompt_cache_key derived from the system prompt and tools
+PROMPT_CACHING_ENABLED = os.getenv("PROMPT_CACHING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Default number of tool calls of one reply an agent runs concurrently (AliceAgent.max_concurrent_tool_calls)
+AGENT_MAX_CONCURRENT_TOOL_CALLS = int(os.getenv("AGENT_MAX_CONCURRENT_TOOL_CALLS", 4))
+
+# Warm sandbox containers for code execution (see util/sandbox_pool.py): up to SANDBOX_POOL_SIZE containers per language
+# are kept running and code is exec'd into them. A container is replaced after SANDBOX_MAX_USES executions or a failure,
+# and idle containers unused for SANDBOX_HEALTH_CHECK_INTERVAL seconds are checked before reuse
+SANDBOX_POOL_ENABLED = os.getenv("SANDBOX_POOL_ENABLED", "true").lower() in ("1", "true", "yes")
+SANDBOX_POOL_SIZE = int(os.getenv("SANDBOX_POOL_SIZE", 2))
+SANDBOX_MAX_USES = int(os.getenv("SANDBOX_MAX_USES", 50))
+SANDBOX_ACQUIRE_TIMEOUT = float(os.getenv("SANDBOX_ACQUIRE_TIMEOUT", 60))
+SANDBOX_HEALTH_CHECK_INTERVAL = float(os.getenv("SANDBOX_HEALTH_CHECK_INTERVAL", 30))
+SANDBOX_MEM_LIMIT = os.getenv("SANDBOX_MEM_LIMIT", "512m")
+SANDBOX_CPU_QUOTA = int(os.getenv("SANDBOX_CPU_QUOTA", 50000))
+SANDBOX_CLIENT_TIMEOUT = int(os.getenv("SANDBOX_CLIENT_TIMEOUT", 300))
+
+# Code execution of agents runs off the event loop in the "code_execution" engine pool (sized with ENGINE_EXECUTOR_POOL_SIZES).
+# CODE_EXECUTION_TIMEOUT bounds an execution when the calling task sets no timeout
+CODE_EXECUTION_TIMEOUT = float(os.getenv("CODE_EXECUTION_TIMEOUT", 30))
+
+# Wikipedia search over the MediaWiki action API (see WikipediaSearchAPI)
+WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL", "https://en.wikipedia.org/w/api.php")
+WIKIPEDIA_USER_AGENT = os.getenv("WIKIPEDIA_USER_AGENT", "Alice_Assistant (https://github.com/MarianoMolina/project_alice)")
+
+# Search result cache of the search engines (see core/api/search_cache.py). Results are fresh for the TTL of their engine
+# (SEARCH_CACHE_TTLS, e.g. "reddit_search=600,google_search=3600", else SEARCH_CACHE_DEFAULT_TTL), then served for another
+# SEARCH_CACHE_STALE_TTL seconds while being refreshed in the background. Set SEARCH_CACHE_PATH to "" to keep it in memory only
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 2000))
+SEARCH_CACHE_DEFAULT_TTL = float(os.getenv("SEARCH_CACHE_DEFAULT_TTL", 6 * 60 * 60))
+SEARCH_CACHE_TTLS = {
+    "wikipedia_search": 24 * 60 * 60,
+    "arxiv_search": 6 * 60 * 60,
+    "reddit_search": 15 * 60,
+    **{name.strip(): float(ttl) for name, ttl in (entry.split("=", 1) for entry in os.getenv("SEARCH_CACHE_TTLS", "").split(",") if "=" in entry)}
+}
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", 60 * 60))
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join(LOGGING_FOLDER, "cache", "search_results.sqlite3"))
+
+# Meta search over all active search APIs (see MetaSearchAPI). Engines that have not answered within META_SEARCH_ENGINE_TIMEOUT
+# seconds are left out. Results are merged with reciprocal rank fusion (constant META_SEARCH_RRF_K), and results whose content
+# SimHashes differ in at most META_SEARCH_SIMHASH_DISTANCE of 64 bits are treated as duplicates
+META_SEARCH_ENGINE_TIMEOUT = float(os.getenv("META_SEARCH_ENGINE_TIMEOUT", 10))
+META_SEARCH_RRF_K = int(os.getenv("META_SEARCH_RRF_K", 60))
+META_SEARCH_SIMHASH_DISTANCE = int(os.getenv("META_SEARCH_SIMHASH_DISTANCE", 3))
+
+# Web page fetcher of the web scraping tasks (see util/web_fetcher.py): one pooled aiohttp session with at most
+# WEB_FETCH_MAX_CONNECTIONS connections, WEB_FETCH_MAX_CONNECTIONS_PER_HOST to a single host. Pages larger than
+# WEB_FETCH_MAX_BYTES once decompressed are aborted
+WEB_FETCH_MAX_CONNECTIONS = int(os.getenv("WEB_FETCH_MAX_CONNECTIONS", 100))
+WEB_FETCH_MAX_CONNECTIONS_PER_HOST = int(os.getenv("WEB_FETCH_MAX_CONNECTIONS_PER_HOST", 4))
+WEB_FETCH_TIMEOUT = float(os.getenv("WEB_FETCH_TIMEOUT", 30))
+WEB_FETCH_CONNECT_TIMEOUT = float(os.getenv("WEB_FETCH_CONNECT_TIMEOUT", 10))
+WEB_FETCH_READ_TIMEOUT = float(os.getenv("WEB_FETCH_READ_TIMEOUT", 15))
+WEB_FETCH_MAX_BYTES = int(os.getenv("WEB_FETCH_MAX_BYTES", 5 * 1024 * 1024))
+WEB_FETCH_USER_AGENT = os.getenv("WEB_FETCH_USER_AGENT", "Mozilla/5.0 (compatible; Alice_Assistant; +https://github.com/MarianoMolina/project_alice)")
+
 const_model_definitions = [
     {
         "short_name": "Mistral7B_Instruct",
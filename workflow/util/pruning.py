@@ -0,0 +1,180 @@
+import heapq, math
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional, Callable
+from workflow.util.token_counter import TokenCounter, get_token_counter
+from workflow.util.const import PRUNING_KEEP_LAST, PRUNING_STRATEGIES
+
+PRUNED_CONTENT = "[ctx_exceeded]"
+
+class PruningState:
+    """
+    Working state of one pruning pass: the output list, the cost of each message and the running
+    total. Strategies replace messages through `replace`, which keeps the total up to date, so
+    no strategy ever re-counts the whole history.
+    """
+    def __init__(self, messages: List[Dict[str, Any]], ctx_size: int, counter: TokenCounter, keep_last: int, fixed_tokens: int):
+        self.messages = list(messages)
+        self.ctx_size = ctx_size
+        self.counter = counter
+        self.costs = [counter.count_message(message) for message in self.messages]
+        self.total = sum(self.costs) + fixed_tokens
+        # The last `keep_last` messages and system messages are never dropped; a tool call and its results stay together
+        self.protected_from = max(0, len(self.messages) - keep_last)
+        while 0 < self.protected_from < len(self.messages) and self.messages[self.protected_from].get("role") == "tool":
+            self.protected_from -= 1
+        self.pruned = [False] * len(self.messages)
+
+    @property
+    def excess(self) -> int:
+        return self.total - self.ctx_size
+
+    def is_droppable(self, index: int) -> bool:
+        return index < self.protected_from and not self.pruned[index] and self.messages[index].get("role") not in ("system", "SYSTEM")
+
+    def replace(self, index: int, content: str, pruned: bool = True):
+        """Replace a message's content with a copy, never touching the caller's dict."""
+        message = {**self.messages[index], "content": content}
+        if "message" in message:
+            message["message"] = message.pop("content")
+        cost = self.counter.count_message(message)
+        self.total += cost - self.costs[index]
+        self.costs[index] = cost
+        self.messages[index] = message
+        self.pruned[index] = pruned
+
+    def collapse(self):
+        """
+        Merge each run of consecutive dropped messages into a single placeholder, so dropped
+        messages no longer cost their per-message overhead. A run never separates a tool call
+        from its results: leading tool results and a trailing tool call stay as placeholders.
+        """
+        messages, costs, pruned = [], [], []
+        index, count = 0, len(self.messages)
+        while index < count:
+            end = index
+            while end < count and self.pruned[end] and end < self.protected_from:
+                end += 1
+            start, stop = index, end
+            while start < stop and self.messages[start].get("role") == "tool":
+                start += 1
+            while stop > start and self.messages[stop - 1].get("tool_calls"):
+                stop -= 1
+            if stop - start > 1:
+                kept = list(range(index, start)) + [None] + list(range(stop, end))
+            else:
+                kept = list(range(index, max(end, index + 1)))
+            for position in kept:
+                if position is None:
+                    message = {**self.messages[start], "content": PRUNED_CONTENT}
+                    if "message" in message:
+                        message["message"] = message.pop("content")
+                    for key in ("name", "tool_calls", "tool_call_id"):
+                        message.pop(key, None)
+                    messages.append(message)
+                    costs.append(self.counter.count_message(message))
+                    pruned.append(True)
+                else:
+                    messages.append(self.messages[position])
+                    costs.append(self.costs[position])
+                    pruned.append(self.pruned[position])
+            index = max(end, index + 1)
+        self.protected_from -= len(self.messages) - len(messages)
+        self.total += sum(costs) - sum(self.costs)
+        self.messages, self.costs, self.pruned = messages, costs, pruned
+
+def drop_tool_outputs(state: PruningState):
+    """Replace the content of tool results, oldest first."""
+    for index in range(state.protected_from):
+        if state.excess <= 0:
+            return
+        if state.messages[index].get("role") == "tool" and state.is_droppable(index):
+            state.replace(index, PRUNED_CONTENT)
+
+def drop_oldest(state: PruningState):
+    """Replace the content of the oldest messages, keeping system messages and the last turns intact."""
+    for index in range(state.protected_from):
+        if state.excess <= 0:
+            break
+        if state.is_droppable(index):
+            state.replace(index, PRUNED_CONTENT)
+    state.collapse()
+
+def truncate_longest(state: PruningState):
+    """Truncate the longest non-system messages, including recent ones, until the history fits."""
+    heap = [(-cost, index) for index, cost in enumerate(state.costs) if state.messages[index].get("role") not in ("system", "SYSTEM")]
+    heapq.heapify(heap)
+    while state.excess > 0 and heap:
+        _, index = heapq.heappop(heap)
+        content = _get_content(state.messages[index])
+        if not isinstance(content, str) or content == PRUNED_CONTENT:
+            continue
+        text_tokens = max(1, state.counter.count_text(content))
+        excess = state.excess
+        if excess >= text_tokens:
+            state.replace(index, PRUNED_CONTENT)
+            continue
+        # Keep the share of characters matching the tokens that can stay, then shrink until it fits
+        keep_chars = int(len(content) * (text_tokens - excess) / text_tokens)
+        for _ in range(4):
+            state.replace(index, content[:keep_chars] + "..." + PRUNED_CONTENT)
+            if state.excess <= 0 or keep_chars == 0:
+                break
+            keep_chars = max(0, keep_chars - math.ceil(len(content) * state.excess / text_tokens) - 1)
+
+def keep_last_turns(state: PruningState):
+    """Drop everything before the last turns at once, keeping system messages."""
+    for index in range(state.protected_from):
+        if state.is_droppable(index):
+            state.replace(index, PRUNED_CONTENT)
+    state.collapse()
+
+PruningStrategy = Callable[[PruningState], None]
+
+STRATEGIES: Dict[str, PruningStrategy] = {
+    "drop_tool_outputs": drop_tool_outputs,
+    "drop_oldest": drop_oldest,
+    "truncate_longest": truncate_longest,
+    "keep_last_turns": keep_last_turns,
+}
+
+def _get_content(message: Dict[str, Any]) -> Any:
+    return message["message"] if "message" in message and "content" not in message else message.get("content")
+
+class MessagePruner(BaseModel):
+    """
+    Prunes a chat history to fit a context size in linear time.
+
+    Each message is counted once (the counter memoizes repeated contents); the strategies then
+    replace messages in a copy of the list while a running total tracks the size, and runs of
+    dropped messages are merged into one placeholder. The strategies run in order until the
+    history fits. The input list and its dicts are never mutated.
+
+    Attributes:
+        strategies (List[str]): Names of the strategies to apply, in order (see STRATEGIES).
+        keep_last (int): Number of trailing messages that the dropping strategies keep intact.
+    """
+    strategies: List[str] = Field(default_factory=lambda: list(PRUNING_STRATEGIES), description="Names of the strategies to apply, in order")
+    keep_last: int = Field(PRUNING_KEEP_LAST, description="Number of trailing messages kept intact by the dropping strategies")
+
+    def prune(self, messages: List[Dict[str, Any]], ctx_size: int, tools: Optional[List[Dict[str, Any]]] = None,
+              counter: Optional[TokenCounter] = None) -> List[Dict[str, Any]]:
+        """
+        Return a pruned copy of the messages fitting in `ctx_size` tokens, if the strategies allow it.
+
+        Args:
+            messages (List[Dict[str, Any]]): The chat history, as API message dicts.
+            ctx_size (int): The token budget of the messages and tools.
+            tools (Optional[List[Dict[str, Any]]]): Tool definitions counted against the budget.
+            counter (Optional[TokenCounter]): The token counter of the model, the default counter if None.
+
+        Returns:
+            List[Dict[str, Any]]: The pruned messages. Unchanged messages are the input dicts.
+        """
+        counter = counter or get_token_counter()
+        fixed_tokens = counter.count_tools(tools) + (3 if messages else 0)
+        state = PruningState(messages, ctx_size, counter, self.keep_last, fixed_tokens)
+        for name in self.strategies:
+            if state.excess <= 0:
+                break
+            STRATEGIES[name](state)
+        return state.messages
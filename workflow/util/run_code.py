@@ -1,81 +1,107 @@
-import docker, time, re, base64
-from typing import Tuple
+import docker, time, re
+from typing import Tuple, Optional
 from docker.errors import DockerException, ContainerError, APIError
 from requests.exceptions import ReadTimeout
+from workflow.util.logging_config import LOGGER
+from workflow.util.const import SANDBOX_POOL_ENABLED, SANDBOX_MEM_LIMIT, SANDBOX_CPU_QUOTA
+from workflow.util.sandbox_pool import SANDBOX_IMAGES, SandboxJob, SandboxUnavailableError, SandboxCancelledError, get_sandbox_pool, build_command, encode_code, normalize_language
 
-def run_code(code: str, language: str, timeout: int = 30, retries: int = 3, log_level='info') -> Tuple[str, int]:
-    client = docker.from_env()
-    images = {
-        'python': ['mypython:latest'],
-        'bash': ['mybash:latest']
-    }
-    if language not in images:
+def run_code(code: str, language: str, timeout: int = 30, retries: int = 3, log_level='info', use_pool: bool = SANDBOX_POOL_ENABLED, job: Optional[SandboxJob] = None) -> Tuple[str, int]:
+    """
+    Run code in a sandbox container and return its cleaned logs and exit status.
+
+    With `use_pool`, the code is exec'd into a warm container of the sandbox pool; otherwise a
+    new container is started for the run. Docker errors are retried up to `retries` times; a
+    non-zero exit status or a timeout of the code itself is raised at once. A `job` lets the
+    caller cancel the run from another thread, killing its container.
+
+    Raises:
+        ValueError: If the language is not supported.
+        RuntimeError: If the code exits with a non-zero status.
+        TimeoutError: If the code runs for longer than `timeout` seconds.
+        SandboxCancelledError: If the job was cancelled.
+    """
+    language = normalize_language(language)
+    if language not in SANDBOX_IMAGES:
         raise ValueError(f"Unsupported language: {language}")
-    
+    if not use_pool:
+        return _run_in_new_container(code, language, timeout, retries, log_level, job)
+
+    error = None
+    for attempt in range(1, retries + 1):
+        try:
+            logs, exit_code = get_sandbox_pool().execute(code, language, timeout=timeout, log_level=log_level, job=job)
+        except (DockerException, SandboxUnavailableError) as e:
+            if job is not None and job.cancelled:
+                raise SandboxCancelledError("The execution was cancelled") from e
+            error = e
+            LOGGER.debug(f"Attempt {attempt}, sandbox '{language}': {str(e)}")
+            time.sleep(min(1, attempt - 1))
+            continue
+        clean_logs = remove_content(logs)
+        if exit_code != 0:
+            raise RuntimeError(f"Non-zero exit status: {exit_code}\nLogs:\n{clean_logs}")
+        return clean_logs, exit_code
+    raise error
+
+def _run_in_new_container(code: str, language: str, timeout: int, retries: int, log_level: str, job: Optional[SandboxJob] = None) -> Tuple[str, int]:
+    """Run code in a container started for this run only."""
+    client = docker.from_env()
     error = None
-    code = code.replace('\r\n', '\n').replace('\r', '\n')
-    code_b64 = base64.b64encode(code.encode('utf-8')).decode('utf-8')
+    code_b64 = encode_code(code)
 
     def log(message, level='info'):
         if log_level == 'debug' or (log_level == 'info' and level == 'info'):
             print(message)
 
+    image = SANDBOX_IMAGES[language]
     for attempt in range(1, retries + 1):
-        for image in images[language]:
+        if job is not None and job.cancelled:
+            raise SandboxCancelledError("The execution was cancelled")
+        try:
+            command_str = build_command(language, log_level)
+            log(f"Executing command: {command_str}", 'debug')
+
+            container = client.containers.run(
+                image,
+                ['bash', '-c', command_str],
+                detach=True,
+                stdout=True,
+                stderr=True,
+                network_disabled=False,
+                mem_limit=SANDBOX_MEM_LIMIT,
+                cpu_quota=SANDBOX_CPU_QUOTA,
+                environment={'CODE_B64': code_b64}
+            )
+            if job is not None and not job.attach(container):
+                container.remove(force=True)
+                raise SandboxCancelledError("The execution was cancelled")
+
             try:
-                if language == 'python':
-                    command_str = 'python -c "import base64; exec(base64.b64decode(\'$CODE_B64\').decode())"' if log_level == 'info' else (
-                        'set -x; '
-                        'echo "$CODE_B64" | base64 -d > script.py && '
-                        'echo "import base64" | cat - script.py > temp && mv temp script.py && '
-                        'python script.py'
-                    )
-                elif language == 'bash':
-                    command_str = 'bash -c "$(echo $CODE_B64 | base64 -d)"' if log_level == 'info' else (
-                        'set -x; '
-                        'echo "$CODE_B64" | base64 -d > script.sh && '
-                        'cat -v script.sh && '
-                        'bash script.sh'
-                    )
-                
-                log(f"Executing command: {command_str}", 'debug')
-                
-                container = client.containers.run(
-                    image,
-                    ['bash', '-c', command_str],
-                    detach=True,
-                    stdout=True,
-                    stderr=True,
-                    network_disabled=False,
-                    mem_limit='512m',
-                    cpu_quota=50000,
-                    environment={'CODE_B64': code_b64}
-                )
-                
-                try:
-                    exit_status = container.wait(timeout=timeout)
-                except (docker.errors.APIError, ReadTimeout) as e:
-                    container.kill()
-                    raise TimeoutError(f"Execution exceeded {timeout} seconds") from e
-                
-                logs = container.logs(stdout=True, stderr=True)
-                logs_decoded = logs.decode('utf-8')
-                clean_logs = remove_content(logs_decoded)
-                
-                if exit_status['StatusCode'] != 0:
-                    error_message = f"Non-zero exit status: {exit_status['StatusCode']}\nLogs:\n{clean_logs}"
-                    raise RuntimeError(error_message)
-                
-                container.remove()
-                return clean_logs, exit_status['StatusCode']
-            
-            except (ContainerError, DockerException, APIError, RuntimeError, TimeoutError, ReadTimeout) as e:
-                error = e
-                log(f"Attempt {attempt}, Image '{image}': {str(e)}\n", 'debug')
-                continue
-        
+                exit_status = container.wait(timeout=timeout)
+            except (docker.errors.APIError, ReadTimeout) as e:
+                container.kill()
+                raise TimeoutError(f"Execution exceeded {timeout} seconds") from e
+            finally:
+                if job is not None:
+                    job.detach()
+
+            logs = container.logs(stdout=True, stderr=True)
+            logs_decoded = logs.decode('utf-8')
+            clean_logs = remove_content(logs_decoded)
+
+            if exit_status['StatusCode'] != 0:
+                error_message = f"Non-zero exit status: {exit_status['StatusCode']}\nLogs:\n{clean_logs}"
+                raise RuntimeError(error_message)
+
+            container.remove()
+            return clean_logs, exit_status['StatusCode']
+
+        except (ContainerError, DockerException, APIError, RuntimeError, TimeoutError, ReadTimeout) as e:
+            error = e
+            log(f"Attempt {attempt}, Image '{image}': {str(e)}\n", 'debug')
         time.sleep(1)
-    
+
     raise error
 
 def remove_content(input_string):
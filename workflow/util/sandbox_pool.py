@@ -0,0 +1,485 @@
+import atexit, base64, math, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel, Field, PrivateAttr, ConfigDict
+from typing import Dict, Any, List, Optional, Tuple, Deque, FrozenSet
+from docker.errors import DockerException
+from workflow.util.logging_config import LOGGER
+from workflow.util.const import (
+    SANDBOX_POOL_SIZE, SANDBOX_MAX_USES, SANDBOX_ACQUIRE_TIMEOUT, SANDBOX_HEALTH_CHECK_INTERVAL,
+    SANDBOX_MEM_LIMIT, SANDBOX_CPU_QUOTA, SANDBOX_CLIENT_TIMEOUT
+)
+
+# Image running the code of each language
+SANDBOX_IMAGES = {
+    'python': 'mypython:latest',
+    'bash': 'mybash:latest'
+}
+# Names of code blocs accepted for each language
+LANGUAGE_ALIASES = {
+    'py': 'python',
+    'python3': 'python',
+    'sh': 'bash',
+    'shell': 'bash'
+}
+SANDBOX_LABEL = "alice.sandbox"
+# Exit statuses of coreutils' timeout when the command ran out of time: 124, or 137 (128 + SIGKILL) when the
+# KILL signal it sends to its process group reaches timeout itself
+TIMEOUT_EXIT_CODES = (124, 137)
+# Directories an execution may write to; they are emptied before the container is reused
+SCRATCH_DIRS = ('/app', '/tmp', '/root')
+# Command run before the container is reused: kills every process but PID 1 (`sleep infinity`; kill -1 spares
+# the caller too) and clears the scratch directories
+RESET_COMMAND = ['bash', '-c', f'kill -9 -1 2>/dev/null; find {" ".join(SCRATCH_DIRS)} -mindepth 1 -delete 2>/dev/null; true']
+
+def normalize_language(language: str) -> str:
+    """The sandbox language of a code bloc language, e.g. 'sh' -> 'bash'."""
+    language = (language or '').strip().lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+def build_command(language: str, log_level: str = 'info') -> str:
+    """The bash command running the base64 encoded code held in $CODE_B64."""
+    if language == 'python':
+        return 'python -c "import base64; exec(base64.b64decode(\'$CODE_B64\').decode())"' if log_level == 'info' else (
+            'set -x; '
+            'echo "$CODE_B64" | base64 -d > script.py && '
+            'echo "import base64" | cat - script.py > temp && mv temp script.py && '
+            'python script.py'
+        )
+    if language == 'bash':
+        return 'bash -c "$(echo $CODE_B64 | base64 -d)"' if log_level == 'info' else (
+            'set -x; '
+            'echo "$CODE_B64" | base64 -d > script.sh && '
+            'cat -v script.sh && '
+            'bash script.sh'
+        )
+    raise ValueError(f"Unsupported language: {language}")
+
+def is_scratch_path(path: str) -> bool:
+    """Whether a path is inside one of the directories cleared between executions."""
+    return any(path == directory or path.startswith(directory + '/') for directory in SCRATCH_DIRS)
+
+def encode_code(code: str) -> str:
+    code = code.replace('\r\n', '\n').replace('\r', '\n')
+    return base64.b64encode(code.encode('utf-8')).decode('utf-8')
+
+class SandboxUnavailableError(RuntimeError):
+    """No sandbox container could be acquired for an execution."""
+
+class SandboxCancelledError(RuntimeError):
+    """The execution was cancelled by its caller."""
+
+class SandboxJob(BaseModel):
+    """
+    Handle on one execution, through which its caller can stop it from another thread.
+
+    The executing code attaches the container it runs in; `cancel` kills that container, which
+    ends the execution and gets the container replaced, or prevents the execution from starting.
+    """
+    _container: Any = PrivateAttr(None)
+    _cancelled: bool = PrivateAttr(False)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def attach(self, container: Any) -> bool:
+        """Record the container running the job. Returns False if the job was already cancelled."""
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._container = container
+            return True
+
+    def detach(self):
+        with self._lock:
+            self._container = None
+
+    def cancel(self):
+        """Cancel the job, killing its container if it is running."""
+        with self._lock:
+            self._cancelled = True
+            container, self._container = self._container, None
+        if container is not None:
+            try:
+                container.kill()
+                LOGGER.info(f"Killed sandbox container {container.short_id} of a cancelled execution")
+            except DockerException as e:
+                LOGGER.debug(f"Could not kill the container of a cancelled execution: {e}")
+
+class SandboxContainer(BaseModel):
+    """
+    A long-running container of the pool, kept alive with `sleep infinity`, into which code is exec'd.
+
+    Attributes:
+        container (Any): The docker Container.
+        language (str): The language the container runs.
+        uses (int): Number of executions run in the container.
+        last_checked (float): Monotonic time of the last successful health check or execution.
+        baseline_changes (FrozenSet[str]): Paths changed from the image once the container started.
+    """
+    container: Any = Field(..., description="The docker Container")
+    language: str = Field(..., description="The language the container runs")
+    uses: int = Field(0, description="Number of executions run in the container")
+    last_checked: float = Field(default_factory=time.monotonic, description="Monotonic time of the last successful check")
+    baseline_changes: FrozenSet[str] = Field(default_factory=frozenset, description="Paths changed from the image once the container started")
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+class LanguagePool(BaseModel):
+    """
+    The warm containers of one language.
+
+    Keeps up to `size` containers alive. An execution takes an idle container, or starts one
+    while the pool has room, or waits up to `acquire_timeout` seconds for one to be released.
+    Containers are reset after each execution and replaced after `max_uses` executions, when
+    an execution fails or times out, or when a health check fails. Replacements are started in
+    the background so the pool stays warm.
+
+    Containers are shared by all users. The reset kills every process the execution left
+    running and empties the scratch directories, and a container in which the execution
+    changed anything else (e.g. packages installed in site-packages) is replaced instead of
+    reused, so no state of an execution reaches the next one.
+
+    Attributes:
+        language (str): The language of the pool.
+        image (str): The image of its containers.
+        size (int): Maximum number of containers, all kept warm once started.
+        max_uses (int): Executions after which a container is replaced.
+        acquire_timeout (float): Seconds an execution waits for a container.
+        health_check_interval (float): Idle seconds after which a container is checked before reuse.
+    """
+    language: str = Field(..., description="The language of the pool")
+    image: str = Field(..., description="The image of its containers")
+    size: int = Field(SANDBOX_POOL_SIZE, description="Maximum number of containers")
+    max_uses: int = Field(SANDBOX_MAX_USES, description="Executions after which a container is replaced")
+    acquire_timeout: float = Field(SANDBOX_ACQUIRE_TIMEOUT, description="Seconds an execution waits for a container")
+    health_check_interval: float = Field(SANDBOX_HEALTH_CHECK_INTERVAL, description="Idle seconds after which a container is checked before reuse")
+    client: Any = Field(..., description="The docker client")
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    _idle: Deque[SandboxContainer] = PrivateAttr(default_factory=deque)
+    _busy: int = PrivateAttr(0)
+    _starting: int = PrivateAttr(0)
+    _closed: bool = PrivateAttr(False)
+    _condition: threading.Condition = PrivateAttr(default_factory=threading.Condition)
+    _starter: ThreadPoolExecutor = PrivateAttr()
+    _metrics: Dict[str, float] = PrivateAttr(default_factory=lambda: {
+        "executions": 0, "warm_hits": 0, "cold_starts": 0, "started": 0, "start_failures": 0, "recycled": 0,
+        "failures": 0, "timeouts": 0, "health_check_failures": 0, "total_exec_seconds": 0.0, "total_wait_seconds": 0.0
+    })
+
+    def model_post_init(self, __context: Any):
+        self.size = max(1, self.size)
+        self._starter = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix=f"sandbox-{self.language}")
+
+    @property
+    def _count(self) -> int:
+        return len(self._idle) + self._busy + self._starting
+
+    def warm(self):
+        """Start containers in the background until the pool holds `size` of them."""
+        with self._condition:
+            missing = 0 if self._closed else self.size - self._count
+            self._starting += missing
+        for _ in range(missing):
+            self._starter.submit(self._start_idle)
+
+    def execute(self, code: str, timeout: float, log_level: str = 'info', job: Optional[SandboxJob] = None) -> Tuple[str, int]:
+        """
+        Run code in a warm container.
+
+        Args:
+            code (str): The code to run.
+            timeout (float): Seconds after which the code is killed.
+            log_level (str): 'info' runs the code directly, 'debug' traces the commands.
+            job (Optional[SandboxJob]): Handle through which the caller can cancel the execution.
+
+        Returns:
+            Tuple[str, int]: The merged stdout / stderr of the code and its exit status.
+
+        Raises:
+            TimeoutError: If the code runs for longer than `timeout`.
+            SandboxUnavailableError: If no container can be acquired.
+            SandboxCancelledError: If the job was cancelled.
+            DockerException: If docker fails to run the code.
+        """
+        sandbox = self._acquire()
+        if job is not None and not job.attach(sandbox.container):
+            self._release(sandbox, True)
+            raise SandboxCancelledError("The execution was cancelled")
+        healthy = False
+        started = time.monotonic()
+        try:
+            seconds = max(1, math.ceil(timeout))
+            # Without --foreground, timeout kills the whole process group, including the processes the code started
+            command = ['timeout', '-s', 'KILL', str(seconds), 'bash', '-c', build_command(self.language, log_level)]
+            exit_code, output = sandbox.container.exec_run(command, environment={'CODE_B64': encode_code(code)}, workdir='/app')
+            elapsed = time.monotonic() - started
+            if job is not None and job.cancelled:
+                raise SandboxCancelledError("The execution was cancelled")
+            self._metrics["executions"] += 1
+            self._metrics["total_exec_seconds"] += elapsed
+            # The code itself may exit with these statuses (137 also when it runs out of memory), only a run
+            # that lasted the whole timeout was killed
+            if exit_code in TIMEOUT_EXIT_CODES and elapsed >= 0.9 * seconds:
+                self._metrics["timeouts"] += 1
+                raise TimeoutError(f"Execution exceeded {timeout} seconds")
+            # A failed execution may have left processes or broken state behind, the container is replaced
+            healthy = exit_code == 0 and self._reset(sandbox)
+            return (output or b'').decode('utf-8', 'replace'), exit_code
+        except DockerException:
+            self._metrics["failures"] += 1
+            raise
+        finally:
+            if job is not None:
+                job.detach()
+            sandbox.uses += 1
+            self._release(sandbox, healthy)
+
+    def _acquire(self) -> SandboxContainer:
+        queued_at = time.monotonic()
+        deadline = queued_at + self.acquire_timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._count >= self.size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise SandboxUnavailableError(f"No {self.language} sandbox available after {self.acquire_timeout} seconds")
+                    self._condition.wait(remaining)
+                if self._closed:
+                    raise SandboxUnavailableError(f"The {self.language} sandbox pool is closed")
+                if self._idle:
+                    sandbox = self._idle.popleft()
+                    self._busy += 1
+                    cold = False
+                else:
+                    self._starting += 1
+                    cold = True
+            if cold:
+                sandbox = self._start_busy()
+                self._metrics["cold_starts"] += 1
+            elif not self._check(sandbox):
+                self._discard(sandbox, "failed its health check")
+                continue
+            else:
+                self._metrics["warm_hits"] += 1
+            self._metrics["total_wait_seconds"] += time.monotonic() - queued_at
+            return sandbox
+
+    def _release(self, sandbox: SandboxContainer, healthy: bool):
+        if healthy and sandbox.uses < self.max_uses and not self._closed:
+            sandbox.last_checked = time.monotonic()
+            with self._condition:
+                self._busy -= 1
+                self._idle.append(sandbox)
+                self._condition.notify()
+            return
+        reason = f"reached {sandbox.uses} uses" if healthy else "failed"
+        self._discard(sandbox, reason)
+
+    def _discard(self, sandbox: SandboxContainer, reason: str):
+        """Remove a busy container and start its replacement."""
+        LOGGER.debug(f"Sandbox pool '{self.language}': replacing container {sandbox.container.short_id}, it {reason}")
+        self._metrics["recycled"] += 1
+        if self._closed:
+            self._remove(sandbox)
+        else:
+            self._starter.submit(self._remove, sandbox)
+        with self._condition:
+            self._busy -= 1
+            self._condition.notify()
+        self.warm()
+
+    def _check(self, sandbox: SandboxContainer) -> bool:
+        """Health check of an idle container, skipped if it was used or checked recently."""
+        if time.monotonic() - sandbox.last_checked < self.health_check_interval:
+            return True
+        try:
+            sandbox.container.reload()
+            healthy = sandbox.container.status == 'running' and sandbox.container.exec_run(['true']).exit_code == 0
+        except DockerException as e:
+            LOGGER.debug(f"Sandbox pool '{self.language}': health check error: {e}")
+            healthy = False
+        if healthy:
+            sandbox.last_checked = time.monotonic()
+        else:
+            self._metrics["health_check_failures"] += 1
+        return healthy
+
+    def _reset(self, sandbox: SandboxContainer) -> bool:
+        """Clear what an execution left behind. Returns False if the container cannot be reused."""
+        try:
+            if sandbox.container.exec_run(RESET_COMMAND).exit_code != 0:
+                return False
+            changes = self._changed_paths(sandbox.container) - sandbox.baseline_changes
+        except DockerException as e:
+            LOGGER.debug(f"Sandbox pool '{self.language}': reset error: {e}")
+            return False
+        leaked = sorted(path for path in changes if not is_scratch_path(path))
+        if leaked:
+            LOGGER.debug(f"Sandbox pool '{self.language}': execution changed {leaked[:5]} outside the scratch directories")
+            return False
+        return True
+
+    @staticmethod
+    def _changed_paths(container: Any) -> FrozenSet[str]:
+        """Paths of the container's filesystem changed from its image (`docker diff`)."""
+        return frozenset(change['Path'] for change in container.diff() or [])
+
+    def _start_container(self) -> SandboxContainer:
+        container = self.client.containers.run(
+            self.image,
+            ['sleep', 'infinity'],
+            detach=True,
+            network_disabled=False,
+            mem_limit=SANDBOX_MEM_LIMIT,
+            cpu_quota=SANDBOX_CPU_QUOTA,
+            working_dir='/app',
+            labels={SANDBOX_LABEL: self.language}
+        )
+        self._metrics["started"] += 1
+        try:
+            baseline_changes = self._changed_paths(container)
+        except DockerException:
+            self._remove(SandboxContainer(container=container, language=self.language))
+            raise
+        return SandboxContainer(container=container, language=self.language, baseline_changes=baseline_changes)
+
+    def _start_busy(self) -> SandboxContainer:
+        """Start a container for an execution waiting on it; its slot was reserved in `_starting`."""
+        try:
+            sandbox = self._start_container()
+        except Exception:
+            self._metrics["start_failures"] += 1
+            with self._condition:
+                self._starting -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._starting -= 1
+            self._busy += 1
+        return sandbox
+
+    def _start_idle(self):
+        """Start a container in the background and add it to the idle containers."""
+        try:
+            sandbox = self._start_container()
+        except Exception as e:
+            self._metrics["start_failures"] += 1
+            LOGGER.warning(f"Sandbox pool '{self.language}': could not start a container from {self.image}: {e}")
+            sandbox = None
+        with self._condition:
+            self._starting -= 1
+            if sandbox is not None and not self._closed:
+                self._idle.append(sandbox)
+                sandbox = None
+            self._condition.notify()
+        if sandbox is not None:
+            self._remove(sandbox)
+
+    def _remove(self, sandbox: SandboxContainer):
+        try:
+            sandbox.container.remove(force=True)
+        except DockerException as e:
+            LOGGER.debug(f"Sandbox pool '{self.language}': could not remove container: {e}")
+
+    def check_health(self) -> int:
+        """Check every idle container now, replacing the unhealthy ones. Returns the number replaced."""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._busy += len(idle)
+        replaced = 0
+        for sandbox in idle:
+            sandbox.last_checked = 0.0
+            if self._check(sandbox):
+                self._release(sandbox, True)
+            else:
+                self._discard(sandbox, "failed its health check")
+                replaced += 1
+        return replaced
+
+    def stats(self) -> Dict[str, Any]:
+        metrics = dict(self._metrics)
+        metrics.update(idle=len(self._idle), busy=self._busy, starting=self._starting, size=self.size)
+        metrics["avg_exec_seconds"] = metrics["total_exec_seconds"] / metrics["executions"] if metrics["executions"] else 0.0
+        return metrics
+
+    def shutdown(self):
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for sandbox in idle:
+            self._remove(sandbox)
+        self._starter.shutdown(wait=False, cancel_futures=True)
+
+class SandboxPool(BaseModel):
+    """
+    Process-wide pools of warm sandbox containers, one LanguagePool per language, through which
+    `run_code` executes code without paying for a container start on each run.
+
+    The docker client and the pools are created on first use. Containers are removed on
+    `shutdown`, which also runs at interpreter exit.
+
+    Attributes:
+        size (int): Number of containers per language.
+        max_uses (int): Executions after which a container is replaced.
+        images (Dict[str, str]): Image of each language.
+    """
+    size: int = Field(SANDBOX_POOL_SIZE, description="Number of containers per language")
+    max_uses: int = Field(SANDBOX_MAX_USES, description="Executions after which a container is replaced")
+    images: Dict[str, str] = Field(default_factory=lambda: dict(SANDBOX_IMAGES), description="Image of each language")
+    _client: Any = PrivateAttr(None)
+    _pools: Dict[str, LanguagePool] = PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any):
+        atexit.register(self.shutdown)
+
+    def pool(self, language: str) -> LanguagePool:
+        language = normalize_language(language)
+        if language not in self.images:
+            raise ValueError(f"Unsupported language: {language}")
+        with self._lock:
+            pool = self._pools.get(language)
+            if pool is None:
+                if self._client is None:
+                    import docker
+                    self._client = docker.from_env(timeout=SANDBOX_CLIENT_TIMEOUT)
+                pool = self._pools[language] = LanguagePool(
+                    language=language, image=self.images[language], size=self.size, max_uses=self.max_uses, client=self._client
+                )
+            return pool
+
+    def execute(self, code: str, language: str, timeout: float = 30, log_level: str = 'info', job: Optional[SandboxJob] = None) -> Tuple[str, int]:
+        """Run code in a warm container of its language. See LanguagePool.execute."""
+        return self.pool(language).execute(code, timeout, log_level, job)
+
+    def warm(self, languages: Optional[List[str]] = None):
+        """Start the containers of the given languages (all by default) in the background."""
+        for language in languages or list(self.images):
+            try:
+                self.pool(language).warm()
+            except (DockerException, ValueError) as e:
+                LOGGER.warning(f"Could not warm the {language} sandbox pool: {e}")
+
+    def check_health(self) -> Dict[str, int]:
+        return {language: pool.check_health() for language, pool in list(self._pools.items())}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {language: pool.stats() for language, pool in list(self._pools.items())}
+
+    def shutdown(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown()
+
+SANDBOX_POOL = SandboxPool()
+
+def get_sandbox_pool() -> SandboxPool:
+    """Return the process-wide pool of sandbox containers."""
+    return SANDBOX_POOL
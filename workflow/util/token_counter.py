@@ -0,0 +1,208 @@
+import json, math, re
+from collections import OrderedDict
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Dict, Any, Optional, Tuple, Union
+from workflow.util.logging_config import LOGGER
+from workflow.util.const import TOKEN_COUNT_CACHE_SIZE, TOKENIZER_FILES
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+# Pre-tokenization in the style of the BPE vocabularies: runs of Latin, Greek or Cyrillic letters, digit groups of up to 3,
+# and any other non-space character on its own (punctuation, symbols, CJK ideographs)
+_PIECES = re.compile(r"[A-Za-z\u00C0-\u024F\u0370-\u03FF\u0400-\u04FF]+|\d{1,3}|\S")
+
+class TokenCounter(BaseModel):
+    """
+    Counts the tokens of text and chat messages for one model family, offline.
+
+    Text counts are memoized in a bounded LRU keyed on the text (Python caches string hashes,
+    so long histories are not re-tokenized every turn). Counts are inflated by `margin`, the
+    expected relative error of the counter, so callers err on the side of pruning early.
+
+    Attributes:
+        name (str): Name of the counter, e.g. 'cl100k_base' or 'heuristic:anthropic'.
+        margin (float): Relative error margin added to every count.
+        message_overhead (int): Tokens added per message for the role and delimiters.
+        image_tokens (int): Tokens charged per image part.
+        cache_size (int): Maximum number of memoized text counts.
+    """
+    name: str = Field(..., description="Name of the counter")
+    margin: float = Field(0.0, description="Relative error margin added to every count")
+    message_overhead: int = Field(4, description="Tokens added per message for the role and delimiters")
+    image_tokens: int = Field(765, description="Tokens charged per image part")
+    cache_size: int = Field(TOKEN_COUNT_CACHE_SIZE, description="Maximum number of memoized text counts")
+    _cache: "OrderedDict[str, int]" = PrivateAttr(default_factory=OrderedDict)
+
+    def _count(self, text: str) -> int:
+        raise NotImplementedError
+
+    def count_text(self, text: Optional[str]) -> int:
+        """Tokens of a string, including the error margin."""
+        if not text:
+            return 0
+        cached = self._cache.get(text)
+        if cached is not None:
+            self._cache.move_to_end(text)
+            return cached
+        count = math.ceil(self._count(text) * (1 + self.margin))
+        self._cache[text] = count
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return count
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        """Tokens of a chat message: content (text and image parts), name, tool calls and tool call id."""
+        tokens = self.message_overhead + self.count_content(message.get("content") or message.get("message"))
+        if message.get("name"):
+            tokens += 1 + self.count_text(message["name"])
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function", tool_call) if isinstance(tool_call, dict) else getattr(tool_call, "function", tool_call)
+            name = function.get("name") if isinstance(function, dict) else getattr(function, "name", "")
+            arguments = function.get("arguments") if isinstance(function, dict) else getattr(function, "arguments", "")
+            if not isinstance(arguments, str):
+                arguments = json.dumps(arguments, sort_keys=True, default=str)
+            tokens += self.message_overhead + self.count_text(name) + self.count_text(arguments)
+        if message.get("tool_call_id"):
+            tokens += self.count_text(message["tool_call_id"])
+        return tokens
+
+    def count_content(self, content: Union[str, List[Any], None]) -> int:
+        if content is None:
+            return 0
+        if isinstance(content, str):
+            return self.count_text(content)
+        if isinstance(content, list):
+            tokens = 0
+            for part in content:
+                if isinstance(part, str):
+                    tokens += self.count_text(part)
+                elif isinstance(part, dict) and part.get("type") in ("image_url", "image", "input_image"):
+                    tokens += self.image_tokens
+                elif isinstance(part, dict):
+                    tokens += self.count_text(part.get("text") or part.get("content") or "")
+            return tokens
+        return self.count_text(str(content))
+
+    def count_tools(self, tools: Optional[List[Dict[str, Any]]]) -> int:
+        """Tokens of the tool definitions, counted on their serialized schemas."""
+        if not tools:
+            return 0
+        return sum(self.count_text(json.dumps(tool, sort_keys=True, default=str)) for tool in tools)
+
+    def count_messages(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Tokens of a list of messages and optional tools, with the reply priming overhead."""
+        return sum(self.count_message(message) for message in messages) + self.count_tools(tools) + (3 if messages else 0)
+
+class HeuristicTokenCounter(TokenCounter):
+    """
+    Vocabulary-free counter approximating BPE tokenizers: every punctuation or symbol character
+    (including each CJK character) and every group of up to three digits is a token, and a word
+    costs one token plus one per `chars_per_token` letters beyond its first `word_length`.
+    """
+    word_length: int = Field(6, description="Letters of a word covered by its first token")
+    chars_per_token: float = Field(5.0, description="Letters per extra token in long words")
+
+    def _count(self, text: str) -> int:
+        tokens = 0
+        for piece in _PIECES.findall(text):
+            length = len(piece)
+            tokens += 1 if length <= self.word_length else 1 + math.ceil((length - self.word_length) / self.chars_per_token)
+        return tokens
+
+class TiktokenCounter(TokenCounter):
+    """Exact counter for OpenAI BPE encodings. Reads the vocabulary from TIKTOKEN_CACHE_DIR when set, so it can run offline."""
+    encoding: str = Field("cl100k_base", description="The tiktoken encoding")
+    _encoder: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any):
+        self._encoder = tiktoken.get_encoding(self.encoding)
+
+    def _count(self, text: str) -> int:
+        return len(self._encoder.encode(text, disallowed_special=()))
+
+class HuggingFaceTokenCounter(TokenCounter):
+    """Exact counter from a local `tokenizer.json` (e.g. the tokenizer of a model served by LM Studio)."""
+    path: str = Field(..., description="Path of the tokenizer.json file")
+    _tokenizer: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any):
+        self._tokenizer = Tokenizer.from_file(self.path)
+
+    def _count(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+# Heuristic counters per provider family. Margins are conservative: tokenizers denser than the heuristic get a larger one
+HEURISTIC_COUNTERS: Dict[str, Dict[str, Any]] = {
+    "default": {"margin": 0.15},
+    "openai": {"margin": 0.10},
+    "anthropic": {"margin": 0.20, "image_tokens": 1600},
+    "gemini": {"margin": 0.10, "image_tokens": 258},
+    "cohere": {"margin": 0.15},
+    "mistral": {"margin": 0.20},
+    "llama": {"margin": 0.20},
+}
+# Model formats (see const.model_formats) and API names mapped to a provider family
+FAMILY_BY_KEY: Dict[str, str] = {
+    "openai_llm": "openai", "azure": "openai", "groq_llm": "llama", "meta_llm": "llama", "lm-studio_llm": "llama",
+    "anthropic_llm": "anthropic", "gemini_llm": "gemini", "cohere_llm": "cohere", "mistral_llm": "mistral",
+    "ChatML": "llama", "Mistral_Instruct": "mistral", "CodeLlama_Instruct": "llama", "Llama3": "llama", "Llama3Neural": "llama",
+    "Starcoder2": "default", "OpenChat": "llama", "Obsidian_Vision": "llama",
+}
+
+class TokenCounterRegistry(BaseModel):
+    """
+    Resolves the TokenCounter of a model from its model_format, then its api_name, then the
+    default. Counters registered for a key win; otherwise a local tokenizer file listed in
+    TOKENIZER_FILES, tiktoken for the OpenAI family when installed, or the provider's
+    calibrated heuristic is used.
+    """
+    _counters: Dict[str, TokenCounter] = PrivateAttr(default_factory=dict)
+    _resolved: Dict[Tuple[Optional[str], Optional[str]], TokenCounter] = PrivateAttr(default_factory=dict)
+
+    def register(self, key: str, counter: TokenCounter):
+        """Use `counter` for an api_name or model_format."""
+        self._counters[str(key)] = counter
+        self._resolved.clear()
+
+    def get(self, api_name: Optional[Any] = None, model_format: Optional[str] = None) -> TokenCounter:
+        api_name = getattr(api_name, "value", api_name)
+        resolved = self._resolved.get((api_name, model_format))
+        if resolved is None:
+            resolved = self._resolved[(api_name, model_format)] = self._resolve(api_name, model_format)
+        return resolved
+
+    def _resolve(self, api_name: Optional[str], model_format: Optional[str]) -> TokenCounter:
+        for key in (model_format, api_name):
+            if key and key in self._counters:
+                return self._counters[key]
+        for key in (model_format, api_name):
+            if key and key in TOKENIZER_FILES and Tokenizer is not None:
+                try:
+                    return self._remember(key, HuggingFaceTokenCounter(name=f"hf:{key}", path=TOKENIZER_FILES[key], margin=0.02))
+                except Exception as e:
+                    LOGGER.warning(f"Could not load tokenizer {TOKENIZER_FILES[key]} for {key}: {e}")
+        family = FAMILY_BY_KEY.get(model_format) or FAMILY_BY_KEY.get(api_name) or "default"
+        if family == "openai" and tiktoken is not None:
+            try:
+                return self._remember(family, TiktokenCounter(name="cl100k_base", margin=0.02))
+            except Exception as e:
+                LOGGER.warning(f"tiktoken encoding unavailable, using the heuristic token counter: {e}")
+        return self._remember(family, HeuristicTokenCounter(name=f"heuristic:{family}", **HEURISTIC_COUNTERS[family]))
+
+    def _remember(self, key: str, counter: TokenCounter) -> TokenCounter:
+        # Counters are shared per family so they share their memoized counts
+        return self._counters.setdefault(f"_{key}", counter)
+
+TOKEN_COUNTERS = TokenCounterRegistry()
+
+def get_token_counter(api_name: Optional[Any] = None, model_format: Optional[str] = None) -> TokenCounter:
+    """Return the token counter of a model, by api_name and / or model_format."""
+    return TOKEN_COUNTERS.get(api_name, model_format)
@@ -1,6 +1,8 @@
 import json, re
-from typing import List, Any, Union, Type, Tuple, Dict
+from typing import List, Any, Union, Type, Tuple, Dict, Optional
 from workflow.util.logging_config import LOGGER
+from workflow.util.token_counter import get_token_counter
+from workflow.util.pruning import MessagePruner
 
 def json_to_python_type_mapping(json_type: str) -> Type | Tuple[Type, ...] | None:
     type_mapping = {
@@ -129,56 +131,14 @@ def chunk_text(input_text: str, target_chunk_size: int) -> List[str]:
 
     return chunks
 
-def est_token_count(text: str) -> int:
-    """Estimate token count for a given string."""
-    return len(text) // 4  # Simple estimation
-
-def est_messages_token_count(messages: List[Dict[str, Any]], tools: List[Dict[str, Any]] = None) -> int:
-    """Estimate token count for a list of messages and optional tools."""
-    total_tokens = sum(est_token_count(msg.get('content', '')) for msg in messages)
-    if tools:
-        total_tokens += 100 * len(tools)  # Add 100 tokens per tool
-    return total_tokens
-
-def replace_message() -> str:
-    """Return the replacement string for pruned messages."""
-    return "[ctx_exceeded]"
-
-def pruning_message_count(messages: List[Dict[str, Any]]) -> int:
-    """Count messages that haven't been pruned."""
-    return sum(1 for msg in messages if msg.get('content') != replace_message())
-
-def prune_messages(messages: List[Dict[str, Any]], ctx_size: int) -> List[Dict[str, Any]]:
-    """Prune messages to fit within the context size."""
-    pruned_messages = messages.copy()
-    
-    while est_messages_token_count(pruned_messages) > ctx_size:
-        if pruning_message_count(pruned_messages) > 4:
-            # Strategy 1: Remove content of second to last message
-            for i in range(len(pruned_messages) - 2, 0, -1):
-                if pruned_messages[i]['content'] != replace_message():
-                    pruned_messages[i]['content'] = replace_message()
-                    break
-        else:
-            # Strategy 2: Remove or trim the longest non-system message
-            non_system_messages = [msg for msg in pruned_messages if msg['role'] != 'system']
-            if not non_system_messages:
-                break  # Can't prune any further
-            
-            longest_message = max(non_system_messages, key=lambda x: len(x.get('content', '')))
-            longest_index = pruned_messages.index(longest_message)
-            
-            # Check if removing the longest message would be enough
-            temp_messages = pruned_messages.copy()
-            temp_messages[longest_index]['content'] = replace_message()
-            if est_messages_token_count(temp_messages) > ctx_size:
-                # Replace the longest message with [ctx_exceeded]
-                pruned_messages = temp_messages
-            else:
-                # Trim the longest message
-                excess_tokens = est_messages_token_count(pruned_messages) - ctx_size
-                trim_chars = (excess_tokens * 4) + 3 + len(replace_message()) # Convert back to character estimate and add 3 more
-                pruned_content = longest_message['content'][:-trim_chars] + "..." + replace_message()
-                pruned_messages[longest_index]['content'] = pruned_content
-    
-    return pruned_messages
\ No newline at end of file
+def est_token_count(text: str, api_name: Optional[Any] = None, model_format: Optional[str] = None) -> int:
+    """Estimate token count for a given string, with the token counter of the model if given."""
+    return get_token_counter(api_name, model_format).count_text(text)
+
+def est_messages_token_count(messages: List[Dict[str, Any]], tools: List[Dict[str, Any]] = None, api_name: Optional[Any] = None, model_format: Optional[str] = None) -> int:
+    """Estimate token count for a list of messages (content, images, names and tool calls) and optional tools."""
+    return get_token_counter(api_name, model_format).count_messages(messages, tools)
+
+def prune_messages(messages: List[Dict[str, Any]], ctx_size: int, api_name: Optional[Any] = None, model_format: Optional[str] = None, tools: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Return a copy of the messages pruned to fit within the context size, counted with the token counter of the model."""
+    return MessagePruner().prune(messages, ctx_size, tools=tools, counter=get_token_counter(api_name, model_format))
\ No newline at end of file
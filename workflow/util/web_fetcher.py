@@ -0,0 +1,181 @@
+import asyncio, codecs, re
+import aiohttp
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Optional, Union
+from workflow.util.logging_config import LOGGER
+from workflow.util.const import (
+    WEB_FETCH_MAX_CONNECTIONS, WEB_FETCH_MAX_CONNECTIONS_PER_HOST, WEB_FETCH_TIMEOUT, WEB_FETCH_CONNECT_TIMEOUT,
+    WEB_FETCH_READ_TIMEOUT, WEB_FETCH_MAX_BYTES, WEB_FETCH_USER_AGENT
+)
+
+# Content types of the pages the fetcher reads; responses declaring another type are not downloaded
+TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "text/xml", "application/xml")
+CHUNK_SIZE = 64 * 1024
+# Where a <meta charset> declaration is looked for when the headers give no charset
+CHARSET_SNIFF_BYTES = 2048
+META_CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+class WebFetchError(RuntimeError):
+    """A page could not be fetched."""
+
+class ResponseTooLargeError(WebFetchError):
+    """The page is larger than the fetcher accepts."""
+
+class UnsupportedContentTypeError(WebFetchError):
+    """The page is not a text document."""
+
+class FetchedPage(BaseModel):
+    """
+    A fetched web page.
+
+    Attributes:
+        url (str): The URL of the page, after redirects.
+        status (int): The HTTP status of the response.
+        content_type (Optional[str]): The media type declared by the response, if any.
+        charset (str): The encoding the body was decoded with.
+        size (int): Size of the body in bytes, once decompressed.
+        text (str): The decoded body.
+    """
+    url: str = Field(..., description="The URL of the page, after redirects")
+    status: int = Field(..., description="The HTTP status of the response")
+    content_type: Optional[str] = Field(None, description="The media type declared by the response")
+    charset: str = Field(..., description="The encoding the body was decoded with")
+    size: int = Field(..., description="Size of the body in bytes, once decompressed")
+    text: str = Field(..., description="The decoded body")
+
+def detect_charset(body: bytes, declared: Optional[str] = None) -> str:
+    """
+    The encoding of a page body: a byte order mark, else the charset of the Content-Type
+    header, else a <meta charset> declaration at the start of the document, else UTF-8.
+    """
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding
+    candidates = [declared]
+    match = META_CHARSET_PATTERN.search(body[:CHARSET_SNIFF_BYTES])
+    if match:
+        candidates.append(match.group(1).decode("ascii", "ignore"))
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            return codecs.lookup(candidate.strip()).name
+        except LookupError:
+            LOGGER.debug(f"Unknown charset {candidate}, ignoring it")
+    return "utf-8"
+
+class WebFetcher(BaseModel):
+    """
+    Fetches web pages over one pooled aiohttp session, shared by every web scraping task.
+
+    Connections are kept alive and reused, with at most `max_connections` open in total and
+    `max_connections_per_host` to a single host, so scraping many URLs concurrently does not
+    flood one site. Bodies are streamed: aiohttp decompresses them chunk by chunk as they
+    arrive, and the download is aborted as soon as a page declares, or reaches, more than
+    `max_bytes`. Responses that declare a non-text content type are dropped before their body is
+    read. The body is decoded once, with the charset of the headers or of the document.
+
+    The session belongs to the event loop that created it; it is created on first use in each
+    loop and closed with `aclose` (the FastAPI lifespan closes it on shutdown).
+
+    Attributes:
+        max_connections (int): Maximum number of open connections.
+        max_connections_per_host (int): Maximum number of open connections to a single host.
+        timeout (float): Seconds a fetch may take in total.
+        connect_timeout (float): Seconds to wait for a connection.
+        read_timeout (float): Seconds to wait for each chunk of the body.
+        max_bytes (int): Maximum size of a page, once decompressed.
+        user_agent (str): User-Agent header sent with the requests.
+    """
+    max_connections: int = Field(WEB_FETCH_MAX_CONNECTIONS, description="Maximum number of open connections")
+    max_connections_per_host: int = Field(WEB_FETCH_MAX_CONNECTIONS_PER_HOST, description="Maximum number of open connections to a single host")
+    timeout: float = Field(WEB_FETCH_TIMEOUT, description="Seconds a fetch may take in total")
+    connect_timeout: float = Field(WEB_FETCH_CONNECT_TIMEOUT, description="Seconds to wait for a connection")
+    read_timeout: float = Field(WEB_FETCH_READ_TIMEOUT, description="Seconds to wait for each chunk of the body")
+    max_bytes: int = Field(WEB_FETCH_MAX_BYTES, description="Maximum size of a page, once decompressed")
+    user_agent: str = Field(WEB_FETCH_USER_AGENT, description="User-Agent header sent with the requests")
+    _session: Optional[aiohttp.ClientSession] = PrivateAttr(default=None)
+    _loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections_per_host, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout, connect=self.connect_timeout, sock_read=self.read_timeout),
+                headers={"User-Agent": self.user_agent, "Accept": "text/html,application/xhtml+xml,text/plain;q=0.9,*/*;q=0.5"},
+            )
+            self._loop = loop
+        return self._session
+
+    async def fetch(self, url: str, max_bytes: Optional[int] = None) -> FetchedPage:
+        """
+        Fetch a web page.
+
+        Args:
+            url (str): The URL of the page.
+            max_bytes (Optional[int]): Maximum size of the page, once decompressed. Defaults to `max_bytes`.
+
+        Returns:
+            FetchedPage: The page, with its decoded text.
+
+        Raises:
+            aiohttp.ClientResponseError: If the response has an unsuccessful status code.
+            UnsupportedContentTypeError: If the response declares a non-text content type.
+            ResponseTooLargeError: If the page is larger than `max_bytes`.
+            asyncio.TimeoutError: If the fetch takes longer than the timeouts allow.
+        """
+        max_bytes = max_bytes or self.max_bytes
+        async with self._get_session().get(url) as response:
+            response.raise_for_status()
+            content_type = response.content_type if aiohttp.hdrs.CONTENT_TYPE in response.headers else None
+            if content_type and content_type not in TEXT_CONTENT_TYPES:
+                response.close()
+                raise UnsupportedContentTypeError(f"{url} is not a text document: {content_type}")
+            # Content-Length is the size on the wire, a lower bound of the decompressed size
+            if response.content_length is not None and response.content_length > max_bytes:
+                response.close()
+                raise ResponseTooLargeError(f"{url} is {response.content_length} bytes, more than the limit of {max_bytes}")
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                body += chunk
+                if len(body) > max_bytes:
+                    # Closing drops the connection instead of reading the rest of the body
+                    response.close()
+                    raise ResponseTooLargeError(f"{url} is more than the limit of {max_bytes} bytes")
+            charset = detect_charset(body, response.charset)
+            return FetchedPage(
+                url=str(response.url),
+                status=response.status,
+                content_type=content_type,
+                charset=charset,
+                size=len(body),
+                text=body.decode(charset, errors="replace"),
+            )
+
+    async def fetch_many(self, urls: List[str], max_bytes: Optional[int] = None) -> List[Union[FetchedPage, Exception]]:
+        """
+        Fetch several web pages concurrently, within the connection limits.
+
+        Returns:
+            List[Union[FetchedPage, Exception]]: The page, or the error that prevented fetching it, for each URL.
+        """
+        return await asyncio.gather(*(self.fetch(url, max_bytes) for url in urls), return_exceptions=True)
+
+    async def aclose(self):
+        """Close the session and its connections."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            try:
+                await session.close()
+            except RuntimeError as e:
+                # The session's event loop is gone; its connections went with it
+                LOGGER.debug(f"Web fetcher session could not be closed: {e}")
+
+WEB_FETCHER = WebFetcher()
+
+def get_web_fetcher() -> WebFetcher:
+    """Return the process-wide web page fetcher shared by the web scraping tasks."""
+    return WEB_FETCHER